@@ -64,6 +64,8 @@ INSTALLED_APPS = [
     'disputes',
     'escrow',
     'shipping',
+    'analytics',
+    'ledger',
 ]
 
 
@@ -109,12 +111,53 @@ DATABASES = {
 }
 ASGI_APPLICATION = "aliaunction.asgi.application"
 
+# URL names served by the async views in auctions.async_views and
+# notifications.async_views instead of their sync counterparts.
+# Only worth enabling when running under ASGI.
+# e.g. ['place_bid', 'auction_status_api', 'unread_notifications_api', 'mark_notification_read']
+ASYNC_VIEWS = []
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
     }
 }
 
+# Live viewer counts (auction_ws.presence) live in the default cache; use a
+# shared backend such as Redis in production so counts span all workers.
+PRESENCE_PUBLISH_INTERVAL = 5  # seconds between viewer count updates per auction
+
+# Anonymous homepage / auction list / auction detail responses are public
+# and may be cached by browsers and proxies for this long (auctions.shells).
+SHELL_MAX_AGE = 60
+
+# Auction/article view counts are buffered in memory and written in one
+# batched UPDATE every VIEW_COUNT_FLUSH_INTERVAL seconds (auctions.view_counter).
+# Repeat views by the same visitor within VIEW_COUNT_DEDUP_SECONDS count once.
+VIEW_COUNT_FLUSH_INTERVAL = 5
+VIEW_COUNT_DEDUP_SECONDS = 30 * 60
+
+# Engagement events (views, bids, watches, search impressions) are buffered
+# and bulk-inserted every ANALYTICS_FLUSH_INTERVAL seconds (analytics.events);
+# run `manage.py rollup_engagement` from cron to refresh dashboard rollups.
+ANALYTICS_FLUSH_INTERVAL = 5
+
+# Soft-close auctions end once nobody has bid for this long after end_time
+# (announced as "going once" / "going twice"; `manage.py run_soft_close`).
+SOFT_CLOSE_IDLE_SECONDS = 60
+
+# Close workers (`manage.py run_close_worker`) split auctions into shards by
+# id % CLOSE_SHARD_COUNT and lease them for CLOSE_LEASE_SECONDS at a time.
+CLOSE_SHARD_COUNT = 16
+CLOSE_LEASE_SECONDS = 30
+
+# Invoice PDFs are rendered once per invoice version by a pool of
+# INVOICE_PDF_WORKERS processes and cached under INVOICE_PDF_ROOT
+# (payments.invoice_pdf; `manage.py render_invoice_pdfs` renders pending ones).
+INVOICE_PDF_ROOT = BASE_DIR / 'private' / 'invoices'
+INVOICE_PDF_WORKERS = 2
+INVOICE_PDF_WAIT_SECONDS = 10
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
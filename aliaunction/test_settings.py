@@ -0,0 +1,19 @@
+"""
+Settings for the test suite.
+
+``manage.py test`` uses this module unless DJANGO_SETTINGS_MODULE or
+--settings says otherwise; point other runners (e.g. pytest-django) at
+``aliaunction.test_settings``. Work that production defers to background
+threads and worker processes runs inline here, so tests can assert on
+it straight away.
+"""
+from .settings import *  # noqa: F401,F403
+
+# Write every view straight away (auctions.view_counter)
+VIEW_COUNT_FLUSH_INTERVAL = 0
+
+# Write engagement events straight away (analytics.events)
+ANALYTICS_FLUSH_INTERVAL = 0
+
+# Render invoice PDFs in-process (payments.invoice_pdf)
+INVOICE_PDF_WORKERS = 0
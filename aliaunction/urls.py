@@ -20,43 +20,45 @@ from django.shortcuts import render
 from django.conf import settings
 from django.conf.urls.static import static
 from auctions.models import Auction, Category
-from django.db.models import Count
-from django.db.models import Q
+from auctions.search import search_auctions
+from auctions.pagination import paginate, wants_json, page_json_response
+from auctions.cards import attach_cards
+from auctions.shells import cacheable_shell
+from auctions.views import auction_state_api
 from django.utils import timezone
 
+@cacheable_shell
 def homepage(request):
-    from watchlist.models import Watchlist
-    
     query = request.GET.get('search', '').strip()
     category_slug = request.GET.get('category', '').strip()
     
-    auctions = Auction.objects.filter(is_active=True)
-    
-    if query:
-        auctions = auctions.filter(Q(title__icontains=query) | Q(description__icontains=query))
+    auctions = Auction.objects.live()
     
     if category_slug:
         auctions = auctions.filter(category__slug=category_slug)
-        
-    auctions = auctions.order_by('-created_at')
     
-    # Get active categories with auction counts
-    categories = Category.objects.filter(is_active=True).annotate(
-        count=Count('auctions', filter=Q(auctions__is_active=True))
-    ).order_by('order', 'name')
+    # Search results are ordered by relevance, everything else newest first
+    if query:
+        auctions = search_auctions(auctions, query)
+        ordering = None
+    else:
+        ordering = ('-created_at', '-id')
+    
+    page = paginate(request, auctions, ordering)
+    if wants_json(request):
+        return page_json_response(page)
+    
+    attach_cards(page.object_list, 'auctions/_home_card.html')
     
-    # Get user's watchlist IDs for showing heart icons
-    watchlist_ids = []
-    if request.user.is_authenticated:
-        watchlist_ids = list(Watchlist.objects.filter(user=request.user).values_list('auction_id', flat=True))
+    # Active categories; counts come from the maintained counter column
+    categories = Category.objects.filter(is_active=True).order_by('order', 'name')
     
     return render(request, 'home.html', {
-        'auctions': auctions, 
+        'auctions': page, 
         'categories': categories, 
         'search_query': query,
         'selected_category': category_slug,
         'now': timezone.now(),
-        'watchlist_ids': watchlist_ids,
     })
 
 urlpatterns = [
@@ -79,6 +81,7 @@ urlpatterns = [
     path('shipping/', include('shipping.urls')),
     path('disputes/', include('disputes.urls')),
     path('ratings/', include('reviews.urls')),
+    path('api/me/auction-state', auction_state_api, name='my_auction_state'),
     path('', homepage, name='home'),
 ]
 
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import AuctionEngagement, EngagementEvent, SellerEngagement
+
+
+@admin.register(EngagementEvent)
+class EngagementEventAdmin(admin.ModelAdmin):
+    list_display = ("kind", "auction", "seller", "user", "amount", "quantity", "occurred_at")
+    list_filter = ("kind",)
+    date_hierarchy = "occurred_at"
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuctionEngagement)
+class AuctionEngagementAdmin(admin.ModelAdmin):
+    list_display = ("auction", "period", "bucket", "views", "bids", "watches", "unwatches", "impressions")
+    list_filter = ("period",)
+
+
+@admin.register(SellerEngagement)
+class SellerEngagementAdmin(admin.ModelAdmin):
+    list_display = ("seller", "period", "bucket", "views", "bids", "watches", "unwatches", "impressions")
+    list_filter = ("period",)
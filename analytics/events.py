@@ -0,0 +1,81 @@
+"""
+Buffered writer for the engagement event log.
+
+Request handlers call ``record()``, which only appends an unsaved
+EngagementEvent to an in-process buffer (timestamped when it happened).
+The buffer is written with one ``bulk_create`` when it reaches
+EVENT_BATCH_SIZE, and otherwise every ANALYTICS_FLUSH_INTERVAL seconds
+and at exit (auctions.buffering). A failed write keeps the events for
+the next flush. ANALYTICS_FLUSH_INTERVAL = 0 writes immediately.
+"""
+import logging
+import threading
+
+from django.utils import timezone
+
+from auctions.buffering import PeriodicFlusher
+
+from .models import EngagementEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_BATCH_SIZE = 500
+
+_buffer = []
+_lock = threading.Lock()
+
+
+def record(kind, auction, user=None, amount=None):
+    """Log one event for ``auction`` (only its id and owner_id are read)."""
+    record_many(kind, [auction], user=user, amount=amount)
+
+
+def record_many(kind, auctions, user=None, amount=None):
+    """Log the same event for several auctions, e.g. a page of search results."""
+    now = timezone.now()
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    events = [
+        EngagementEvent(
+            kind=kind,
+            auction_id=auction.pk,
+            seller_id=auction.owner_id,
+            user_id=user_id,
+            amount=amount,
+            occurred_at=now,
+        )
+        for auction in auctions
+    ]
+    if not events:
+        return
+    with _lock:
+        _buffer.extend(events)
+        full = len(_buffer) >= EVENT_BATCH_SIZE
+    if full or _flusher.immediate():
+        flush()
+    else:
+        _flusher.start()
+
+
+def pending():
+    with _lock:
+        return len(_buffer)
+
+
+def flush():
+    """Write buffered events; returns how many were written."""
+    global _buffer
+    with _lock:
+        batch, _buffer = _buffer, []
+    if not batch:
+        return 0
+    try:
+        EngagementEvent.objects.bulk_create(batch, batch_size=EVENT_BATCH_SIZE)
+    except Exception:
+        logger.exception('Failed to write %d engagement events; retrying later', len(batch))
+        with _lock:
+            _buffer[:0] = batch
+        return 0
+    return len(batch)
+
+
+_flusher = PeriodicFlusher('analytics-flush', flush, 'ANALYTICS_FLUSH_INTERVAL')
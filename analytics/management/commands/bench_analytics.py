@@ -0,0 +1,128 @@
+"""
+Management command to benchmark the NumPy seller time series against a
+per-row Python implementation.
+Run: python manage.py bench_analytics --rows 1000000
+
+Inserts synthetic bids on one auction inside a transaction (rolled back
+at the end, so the database is left untouched), then times both ways of
+producing hourly bid counts, the price curve and amount percentiles.
+"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.timeseries import BUCKETS, PERCENTILES, compute_series, load_columns
+from auctions.models import Auction, Bid
+
+User = get_user_model()
+
+
+def python_series(auction, width):
+    """The per-row approach: iterate Bid instances and aggregate in dicts."""
+    counts = {}
+    price_by_bucket = {}
+    amounts = []
+    highest = auction.starting_price
+    origin = int(auction.created_at.timestamp()) // width * width
+    for bid in Bid.objects.filter(auction=auction).order_by('timestamp'):
+        bucket = (int(bid.timestamp.timestamp()) - origin) // width
+        counts[bucket] = counts.get(bucket, 0) + 1
+        highest = max(highest, bid.amount)
+        price_by_bucket[bucket] = highest
+        amounts.append(bid.amount)
+    amounts.sort()
+    percentiles = {p: amounts[min(len(amounts) - 1, len(amounts) * p // 100)] for p in PERCENTILES} if amounts else {}
+    return counts, price_by_bucket, percentiles
+
+
+class Command(BaseCommand):
+    help = 'Benchmark NumPy auction time series vs per-row Python on synthetic bids'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Synthetic bids to insert (default: 1000000)')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per method (default: 3)')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = random.Random(42)
+        width = BUCKETS['hour']
+
+        with transaction.atomic():
+            stamp = int(time.time())
+            owner = User.objects.create_user(username=f'bench_analytics_{stamp}')
+            bidder = User.objects.create_user(username=f'bench_analytics_bidder_{stamp}')
+            now = timezone.now()
+            auction = Auction.objects.create(
+                title='Benchmark auction',
+                description='Synthetic bids',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=now,
+                owner=owner,
+            )
+            # Spread the bids over the 30 days before now
+            Auction.objects.filter(pk=auction.pk).update(created_at=now - timedelta(days=30))
+            auction.refresh_from_db()
+
+            self.stdout.write(f'Inserting {rows} bids...')
+            started = time.perf_counter()
+            offsets = sorted(rng.uniform(0, 30 * 24 * 3600) for _ in range(rows))
+            price = 100.0
+            # Let the synthetic timestamps through auto_now_add
+            timestamp_field = Bid._meta.get_field('timestamp')
+            timestamp_field.auto_now_add = False
+            try:
+                for start in range(0, rows, options['batch_size']):
+                    batch = []
+                    for offset in offsets[start:start + options['batch_size']]:
+                        price += rng.uniform(0, 5)
+                        batch.append(Bid(
+                            auction=auction,
+                            user=bidder,
+                            amount=Decimal(f'{price:.2f}'),
+                            timestamp=auction.created_at + timedelta(seconds=offset),
+                        ))
+                    Bid.objects.bulk_create(batch)
+            finally:
+                timestamp_field.auto_now_add = True
+            self.stdout.write(f'  done in {time.perf_counter() - started:.1f}s\n')
+
+            def run_numpy():
+                bid_times, bid_amounts, watch_times = load_columns(auction)
+                loaded = time.perf_counter()
+                compute_series(
+                    bid_times, bid_amounts, watch_times,
+                    start=auction.created_at.timestamp(),
+                    end=max(now.timestamp(), bid_times[-1]),
+                    width=width,
+                    starting_price=float(auction.starting_price),
+                )
+                return loaded
+
+            self.stdout.write(f'{"method":<10}{"total s":>10}{"load s":>10}{"compute s":>12}')
+            for method in ('python', 'numpy'):
+                totals, loads = [], []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    if method == 'python':
+                        python_series(auction, width)
+                        loaded = time.perf_counter()
+                    else:
+                        loaded = run_numpy()
+                    finished = time.perf_counter()
+                    totals.append(finished - started)
+                    loads.append(loaded - started)
+                best = min(range(len(totals)), key=totals.__getitem__)
+                compute = totals[best] - loads[best]
+                load = '-' if method == 'python' else f'{loads[best]:.2f}'
+                compute_col = '-' if method == 'python' else f'{compute:.3f}'
+                self.stdout.write(f'{method:<10}{totals[best]:>10.2f}{load:>10}{compute_col:>12}')
+
+            transaction.set_rollback(True)
@@ -0,0 +1,24 @@
+"""
+Management command to fold new engagement events into the hourly and
+daily rollup tables read by the seller dashboard.
+Run: python manage.py rollup_engagement [--rebuild]
+
+Meant to run from cron every few minutes; each run only recomputes the
+buckets touched by events logged since the previous one.
+"""
+from django.core.management.base import BaseCommand
+
+from analytics import events
+from analytics.rollups import run_rollups
+
+
+class Command(BaseCommand):
+    help = 'Aggregate the engagement event log into per-auction and per-seller rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Drop the rollups and recompute them from the full log')
+
+    def handle(self, *args, **options):
+        events.flush()
+        folded = run_rollups(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {folded} event(s).'))
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auctions', '0006_auction_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuctionEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('bids', models.PositiveIntegerField(default=0)),
+                ('watches', models.PositiveIntegerField(default=0)),
+                ('unwatches', models.PositiveIntegerField(default=0)),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('bid_volume', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement', to='auctions.auction')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seller', 'period', 'bucket'], name='analytics_a_seller__82a1d6_idx')],
+                'unique_together': {('period', 'bucket', 'auction')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EngagementEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('VIEW', 'View'), ('BID', 'Bid'), ('WATCH', 'Watch'), ('UNWATCH', 'Unwatch'), ('IMPRESSION', 'Search impression')], max_length=12)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement_events', to='auctions.auction')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['occurred_at'], name='analytics_e_occurre_695e53_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SellerEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('bids', models.PositiveIntegerField(default=0)),
+                ('watches', models.PositiveIntegerField(default=0)),
+                ('unwatches', models.PositiveIntegerField(default=0)),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('bid_volume', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('period', 'bucket', 'seller')},
+            },
+        ),
+    ]
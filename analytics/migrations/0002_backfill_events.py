@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 21:05
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_events(apps, schema_editor):
+    """Seed the log from existing bids, watchlist rows and view counters."""
+    Auction = apps.get_model('auctions', 'Auction')
+    Bid = apps.get_model('auctions', 'Bid')
+    Watchlist = apps.get_model('watchlist', 'Watchlist')
+    EngagementEvent = apps.get_model('analytics', 'EngagementEvent')
+
+    def write(events):
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) == BATCH_SIZE:
+                EngagementEvent.objects.bulk_create(batch)
+                batch = []
+        EngagementEvent.objects.bulk_create(batch)
+
+    write(
+        EngagementEvent(kind='BID', auction_id=auction_id, seller_id=seller_id, user_id=user_id,
+                        amount=amount, occurred_at=timestamp)
+        for auction_id, seller_id, user_id, amount, timestamp in Bid.objects.values_list(
+            'auction_id', 'auction__owner_id', 'user_id', 'amount', 'timestamp'
+        ).order_by('timestamp').iterator()
+    )
+    write(
+        EngagementEvent(kind='WATCH', auction_id=auction_id, seller_id=seller_id, user_id=user_id,
+                        occurred_at=created_at)
+        for auction_id, seller_id, user_id, created_at in Watchlist.objects.values_list(
+            'auction_id', 'auction__owner_id', 'user_id', 'created_at'
+        ).order_by('created_at').iterator()
+    )
+    # Per-view times were never stored; the historic total lands on the creation date
+    write(
+        EngagementEvent(kind='VIEW', auction_id=auction_id, seller_id=seller_id, quantity=view_count,
+                        occurred_at=created_at)
+        for auction_id, seller_id, view_count, created_at in Auction.objects.filter(view_count__gt=0).values_list(
+            'id', 'owner_id', 'view_count', 'created_at'
+        ).iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('watchlist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+from django.db import models
+from django.utils import timezone
+from auctions.models import Auction
+from users.models import User
+
+
+class EngagementEvent(models.Model):
+    """
+    Append-only log of buyer engagement with an auction.
+
+    Rows are written in batches by analytics.events and never updated;
+    dashboards read the rollup tables below instead of this log.
+    """
+    VIEW = "VIEW"
+    BID = "BID"
+    WATCH = "WATCH"
+    UNWATCH = "UNWATCH"
+    IMPRESSION = "IMPRESSION"
+
+    KIND_CHOICES = [
+        (VIEW, "View"),
+        (BID, "Bid"),
+        (WATCH, "Watch"),
+        (UNWATCH, "Unwatch"),
+        (IMPRESSION, "Search impression"),
+    ]
+
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name="engagement_events")
+    # Denormalised from auction.owner so seller rollups need no join
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    amount = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True)
+    # Events stand for this many occurrences (historic view counts are
+    # backfilled as one event per auction)
+    quantity = models.PositiveIntegerField(default=1)
+    occurred_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["occurred_at"])]
+
+    def __str__(self):
+        return f"{self.kind} on auction {self.auction_id} at {self.occurred_at}"
+
+
+class EngagementRollup(models.Model):
+    """Per-bucket engagement totals, rebuilt from EngagementEvent by analytics.rollups."""
+    HOUR = "hour"
+    DAY = "day"
+
+    PERIOD_CHOICES = [
+        (HOUR, "Hourly"),
+        (DAY, "Daily"),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    bids = models.PositiveIntegerField(default=0)
+    watches = models.PositiveIntegerField(default=0)
+    unwatches = models.PositiveIntegerField(default=0)
+    impressions = models.PositiveIntegerField(default=0)
+    bid_volume = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class AuctionEngagement(EngagementRollup):
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name="engagement")
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        unique_together = ("period", "bucket", "auction")
+        indexes = [models.Index(fields=["seller", "period", "bucket"])]
+
+    def __str__(self):
+        return f"Auction {self.auction_id} {self.period} {self.bucket}"
+
+
+class SellerEngagement(EngagementRollup):
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="engagement")
+
+    class Meta:
+        unique_together = ("period", "bucket", "seller")
+
+    def __str__(self):
+        return f"Seller {self.seller_id} {self.period} {self.bucket}"
+
+
+class RollupState(models.Model):
+    """Singleton: the last EngagementEvent id folded into the rollups."""
+    last_event_id = models.BigIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def get_state(cls):
+        """Get or create the singleton state row."""
+        state, _ = cls.objects.get_or_create(pk=1)
+        return state
+
+    def __str__(self):
+        return f"Rolled up to event {self.last_event_id}"
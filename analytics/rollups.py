@@ -0,0 +1,105 @@
+"""
+Fold the engagement event log into hourly and daily rollup tables.
+
+Each run picks up the events added since ``RollupState.last_event_id``
+and recomputes every bucket from the earliest of them onwards, per
+auction and per seller, with one grouped query per table and period.
+Rows are upserted, so a run is idempotent and late events (or a
+``rebuild``) simply correct the buckets they fall in. Events normally
+arrive in time order, so a regular run only touches the current hour
+and day.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import AuctionEngagement, EngagementEvent, EngagementRollup, RollupState, SellerEngagement
+
+# period -> (SQL truncation, fields zeroed to find a bucket's start)
+PERIODS = {
+    EngagementRollup.HOUR: (TruncHour, {'minute': 0, 'second': 0, 'microsecond': 0}),
+    EngagementRollup.DAY: (TruncDay, {'hour': 0, 'minute': 0, 'second': 0, 'microsecond': 0}),
+}
+
+COUNTED_KINDS = {
+    'views': EngagementEvent.VIEW,
+    'bids': EngagementEvent.BID,
+    'watches': EngagementEvent.WATCH,
+    'unwatches': EngagementEvent.UNWATCH,
+    'impressions': EngagementEvent.IMPRESSION,
+}
+
+ROLLUP_FIELDS = [*COUNTED_KINDS, 'bid_volume', 'updated_at']
+
+
+def _totals():
+    totals = {
+        name: Coalesce(Sum('quantity', filter=Q(kind=kind)), 0)
+        for name, kind in COUNTED_KINDS.items()
+    }
+    totals['bid_volume'] = Coalesce(
+        Sum('amount', filter=Q(kind=EngagementEvent.BID)),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+    return totals
+
+
+def _rollup(model, group_by, events, period, trunc):
+    now = timezone.now()
+    rows = (
+        events.annotate(bucket=trunc('occurred_at'))
+        .values('bucket', *group_by)
+        .annotate(**_totals())
+        .order_by()
+    )
+    objs = [model(period=period, updated_at=now, **row) for row in rows]
+    model.objects.bulk_create(
+        objs,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['period', 'bucket', group_by[0]],
+        update_fields=ROLLUP_FIELDS,
+    )
+    return len(objs)
+
+
+def run_rollups(rebuild=False):
+    """Bring the rollup tables up to date; returns the number of events folded in."""
+    with transaction.atomic():
+        state = RollupState.get_state()
+        if rebuild:
+            AuctionEngagement.objects.all().delete()
+            SellerEngagement.objects.all().delete()
+            state.last_event_id = 0
+
+        new = EngagementEvent.objects.filter(id__gt=state.last_event_id).aggregate(
+            last_id=Max('id'), since=Min('occurred_at')
+        )
+        if new['last_id'] is None:
+            return 0
+
+        folded = EngagementEvent.objects.filter(id__gt=state.last_event_id, id__lte=new['last_id']).count()
+        for period, (trunc, floor) in PERIODS.items():
+            # Whole buckets are recomputed, so start at the bucket boundary
+            start = timezone.localtime(new['since']).replace(**floor)
+            events = EngagementEvent.objects.filter(occurred_at__gte=start, id__lte=new['last_id'])
+            _rollup(AuctionEngagement, ['auction_id', 'seller_id'], events, period, trunc)
+            _rollup(SellerEngagement, ['seller_id'], events, period, trunc)
+
+        state.last_event_id = new['last_id']
+        state.last_run_at = timezone.now()
+        state.save()
+    return folded
+
+
+def seller_totals(seller):
+    """All-time engagement totals for a seller, summed from the daily rollups."""
+    totals = SellerEngagement.objects.filter(seller=seller, period=EngagementRollup.DAY).aggregate(
+        **{name: Coalesce(Sum(name), 0) for name in COUNTED_KINDS}
+    )
+    totals['watchers'] = totals['watches'] - totals['unwatches']
+    return totals
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from auctions.models import Auction
+from users.models import User
+
+
+class EngagementRollupTests(TestCase):
+    """Tests for the engagement event log and its rollups."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Tracked Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() + timedelta(days=1),
+            owner=self.seller
+        )
+    
+    def test_buffered_events_bulk_insert(self):
+        """Test buffered events are held until flushed, then written in one insert."""
+        from unittest import mock
+        from django.test import override_settings
+        from analytics import events
+        from analytics.models import EngagementEvent
+        
+        with override_settings(ANALYTICS_FLUSH_INTERVAL=60), \
+                mock.patch('analytics.events._flusher.start'):
+            for _ in range(3):
+                events.record(EngagementEvent.VIEW, self.auction, self.buyer)
+            self.assertEqual(events.pending(), 3)
+            self.assertFalse(EngagementEvent.objects.exists())
+            
+            with self.assertNumQueries(1):
+                self.assertEqual(events.flush(), 3)
+        
+        self.assertEqual(EngagementEvent.objects.filter(seller=self.seller).count(), 3)
+    
+    def test_site_actions_are_logged(self):
+        """Test views, bids and watchlist changes append events."""
+        from analytics.models import EngagementEvent
+        from watchlist.services import add_to_watchlist, remove_from_watchlist
+        
+        self.client.login(username='buyer', password='testpass123')
+        self.client.get(f'/auctions/{self.auction.id}/')
+        self.client.post(f'/auctions/{self.auction.id}/', {'amount': '150.00'})
+        add_to_watchlist(self.buyer, self.auction)
+        add_to_watchlist(self.buyer, self.auction)
+        remove_from_watchlist(self.buyer, self.auction)
+        
+        kinds = list(EngagementEvent.objects.order_by('id').values_list('kind', flat=True))
+        self.assertEqual(kinds, ['VIEW', 'BID', 'WATCH', 'UNWATCH'])
+        self.assertEqual(EngagementEvent.objects.get(kind='BID').amount, Decimal('150.00'))
+    
+    def test_rollups_aggregate_by_hour_and_day(self):
+        """Test rollups total events per bucket and pick up late events on rerun."""
+        from analytics.models import AuctionEngagement, EngagementEvent, SellerEngagement
+        from analytics.rollups import run_rollups, seller_totals
+        
+        hour = timezone.now().replace(minute=30, second=0, microsecond=0) - timedelta(hours=3)
+        
+        def log(kind, at, **extra):
+            EngagementEvent.objects.create(
+                kind=kind, auction=self.auction, seller=self.seller, occurred_at=at, **extra
+            )
+        
+        log(EngagementEvent.VIEW, hour, quantity=5)
+        log(EngagementEvent.BID, hour, amount=Decimal('150.00'))
+        log(EngagementEvent.BID, hour + timedelta(hours=1), amount=Decimal('175.00'))
+        log(EngagementEvent.WATCH, hour + timedelta(hours=1))
+        self.assertEqual(run_rollups(), 4)
+        
+        hourly = AuctionEngagement.objects.filter(period='hour').order_by('bucket')
+        self.assertEqual([(r.views, r.bids, r.watches) for r in hourly], [(5, 1, 0), (0, 1, 1)])
+        self.assertEqual(hourly[0].bucket, hour.replace(minute=0))
+        
+        # A late event lands in its original bucket; reruns do not double count
+        log(EngagementEvent.UNWATCH, hour + timedelta(minutes=5))
+        self.assertEqual(run_rollups(), 1)
+        self.assertEqual(run_rollups(), 0)
+        self.assertEqual(hourly.all()[0].unwatches, 1)
+        
+        self.assertEqual(SellerEngagement.objects.filter(period='hour').count(), 2)
+        totals = seller_totals(self.seller)
+        self.assertEqual((totals['views'], totals['bids'], totals['watchers']), (5, 2, 0))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AuctionCloseMode, AntiSnipingSettings, GlobalAuctionSettings
+from .models import AuctionCloseMode, AntiSnipingSettings, CloseShardLease, CloseWorker, GlobalAuctionSettings
 
 
 @admin.register(AuctionCloseMode)
@@ -31,3 +31,13 @@ class GlobalAuctionSettingsAdmin(admin.ModelAdmin):
         # Don't allow deletion
         return False
 
+
+@admin.register(CloseWorker)
+class CloseWorkerAdmin(admin.ModelAdmin):
+    list_display = ("name", "heartbeat_at", "started_at")
+
+
+@admin.register(CloseShardLease)
+class CloseShardLeaseAdmin(admin.ModelAdmin):
+    list_display = ("shard", "owner", "token", "expires_at", "acquired_at")
+    readonly_fields = ("token",)
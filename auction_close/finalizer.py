@@ -0,0 +1,214 @@
+"""
+Batch auction finalization.
+
+Closing an auction means: pick the winning bid, run the close pipeline
+(auction_close.pipeline: soft close, reserve), create the Invoice and
+Escrow for a sale, mark the auction inactive and tell the winner, the
+losing bidders and the seller. ``finalize_auctions``
+does this for many auctions at once, in chunks of FINALIZE_CHUNK_SIZE,
+each chunk in its own transaction:
+
+- winners for the whole chunk come from one ROW_NUMBER() window query
+- reserves and close modes are joined in; last bid times, commission
+  rules, existing invoices/escrows and bidders are one query each
+- commissions use the rule in force at each auction's end time
+- Invoice, Escrow and Notification rows are ``bulk_create``d
+- the auctions are closed with one UPDATE (AuctionQuerySet.set_active)
+- emails go out with one ``send_mass_mail`` after the chunk commits
+
+It is used by ``manage.py finalize_auctions`` (cron), the admin "end
+auctions" action and winner checkout (for auctions the cron has not
+reached yet).
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from auctions.models import Auction, Bid
+from commission.services import CommissionSchedule, commission_amount
+from escrow.models import Escrow
+from notifications.email_service import auction_lost_email, auction_won_email, auction_won_message
+from notifications.models import Notification
+from payments.models import Invoice
+from users.models import User
+
+from .pipeline import KEEP_OPEN, RESERVE_NOT_MET, SOLD, UNSOLD, CloseContext, run_close_pipeline
+from .utils import idle_window, is_soft_close
+
+FINALIZE_CHUNK_SIZE = 500
+
+
+def commission_rates(when=None):
+    """(buyer_percent, seller_percent) in force at ``when`` (default: now), or the defaults."""
+    return CommissionSchedule().rates_at(when or timezone.now())
+
+
+def due_auctions(now=None):
+    """
+    Active auctions past their end time.
+
+    Soft-close auctions are left open until their idle window has passed
+    (see auction_close.pipeline.keep_soft_close_open); normally the
+    soft-close engine closes them, this is the fallback.
+    """
+    now = now or timezone.now()
+    idle_since = now - idle_window()
+    recent_bid = Bid.objects.filter(auction=OuterRef('pk'), timestamp__gt=idle_since)
+    return Auction.objects.filter(is_active=True, end_time__lte=now).exclude(
+        Q(close_mode__mode='SOFT') & (Q(end_time__gt=idle_since) | Exists(recent_bid))
+    )
+
+
+def winning_bids(auction_ids):
+    """{auction_id: Bid} for the highest bid on each auction, in one query."""
+    ranked = (
+        Bid.objects.filter(auction_id__in=auction_ids)
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=[F('auction_id')],
+            order_by=[F('amount').desc(), F('timestamp').desc()],
+        ))
+        .filter(rank=1)
+        .select_related('user')
+    )
+    return {bid.auction_id: bid for bid in ranked}
+
+
+def finalize_auctions(auctions=None, now=None, chunk_size=FINALIZE_CHUNK_SIZE, force=False, fence=None):
+    """
+    Finalize ``auctions`` (default: every due auction); returns counts.
+
+    Auctions that are already closed are still invoiced if they have a
+    winner and no invoice yet, but nobody is notified twice. ``force``
+    closes soft-close auctions even if bidding is still going on.
+    ``fence`` is called inside each chunk's transaction before anything is
+    written; when it returns False the run stops (auction_close.leases).
+    """
+    if auctions is None:
+        auctions = due_auctions(now)
+    ids = list(auctions.order_by('end_time', 'pk').values_list('pk', flat=True))
+
+    totals = {'closed': 0, 'invoiced': 0, 'reserve_not_met': 0, 'unsold': 0, 'kept_open': 0}
+    for start in range(0, len(ids), chunk_size):
+        with transaction.atomic():
+            if fence is not None and not fence():
+                break
+            result = _finalize_chunk(ids[start:start + chunk_size], force, now)
+        for key, value in result.items():
+            totals[key] += value
+    return totals
+
+
+def _finalize_chunk(ids, force=False, now=None):
+    # Row locks keep a concurrent run (or a checkout) from finalizing the same auctions
+    auctions = list(
+        Auction.objects.filter(pk__in=ids)
+        .select_related('owner', 'reserve', 'close_mode')
+        .select_for_update(of=('self',))
+    )
+    winners = winning_bids(ids)
+    last_bid_at = {}
+    if any(is_soft_close(auction) for auction in auctions):
+        last_bid_at = dict(
+            Bid.objects.filter(auction_id__in=ids).values('auction_id')
+            .annotate(last=Max('timestamp')).order_by().values_list('auction_id', 'last')
+        )
+    invoiced = set(Invoice.objects.filter(auction_id__in=ids).values_list('auction_id', flat=True))
+    escrowed = set(Escrow.objects.filter(auction_id__in=ids).values_list('auction_id', flat=True))
+    schedule = CommissionSchedule()
+
+    result = {'closed': 0, 'invoiced': 0, 'reserve_not_met': 0, 'unsold': 0, 'kept_open': 0}
+    counted = {UNSOLD: 'unsold', RESERVE_NOT_MET: 'reserve_not_met', KEEP_OPEN: 'kept_open'}
+    closing, invoices, escrows, notifications, emails = [], [], [], [], []
+    sold = {}
+
+    for auction in auctions:
+        context = CloseContext(
+            auction,
+            winning_bid=winners.get(auction.pk),
+            last_bid_at=last_bid_at.get(auction.pk),
+            reserve=getattr(auction, 'reserve', None),
+            force=force,
+            now=now,
+        )
+        outcome = run_close_pipeline(context)
+        if outcome in counted:
+            result[counted[outcome]] += 1
+        if outcome == KEEP_OPEN:
+            continue
+        if auction.is_active:
+            closing.append(auction)
+        if outcome != SOLD:
+            continue
+
+        bid = context.winning_bid
+        sold[auction.pk] = bid
+        # Messages quote current_price; make sure it is the winning amount
+        auction.current_price = bid.amount
+        if auction.pk not in invoiced:
+            buyer_percent, seller_percent = schedule.rates_at(auction.end_time)
+            invoices.append(Invoice(
+                auction=auction,
+                buyer=bid.user,
+                seller=auction.owner,
+                amount=bid.amount,
+                buyer_commission=commission_amount(bid.amount, buyer_percent),
+                seller_commission=commission_amount(bid.amount, seller_percent),
+                transport_charge=Decimal('0.00'),  # Set later with shipping
+                status='PENDING',
+            ))
+        if auction.pk not in escrowed:
+            escrows.append(Escrow(auction=auction, buyer=bid.user, seller=auction.owner, status='PENDING_PAYMENT'))
+
+    Invoice.objects.bulk_create(invoices)
+    Escrow.objects.bulk_create(escrows)
+    result['invoiced'] = len(invoices)
+
+    if closing:
+        closing_ids = [auction.pk for auction in closing]
+        result['closed'] = Auction.objects.filter(pk__in=closing_ids).set_active(False)
+
+        bidders = {}
+        for auction_id, user_id in Bid.objects.filter(auction_id__in=closing_ids).values_list(
+            'auction_id', 'user_id'
+        ).distinct():
+            bidders.setdefault(auction_id, set()).add(user_id)
+        users = {
+            user.pk: user
+            for user in User.objects.filter(
+                pk__in={user_id for bidder_ids in bidders.values() for user_id in bidder_ids}
+            )
+        }
+
+        for auction in closing:
+            notifications.append(Notification(
+                user=auction.owner,
+                auction=auction,
+                message=f'Your auction "{auction.title}" has ended.',
+            ))
+            bid = sold.get(auction.pk)
+            if bid is None:
+                continue
+            winner = bid.user
+            notifications.append(Notification(user=winner, auction=auction, message=auction_won_message(auction)))
+            if winner.email:
+                emails.append((*auction_won_email(winner, auction), settings.DEFAULT_FROM_EMAIL, [winner.email]))
+            for user_id in bidders.get(auction.pk, ()):
+                loser = users[user_id]
+                if user_id != winner.pk and loser.email:
+                    emails.append((
+                        *auction_lost_email(loser, auction, winner.username),
+                        settings.DEFAULT_FROM_EMAIL,
+                        [loser.email],
+                    ))
+
+        Notification.objects.bulk_create(notifications)
+        if emails:
+            transaction.on_commit(lambda: send_mass_mail(emails, fail_silently=True))
+
+    return result
@@ -0,0 +1,141 @@
+"""
+Sharded close workers.
+
+One ``finalize_auctions`` cron closes every auction. To spread closing
+over several processes or hosts, auctions are split into
+CLOSE_SHARD_COUNT shards by ``id % CLOSE_SHARD_COUNT`` and each shard is
+leased to one worker at a time (CloseShardLease rows, one per shard):
+
+- every step a worker heartbeats (CloseWorker) and renews its leases for
+  CLOSE_LEASE_SECONDS; a lease it failed to renew in time is lost
+- it aims for its fair share, ceil(shards / live workers): it claims free
+  or expired leases up to that and gives back the surplus when more
+  workers come up, so shards move off crashed workers within one lease
+  period and spread out again as workers join
+- claiming is a conditional UPDATE (free or expired only) that bumps the
+  lease ``token``, so two workers can never both win the same shard
+- it then closes due auctions in the shards it holds, with a fence that
+  re-checks owner and token inside each finalizer chunk's transaction, so
+  a worker that stalled past its lease (GC pause, lost network) and was
+  taken over writes nothing
+
+The finalizer itself only closes active auctions under a row lock, so
+even a lease that runs out half-way through a chunk cannot close or
+invoice an auction twice; the leases keep workers from contending for
+the same rows in the first place. Run the workers with
+``manage.py run_close_worker`` instead of the finalize_auctions cron.
+Changing CLOSE_SHARD_COUNT needs all workers restarted together.
+"""
+import math
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from .finalizer import FINALIZE_CHUNK_SIZE, due_auctions, finalize_auctions
+from .models import CloseShardLease, CloseWorker
+
+
+def shard_count():
+    return getattr(settings, 'CLOSE_SHARD_COUNT', 16)
+
+
+def lease_duration():
+    return timedelta(seconds=getattr(settings, 'CLOSE_LEASE_SECONDS', 30))
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def in_shards(queryset, shards, count=None):
+    """Restrict an Auction queryset to the given shards."""
+    return queryset.alias(shard=Mod('pk', count or shard_count())).filter(shard__in=list(shards))
+
+
+class ShardWorker:
+    """One close worker: holds shard leases and closes their due auctions."""
+
+    def __init__(self, name=None, shards=None, duration=None):
+        self.name = name or default_worker_name()
+        self.shards = shards or shard_count()
+        self.duration = duration or lease_duration()
+        # shard -> lease token while we believe we hold it
+        self.held = {}
+
+    def step(self, now=None, chunk_size=FINALIZE_CHUNK_SIZE):
+        """Heartbeat, then close due auctions in the shards held; returns counts."""
+        now = now or timezone.now()
+        self.heartbeat(now)
+        return self.close_due(now, chunk_size)
+
+    def heartbeat(self, now):
+        """Renew, rebalance and claim leases; returns the shards held."""
+        expires_at = now + self.duration
+        CloseWorker.objects.update_or_create(name=self.name, defaults={'heartbeat_at': now})
+        CloseShardLease.objects.bulk_create(
+            [CloseShardLease(shard=shard) for shard in range(self.shards)], ignore_conflicts=True
+        )
+
+        if self.held:
+            mine = CloseShardLease.objects.filter(owner=self.name, shard__in=list(self.held), expires_at__gt=now)
+            mine.update(expires_at=expires_at)
+            renewed = dict(mine.values_list('shard', 'token'))
+            self.held = {shard: token for shard, token in self.held.items() if renewed.get(shard) == token}
+
+        live = CloseWorker.objects.filter(heartbeat_at__gt=now - self.duration).count()
+        target = math.ceil(self.shards / max(live, 1))
+        if len(self.held) > target:
+            for shard in sorted(self.held)[target:]:
+                CloseShardLease.objects.filter(shard=shard, owner=self.name, token=self.held.pop(shard)).update(
+                    owner='', expires_at=None
+                )
+        elif len(self.held) < target:
+            claimable = (
+                CloseShardLease.objects.filter(shard__lt=self.shards)
+                .filter(Q(owner='') | Q(expires_at__isnull=True) | Q(expires_at__lte=now))
+                .exclude(shard__in=list(self.held))
+                .values_list('shard', flat=True)
+            )
+            for shard in list(claimable[:target - len(self.held)]):
+                self._claim(shard, now, expires_at)
+        return sorted(self.held)
+
+    def _claim(self, shard, now, expires_at):
+        won = CloseShardLease.objects.filter(
+            Q(owner='') | Q(expires_at__isnull=True) | Q(expires_at__lte=now), shard=shard
+        ).update(owner=self.name, token=F('token') + 1, expires_at=expires_at, acquired_at=now)
+        if won:
+            self.held[shard] = CloseShardLease.objects.values_list('token', flat=True).get(shard=shard)
+
+    def holds(self, shard, now=None):
+        """Whether our lease on ``shard`` is still current in the database."""
+        now = max(now or timezone.now(), timezone.now())
+        token = self.held.get(shard)
+        return token is not None and CloseShardLease.objects.filter(
+            shard=shard, owner=self.name, token=token, expires_at__gt=now
+        ).exists()
+
+    def close_due(self, now, chunk_size=FINALIZE_CHUNK_SIZE):
+        totals = {}
+        for shard in sorted(self.held):
+            result = finalize_auctions(
+                in_shards(due_auctions(now), [shard], self.shards),
+                now=now,
+                chunk_size=chunk_size,
+                fence=lambda shard=shard: self.holds(shard, now),
+            )
+            for key, value in result.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def release(self):
+        """Give back every lease and leave, e.g. on a clean shutdown."""
+        for shard, token in self.held.items():
+            CloseShardLease.objects.filter(shard=shard, owner=self.name, token=token).update(owner='', expires_at=None)
+        self.held = {}
+        CloseWorker.objects.filter(name=self.name).delete()
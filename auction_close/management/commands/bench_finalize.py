@@ -0,0 +1,118 @@
+"""
+Management command to measure auction finalization throughput.
+Run: python manage.py bench_finalize --auctions 10000
+
+Creates ended auctions with a few bids each (a share of them with an
+unmet reserve) inside a transaction that is rolled back at the end, so
+the database is left untouched. Closes them once with the batch
+finalizer and once with the old one-auction-at-a-time flow, and reports
+auctions per second for each. Emails go to the in-memory backend.
+"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from auction_close.finalizer import FINALIZE_CHUNK_SIZE, commission_rates, finalize_auctions
+from auctions.models import Auction, Bid
+from escrow.models import Escrow
+from notifications.email_service import send_auction_lost_notification, send_auction_won_notification
+from notifications.models import Notification
+from payments.models import Invoice
+from reserve_price.models import ReservePrice
+from users.models import User
+
+
+def finalize_one_by_one(auctions):
+    """The previous flow: per-auction leader, invoice, escrow and notification queries."""
+    for auction in auctions:
+        highest_bid = auction.bids.order_by('-amount', '-timestamp').first()
+        auction.is_active = False
+        auction.save(update_fields=['is_active'])
+        Notification.objects.create(user=auction.owner, auction=auction, message=f'Your auction "{auction.title}" has ended.')
+        if not highest_bid:
+            continue
+        reserve = ReservePrice.objects.filter(auction=auction).first()
+        if reserve and highest_bid.amount < reserve.amount:
+            continue
+        winner = highest_bid.user
+        buyer_percent, seller_percent = commission_rates()
+        Invoice.objects.create(
+            auction=auction, buyer=winner, seller=auction.owner, amount=highest_bid.amount,
+            buyer_commission=(highest_bid.amount * buyer_percent / 100).quantize(Decimal('0.01')),
+            seller_commission=(highest_bid.amount * seller_percent / 100).quantize(Decimal('0.01')),
+        )
+        Escrow.objects.create(auction=auction, buyer=winner, seller=auction.owner)
+        send_auction_won_notification(winner, auction)
+        for user_id in set(auction.bids.exclude(user=winner).values_list('user', flat=True)):
+            send_auction_lost_notification(User.objects.get(id=user_id), auction, winner.username)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark batch auction finalization vs the per-auction flow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--auctions', type=int, default=10000, help='Ended auctions to close (default: 10000)')
+        parser.add_argument('--bids', type=int, default=3, help='Bids per auction (default: 3)')
+        parser.add_argument('--chunk-size', type=int, default=FINALIZE_CHUNK_SIZE)
+        parser.add_argument('--skip-baseline', action='store_true', help='Only time the batch finalizer')
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def handle(self, *args, **options):
+        methods = [('batch', lambda ids: finalize_auctions(
+            Auction.objects.filter(pk__in=ids), chunk_size=options['chunk_size']
+        ))]
+        if not options['skip_baseline']:
+            methods.append(('per-auction', lambda ids: finalize_one_by_one(
+                Auction.objects.filter(pk__in=ids).select_related('owner')
+            )))
+
+        self.stdout.write(f'{"method":<14}{"auctions":>10}{"seconds":>10}{"auctions/s":>12}')
+        for method, run in methods:
+            with transaction.atomic():
+                ids = self._create_auctions(options['auctions'], options['bids'])
+                started = time.perf_counter()
+                # on_commit email callbacks never fire inside this outer transaction
+                run(ids)
+                elapsed = time.perf_counter() - started
+                closed = Auction.objects.filter(pk__in=ids, is_active=False).count()
+                self.stdout.write(f'{method:<14}{closed:>10}{elapsed:>10.2f}{closed / elapsed:>12.0f}')
+                transaction.set_rollback(True)
+
+    def _create_auctions(self, count, bids_per_auction):
+        rng = random.Random(42)
+        stamp = time.time_ns()
+        seller = User.objects.create_user(username=f'bench_finalize_{stamp}', email='seller@example.com')
+        bidders = [
+            User.objects.create_user(username=f'bench_finalize_{stamp}_{i}', email=f'bidder{i}@example.com')
+            for i in range(20)
+        ]
+        end_time = timezone.now() - timedelta(minutes=5)
+        auctions = Auction.objects.bulk_create([
+            Auction(
+                title=f'Bench auction {i}',
+                description='Synthetic',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=end_time,
+                owner=seller,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+
+        bids, reserves = [], []
+        for auction in auctions:
+            amount = Decimal('100.00')
+            for _ in range(bids_per_auction):
+                amount += Decimal(rng.randint(1, 50))
+                bids.append(Bid(auction=auction, user=rng.choice(bidders), amount=amount))
+            if rng.random() < 0.1:
+                reserves.append(ReservePrice(auction=auction, amount=amount + 100))
+        Bid.objects.bulk_create(bids, batch_size=1000)
+        ReservePrice.objects.bulk_create(reserves, batch_size=1000)
+        return [auction.pk for auction in auctions]
@@ -0,0 +1,31 @@
+"""
+Management command to close every auction past its end time.
+Run this via cron job: python manage.py finalize_auctions
+
+Example cron entry (every minute):
+* * * * * cd /path/to/project && python manage.py finalize_auctions
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from auction_close.finalizer import FINALIZE_CHUNK_SIZE, due_auctions, finalize_auctions
+
+
+class Command(BaseCommand):
+    help = 'Close ended auctions: pick winners, apply reserves, create invoices/escrows and notify'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many auctions are due')
+        parser.add_argument('--chunk-size', type=int, default=FINALIZE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['dry_run']:
+            self.stdout.write(f'{due_auctions(now).count()} auction(s) due for closing')
+            return
+
+        result = finalize_auctions(now=now, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed {result['closed']} auction(s): {result['invoiced']} invoiced, "
+            f"{result['reserve_not_met']} reserve not met, {result['unsold']} without bids"
+        ))
@@ -0,0 +1,47 @@
+"""
+Management command running one sharded close worker.
+Run as a long-lived process on each host: python manage.py run_close_worker
+
+Workers share the auctions between them by leasing shards
+(auction_close.leases): start or stop as many as needed and the shards
+rebalance within CLOSE_LEASE_SECONDS. Replaces the finalize_auctions cron.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from auction_close.finalizer import FINALIZE_CHUNK_SIZE
+from auction_close.leases import ShardWorker
+
+
+class Command(BaseCommand):
+    help = 'Close ended auctions in the shards this worker holds a lease on'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', help='Worker name (default: host:pid)')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between steps (default: 5)')
+        parser.add_argument('--chunk-size', type=int, default=FINALIZE_CHUNK_SIZE)
+        parser.add_argument('--once', action='store_true', help='Run a single step, then release the leases')
+
+    def handle(self, *args, **options):
+        worker = ShardWorker(name=options['name'])
+        self.stdout.write(f'Close worker {worker.name} ({worker.shards} shards, lease {worker.duration.total_seconds():.0f}s)')
+        try:
+            while True:
+                held = sorted(worker.held)
+                result = worker.step(timezone.now(), chunk_size=options['chunk_size'])
+                if sorted(worker.held) != held:
+                    self.stdout.write(f'  Holding shards {sorted(worker.held)}')
+                if result.get('closed'):
+                    self.stdout.write(
+                        f"  Closed {result['closed']} auction(s): {result['invoiced']} invoiced, "
+                        f"{result['reserve_not_met']} reserve not met, {result['unsold']} without bids"
+                    )
+                if options['once']:
+                    break
+                close_old_connections()
+                time.sleep(options['interval'])
+        finally:
+            worker.release()
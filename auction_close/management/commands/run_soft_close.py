@@ -0,0 +1,33 @@
+"""
+Management command running the soft-close engine.
+Run as a long-lived process: python manage.py run_soft_close
+
+Announces "going once" / "going twice" to auction pages over WebSockets
+and closes soft-close auctions once bidding has been idle for
+SOFT_CLOSE_IDLE_SECONDS. Run a single instance; finalize_auctions closes
+any soft-close auction it misses (e.g. while it is down).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from auction_close.soft_close import SoftCloseRunner
+
+
+class Command(BaseCommand):
+    help = 'Run the in-memory soft-close timers (going once / going twice / sold)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls (default: 1)')
+
+    def handle(self, *args, **options):
+        runner = SoftCloseRunner()
+        self.stdout.write(f'Soft-close engine running (idle window {runner.engine.idle.total_seconds():.0f}s)')
+        while True:
+            closed = runner.step(timezone.now())
+            for auction_id in sorted(closed):
+                self.stdout.write(f'  Closed auction {auction_id}')
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_close', '0002_add_anti_sniping_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CloseShardLease',
+            fields=[
+                ('shard', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('owner', models.CharField(blank=True, default='', max_length=100)),
+                ('token', models.PositiveBigIntegerField(default=0)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('acquired_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['shard'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CloseWorker',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('heartbeat_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
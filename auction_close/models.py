@@ -99,3 +99,34 @@ class GlobalAuctionSettings(models.Model):
         settings, _ = cls.objects.get_or_create(pk=1)
         return settings
 
+
+
+class CloseWorker(models.Model):
+    """A close worker process, kept alive by heartbeats (auction_close.leases)."""
+    name = models.CharField(max_length=100, primary_key=True)
+    heartbeat_at = models.DateTimeField()
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class CloseShardLease(models.Model):
+    """
+    Lease on one shard of auctions (``id % shard count == shard``).
+
+    Only the owner closes auctions in the shard while ``expires_at`` is in
+    the future; ``token`` goes up on every change of owner, so a worker
+    that lost its lease notices even if the same name comes back.
+    """
+    shard = models.PositiveIntegerField(primary_key=True)
+    owner = models.CharField(max_length=100, blank=True, default='')
+    token = models.PositiveBigIntegerField(default=0)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['shard']
+
+    def __str__(self):
+        return f"Shard {self.shard} → {self.owner or 'free'}"
@@ -0,0 +1,80 @@
+"""
+Explicit close pipeline.
+
+Decides what happens to an auction that is being closed. It replaces the
+post_save receivers that used to sit in auction_close.signals (soft
+close) and reserve_price.signals (reserve not met), which would have
+re-queried bids and the reserve on every Auction.save(). The pipeline
+only runs when an auction is actually closed (auction_close.finalizer),
+on a CloseContext that the caller fills with data it already loaded for
+the whole batch, so the steps themselves run no queries.
+
+Each step may set ``context.outcome``; the first one that does wins.
+"""
+from django.utils import timezone
+
+from .utils import idle_window, is_soft_close
+
+SOLD = 'SOLD'
+UNSOLD = 'UNSOLD'
+RESERVE_NOT_MET = 'RESERVE_NOT_MET'
+KEEP_OPEN = 'KEEP_OPEN'
+
+
+class CloseContext:
+    """What the pipeline knows about one auction being closed."""
+
+    def __init__(self, auction, winning_bid=None, last_bid_at=None, reserve=None, force=False, now=None):
+        self.auction = auction
+        self.now = now or timezone.now()
+        self.winning_bid = winning_bid
+        self.last_bid_at = last_bid_at
+        self.reserve = reserve
+        # Staff closing an auction by hand skip the soft-close check
+        self.force = force
+        self.outcome = None
+
+    @property
+    def is_sale(self):
+        return self.outcome == SOLD
+
+
+def keep_soft_close_open(context):
+    """
+    Soft-close auctions stay open until the idle window has passed since
+    end_time or the last bid (see auction_close.soft_close).
+    """
+    auction = context.auction
+    if context.force or not is_soft_close(auction):
+        return
+    last_activity = max(auction.end_time, context.last_bid_at or auction.end_time)
+    if last_activity + idle_window() > context.now:
+        context.outcome = KEEP_OPEN
+
+
+def require_bids(context):
+    if context.winning_bid is None:
+        context.outcome = UNSOLD
+
+
+def require_reserve(context):
+    """No sale when the winning bid is below the reserve price."""
+    if context.reserve is not None and context.winning_bid.amount < context.reserve.amount:
+        context.outcome = RESERVE_NOT_MET
+
+
+CLOSE_STEPS = [
+    keep_soft_close_open,
+    require_bids,
+    require_reserve,
+]
+
+
+def run_close_pipeline(context):
+    """Run CLOSE_STEPS on ``context`` and return its outcome."""
+    for step in CLOSE_STEPS:
+        step(context)
+        if context.outcome is not None:
+            return context.outcome
+    context.outcome = SOLD
+    return context.outcome
@@ -0,0 +1,169 @@
+"""
+Soft-close engine.
+
+A soft-close auction does not end at ``end_time``; it ends once nobody
+has bid for SOFT_CLOSE_IDLE_SECONDS after ``end_time`` or after the last
+bid, whichever is later. The idle window is announced in three stages
+like an auctioneer: "going once" after a third of the window, "going
+twice" after two thirds, then sold.
+
+``SoftCloseEngine`` keeps those deadlines in memory in a binary heap of
+``(when, auction_id, generation, stage)`` entries. A bid resets an
+auction by bumping its generation and pushing one new entry (O(log n));
+entries with an old generation are simply skipped when they surface, so
+nothing is ever searched for or removed from the middle of the heap.
+
+``SoftCloseRunner`` drives the engine from ``manage.py run_soft_close``:
+each step arms soft-close auctions whose end time has come, feeds it the
+bids placed since the previous step (by bid id, one indexed query),
+broadcasts stage changes to the auction's WebSocket group and closes the
+auctions that reached "sold" through the finalizer. Nothing is written
+until that final close; the close pipeline re-checks the last bid under
+a row lock, so a bid the runner has not seen yet keeps the auction open.
+After a restart the deadlines are rebuilt from end times and last bids.
+
+Bids are accepted during the idle window (bid_protection.validators uses
+auction_close.utils.in_soft_close_window), and auction pages pick up the
+stage broadcasts to show "going once" / "going twice".
+"""
+import heapq
+import itertools
+import logging
+from django.db.models import Max
+
+from auctions.models import Auction, Bid
+from auction_ws.utils import broadcast_auction_update
+
+from .utils import idle_window
+
+logger = logging.getLogger(__name__)
+
+GOING_ONCE = 'GOING_ONCE'
+GOING_TWICE = 'GOING_TWICE'
+SOLD = 'SOLD'
+
+# Fraction of the idle window after which each stage is announced
+STAGES = ((GOING_ONCE, 1 / 3), (GOING_TWICE, 2 / 3), (SOLD, 1))
+
+
+class SoftCloseEngine:
+    """In-memory idle timers for soft-close auctions."""
+
+    def __init__(self, idle=None):
+        self.idle = idle or idle_window()
+        self._heap = []
+        # auction_id -> (last activity, generation)
+        self._active = {}
+        self._generations = itertools.count()
+
+    def __len__(self):
+        return len(self._active)
+
+    def __contains__(self, auction_id):
+        return auction_id in self._active
+
+    def track(self, auction_id, last_activity):
+        """
+        (Re)start the idle window of ``auction_id`` at ``last_activity``.
+
+        Earlier activity than already known is ignored, so bids may be fed
+        in any order.
+        """
+        current = self._active.get(auction_id)
+        if current is not None and current[0] >= last_activity:
+            return False
+        generation = next(self._generations)
+        self._active[auction_id] = (last_activity, generation)
+        self._push(auction_id, last_activity, generation, 0)
+        if len(self._heap) > 2 * len(self._active) + 64:
+            self._compact()
+        return True
+
+    def forget(self, auction_id):
+        self._active.pop(auction_id, None)
+
+    def closes_at(self, auction_id):
+        return self._active[auction_id][0] + self.idle
+
+    def due(self, now):
+        """Pop every stage reached by ``now``: yields (auction_id, stage, closes_at)."""
+        while self._heap and self._heap[0][0] <= now:
+            _, auction_id, generation, stage = heapq.heappop(self._heap)
+            current = self._active.get(auction_id)
+            if current is None or current[1] != generation:
+                continue
+            name = STAGES[stage][0]
+            if stage + 1 < len(STAGES):
+                self._push(auction_id, current[0], generation, stage + 1)
+            yield auction_id, name, current[0] + self.idle
+
+    def _push(self, auction_id, last_activity, generation, stage):
+        when = last_activity + self.idle * STAGES[stage][1]
+        heapq.heappush(self._heap, (when, auction_id, generation, stage))
+
+    def _compact(self):
+        # Drop superseded entries once they outnumber the live ones
+        self._heap = [
+            entry for entry in self._heap
+            if entry[1] in self._active and self._active[entry[1]][1] == entry[2]
+        ]
+        heapq.heapify(self._heap)
+
+
+class SoftCloseRunner:
+    """Feeds a SoftCloseEngine from the database and acts on its deadlines."""
+
+    def __init__(self, engine=None):
+        self.engine = engine or SoftCloseEngine()
+        self.last_bid_id = None
+
+    def step(self, now):
+        """One polling round; returns the ids of auctions closed in it."""
+        from .finalizer import finalize_auctions
+
+        if self.last_bid_id is None:
+            self.last_bid_id = Bid.objects.aggregate(last=Max('id'))['last'] or 0
+        self._arm(now)
+        self._feed_bids()
+
+        stages = list(self.engine.due(now))
+        sold = [auction_id for auction_id, stage, _ in stages if stage == SOLD]
+        closed = set()
+        if sold:
+            finalize_auctions(Auction.objects.filter(pk__in=sold), now=now)
+            still_open = set(Auction.objects.filter(pk__in=sold, is_active=True).values_list('pk', flat=True))
+            closed = set(sold) - still_open
+            for auction_id in sold:
+                # Kept open by a bid not seen yet; _arm re-tracks it next step
+                self.engine.forget(auction_id)
+
+        for auction_id, stage, closes_at in stages:
+            if stage != SOLD or auction_id in closed:
+                self._broadcast(auction_id, stage, closes_at)
+        return closed
+
+    def _arm(self, now):
+        """Track soft-close auctions that have reached their end time."""
+        ended = (
+            Auction.objects.filter(is_active=True, close_mode__mode='SOFT', end_time__lte=now)
+            .annotate(last_bid_at=Max('bids__timestamp'))
+            .values_list('pk', 'end_time', 'last_bid_at')
+        )
+        for auction_id, end_time, last_bid_at in ended:
+            if auction_id not in self.engine:
+                self.engine.track(auction_id, max(end_time, last_bid_at or end_time))
+
+    def _feed_bids(self):
+        new_bids = Bid.objects.filter(id__gt=self.last_bid_id).order_by('id').values_list('id', 'auction_id', 'timestamp')
+        for bid_id, auction_id, timestamp in new_bids:
+            self.last_bid_id = bid_id
+            if auction_id in self.engine and self.engine.track(auction_id, timestamp):
+                self._broadcast(auction_id, 'OPEN', self.engine.closes_at(auction_id))
+
+    def _broadcast(self, auction_id, stage, closes_at):
+        try:
+            broadcast_auction_update(auction_id, {
+                'soft_close': {'stage': stage, 'closes_at': closes_at.isoformat()},
+            })
+        except Exception:
+            logger.exception('Could not broadcast soft-close stage for auction %s', auction_id)
@@ -1,19 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
 from django.utils import timezone
 
 def is_soft_close(auction):
     return hasattr(auction, "close_mode") and auction.close_mode.mode == "SOFT"
 
 
-def can_finalize_auction(auction, last_bid_time):
+def idle_window():
+    return timedelta(seconds=getattr(settings, 'SOFT_CLOSE_IDLE_SECONDS', 60))
+
+
+def soft_close_deadline(auction, last_bid_at=None):
     """
-    For SOFT close:
-    Auction finalizes only when bidding stops
+    When a soft-close auction stops taking bids: the idle window after
+    end_time or after the last bid, whichever is later.
     """
-    if not is_soft_close(auction):
-        return True
+    if last_bid_at is None:
+        last_bid_at = auction.bids.aggregate(last=Max('timestamp'))['last']
+    return max(auction.end_time, last_bid_at or auction.end_time) + idle_window()
+
 
-    if not last_bid_time:
-        return True
+def in_soft_close_window(auction, now=None):
+    """True while an open soft-close auction is past end_time but still taking bids."""
+    now = now or timezone.now()
+    if not auction.is_active or now < auction.end_time or not is_soft_close(auction):
+        return False
+    return now < soft_close_deadline(auction)
 
-    # If last bid was before end_time → finalize
-    return last_bid_time <= auction.end_time
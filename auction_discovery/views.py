@@ -1,14 +1,17 @@
 from django.shortcuts import render
 from django.utils import timezone
 from auctions.models import Auction, Category
+from auctions.search import search_auctions
+from auctions.pagination import paginate, wants_json, page_json_response
 from .forms import AuctionSearchForm
-from auction_status.utils import get_auction_status
 
 
 def discover_auctions(request):
     form = AuctionSearchForm(request.GET or None)
-    auctions = Auction.objects.all()
+    auctions = Auction.objects.select_related("category")
     categories = Category.objects.filter(is_active=True)
+    # Relevance when searching, otherwise newest first
+    ordering = ("-created_at", "-id")
 
     if form.is_valid():
         q = form.cleaned_data.get("q")
@@ -20,7 +23,8 @@ def discover_auctions(request):
         newest = form.cleaned_data.get("newest")
 
         if q:
-            auctions = auctions.filter(title__icontains=q)
+            auctions = search_auctions(auctions, q)
+            ordering = None
 
         if category:
             auctions = auctions.filter(category=category)
@@ -32,20 +36,25 @@ def discover_auctions(request):
             auctions = auctions.filter(current_price__lte=max_price)
 
         if live_only:
-            auctions = [a for a in auctions if get_auction_status(a) == "LIVE"]
+            auctions = auctions.live()
 
         if ending_soon:
-            auctions = auctions.filter(end_time__gte=timezone.now()).order_by("end_time")
+            auctions = auctions.filter(end_time__gte=timezone.now())
+            ordering = ("end_time", "id")
 
         if newest:
-            auctions = auctions.order_by("-created_at")
+            ordering = ("-created_at", "-id")
+
+    page = paginate(request, auctions, ordering)
+    if wants_json(request):
+        return page_json_response(page)
 
     return render(
         request,
         "auction_discovery/discover.html",
         {
             "form": form,
-            "auctions": auctions,
+            "auctions": page,
             "categories": categories
         }
     )
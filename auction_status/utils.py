@@ -1,6 +1,11 @@
 from django.utils import timezone
 
 def get_auction_status(auction):
+    # Already computed in SQL by Auction.objects.with_status()
+    annotated = getattr(auction, "status", None)
+    if annotated is not None:
+        return annotated
+
     now = timezone.now()
 
     # If schedule exists → check start time
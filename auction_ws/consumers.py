@@ -1,5 +1,6 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 import json
+from .presence import ajoin, aleave
 
 class AuctionUpdatesConsumer(AsyncWebsocketConsumer):
 
@@ -14,7 +15,13 @@ class AuctionUpdatesConsumer(AsyncWebsocketConsumer):
         )
         await self.accept()
 
+        # Live viewer count (cache only, no DB writes)
+        await ajoin(self.auction_id)
+        self.counted_viewer = True
+
     async def disconnect(self, close_code):
+        if getattr(self, "counted_viewer", False):
+            await aleave(self.auction_id)
         await self.channel_layer.group_discard(
             self.group_name,
             self.channel_name
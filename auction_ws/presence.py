@@ -0,0 +1,88 @@
+"""
+Live viewer counts per auction.
+
+Each WebSocket connection bumps a counter in the Django cache on connect
+and drops it on disconnect, so nothing touches the database. With a
+shared cache backend (Redis/Memcached) the counts are global across
+worker processes; with the default local-memory cache they are per
+process.
+
+The counts are approximate: a worker that dies without running
+``disconnect`` leaves its connections counted until the key expires,
+and idle keys are evicted after PRESENCE_TTL. Memory stays bounded to
+one small key per auction with live viewers.
+
+Changes are published to the auction group at most once every
+PRESENCE_PUBLISH_INTERVAL seconds. The first change in a window claims
+the window with ``cache.add`` and schedules one publish at its end, which
+reads the latest count, so bursts of connects collapse into one update.
+"""
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils import abroadcast_auction_update
+
+PRESENCE_TTL = getattr(settings, 'PRESENCE_TTL', 60 * 60)
+PRESENCE_PUBLISH_INTERVAL = getattr(settings, 'PRESENCE_PUBLISH_INTERVAL', 5)
+
+# Strong references to scheduled publishes so they are not garbage collected
+_pending_publishes = set()
+
+
+def _count_key(auction_id):
+    return f"presence:auction:{auction_id}"
+
+
+def _window_key(auction_id):
+    return f"presence:publish:{auction_id}"
+
+
+async def aviewer_count(auction_id):
+    return max(await cache.aget(_count_key(auction_id), 0), 0)
+
+
+async def ajoin(auction_id):
+    """Count a new viewer of the auction."""
+    key = _count_key(auction_id)
+    if not await cache.aadd(key, 1, PRESENCE_TTL):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            await cache.aset(key, 1, PRESENCE_TTL)
+        await cache.atouch(key, PRESENCE_TTL)
+    await _schedule_publish(auction_id)
+
+
+async def aleave(auction_id):
+    """Stop counting a viewer of the auction."""
+    key = _count_key(auction_id)
+    try:
+        if await cache.adecr(key) < 0:
+            await cache.aset(key, 0, PRESENCE_TTL)
+    except ValueError:
+        pass
+    await _schedule_publish(auction_id)
+
+
+async def _schedule_publish(auction_id):
+    if not await cache.aadd(_window_key(auction_id), 1, PRESENCE_PUBLISH_INTERVAL):
+        # A publish for this window is already scheduled (possibly elsewhere)
+        return
+
+    async def publish_later():
+        await asyncio.sleep(PRESENCE_PUBLISH_INTERVAL)
+        await publish_viewer_count(auction_id)
+
+    task = asyncio.ensure_future(publish_later())
+    _pending_publishes.add(task)
+    task.add_done_callback(_pending_publishes.discard)
+
+
+async def publish_viewer_count(auction_id):
+    await abroadcast_auction_update(
+        auction_id,
+        {"viewers": await aviewer_count(auction_id)}
+    )
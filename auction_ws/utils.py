@@ -1,12 +1,17 @@
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
-def broadcast_auction_update(auction_id, data):
+
+async def abroadcast_auction_update(auction_id, data):
     channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
+    await channel_layer.group_send(
         f"auction_{auction_id}",
         {
             "type": "auction_update",
             "data": data,
         }
     )
+
+
+def broadcast_auction_update(auction_id, data):
+    async_to_sync(abroadcast_auction_update)(auction_id, data)
@@ -1,45 +1,20 @@
 from django.contrib import admin
 from .models import Auction, Bid, ProxyBid, Category, AuctionImage
-from notifications.models import Notification
-from django.core.mail import send_mail
-from django.conf import settings
 
 
 def approve_auctions(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    queryset.set_active(True)
 approve_auctions.short_description = "Approve selected auctions"
 
 
 def block_auctions(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    queryset.set_active(False)
 block_auctions.short_description = "Block selected auctions"
 
 
 def end_auctions(modeladmin, request, queryset):
-    for auction in queryset:
-        if auction.is_active:
-            auction.is_active = False
-            auction.save()
-            # Notify winner
-            highest_bid = auction.bids.order_by('-amount', '-timestamp').first()
-            if highest_bid:
-                Notification.objects.create(
-                    user=highest_bid.user,
-                    auction=auction,
-                    message=f'Congratulations! You have won the auction "{auction.title}".'
-                )
-                send_mail(
-                    subject=f'You won the auction: {auction.title}',
-                    message=f'You have won the auction "{auction.title}". Please proceed to payment.',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[highest_bid.user.email],
-                )
-            # Notify seller
-            Notification.objects.create(
-                user=auction.owner,
-                auction=auction,
-                message=f'Your auction "{auction.title}" has ended.'
-            )
+    from auction_close.finalizer import finalize_auctions
+    finalize_auctions(queryset.filter(is_active=True), force=True)
 end_auctions.short_description = "End selected auctions and notify winner/seller"
 
 
@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate
+
+
+def repair_search_index(sender, using, **kwargs):
+    """Reinstall FTS triggers that a table rebuild during migrate may have dropped."""
+    from django.db import connections
+    from .search import ensure_search_index
+
+    connection = connections[using]
+    if 'auctions_auction' in connection.introspection.table_names():
+        ensure_search_index(connection)
+
+
+def release_category_count(sender, instance, **kwargs):
+    """Drop a deleted auction (including cascades) from its category counter."""
+    from .models import adjust_category_counts
+
+    category_id = instance.__dict__.get('_counted_category_id', instance._counter_key())
+    adjust_category_counts({category_id: -1})
 
 
 class AuctionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auctions'
+
+    def ready(self):
+        post_migrate.connect(repair_search_index, sender=self)
+        post_delete.connect(release_category_count, sender=self.get_model('Auction'))
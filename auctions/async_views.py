@@ -0,0 +1,133 @@
+"""
+Async implementations of the hot auction endpoints.
+
+These run on the ASGI event loop with the async ORM and await
+``channel_layer.group_send`` directly instead of bridging back through
+``async_to_sync``. Each one is opted into per URL name via
+``settings.ASYNC_VIEWS`` (see ``select_view``); the sync views stay the
+default so WSGI deployments are unaffected.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.shortcuts import redirect, aget_object_or_404
+
+from analytics import events as engagement
+from analytics.models import EngagementEvent
+from auction_ws.utils import abroadcast_auction_update
+from bid_protection.rate_limiting import rate_limit_bids
+from bid_protection.validators import validate_bid
+from notifications.models import Notification
+from .forms import BidForm
+from .conditional import aconditional_response
+from .models import Auction, Bid
+from .views import apply_anti_sniping, get_client_ip, send_outbid_email
+
+
+def select_view(name, sync_view, async_view):
+    """Pick the async implementation for URL names listed in ASYNC_VIEWS."""
+    if name in getattr(settings, 'ASYNC_VIEWS', ()):
+        return async_view
+    return sync_view
+
+
+@sync_to_async
+def _apply_anti_sniping(auction):
+    """Run the (sync) anti-sniping check; return the extension in minutes or None."""
+    if apply_anti_sniping(auction):
+        return auction.anti_sniping.extension_minutes
+    return None
+
+
+@rate_limit_bids
+async def place_bid(request, auction_id):
+    auction = await aget_object_or_404(Auction.objects.select_related('owner'), id=auction_id)
+
+    if request.method != 'POST':
+        return redirect('auction_detail', auction_id=auction.id)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        messages.error(request, 'You must be logged in to bid.')
+        return redirect('login')
+
+    form = BidForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, 'Please enter a valid bid amount.')
+        return redirect('auction_detail', auction_id=auction.id)
+
+    amount = form.cleaned_data['amount']
+    try:
+        await sync_to_async(validate_bid)(user, auction, amount)
+    except ValidationError as e:
+        messages.error(request, str(e.message))
+        return redirect('auction_detail', auction_id=auction.id)
+
+    # Find previous highest bid user
+    previous_highest_bid = await auction.bids.select_related('user').order_by('-amount', '-timestamp').afirst()
+
+    # Create bid with audit trail
+    await Bid.objects.acreate(
+        auction=auction,
+        user=user,
+        amount=amount,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
+    )
+    await sync_to_async(engagement.record)(EngagementEvent.BID, auction, user, amount)
+    auction.current_price = amount
+    await auction.asave(update_fields=['current_price'])
+
+    # Apply anti-sniping extension if applicable
+    extension_minutes = await _apply_anti_sniping(auction)
+    if extension_minutes is not None:
+        messages.info(request, f'Auction extended by {extension_minutes} minutes due to late bid.')
+
+    # The bid was validated above the current price, so this user now leads
+    await abroadcast_auction_update(
+        auction.id,
+        {
+            "current_price": str(auction.current_price),
+            "highest_bidder": user.username,
+            "end_time": auction.end_time.isoformat() if extension_minutes is not None else None,
+        }
+    )
+
+    # Send outbid notification
+    if previous_highest_bid and previous_highest_bid.user_id != user.id:
+        await sync_to_async(send_outbid_email)(previous_highest_bid.user, auction)
+        await Notification.objects.acreate(
+            user=previous_highest_bid.user,
+            auction=auction,
+            message=f'You have been outbid on the auction "{auction.title}".'
+        )
+
+    messages.success(request, 'Bid placed successfully!')
+    return redirect('auction_detail', auction_id=auction.id)
+
+
+async def auction_status_api(request, auction_id):
+    not_modified, headers = await aconditional_response(request, auction_id)
+    if not_modified is not None:
+        return not_modified
+    
+    auction = await aget_object_or_404(Auction, id=auction_id)
+    bids = auction.bids.select_related('user').order_by('-timestamp')[:10]
+    bid_list = [
+        {
+            'amount': str(bid.amount),
+            'user': bid.user.username,
+            'timestamp': bid.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        async for bid in bids
+    ]
+    response = JsonResponse({
+        'current_price': str(auction.current_price),
+        'end_time': auction.end_time.isoformat(),
+        'bids': bid_list,
+    })
+    for name, value in headers.items():
+        response.headers[name] = value
+    return response
@@ -0,0 +1,51 @@
+"""
+Background flushing for in-process write buffers.
+
+auctions.view_counter and analytics.events hold writes in memory and
+write them in batches. ``PeriodicFlusher`` is the part they share: one
+daemon thread per buffer calls ``flush`` every N seconds (N read from a
+setting on each round, so override_settings works), and ``flush`` runs
+once more at interpreter exit so a graceful shutdown loses nothing.
+An interval of 0 means "write immediately": ``immediate()`` is true and
+callers flush inline instead of starting the thread.
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class PeriodicFlusher:
+    def __init__(self, name, flush, setting, default=5):
+        self.name = name
+        self.flush = flush
+        self.setting = setting
+        self.default = default
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(flush)
+
+    def interval(self):
+        return getattr(settings, self.setting, self.default)
+
+    def immediate(self):
+        return self.interval() <= 0
+
+    def start(self):
+        """Start the flush thread unless it is already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(self.interval(), 1))
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
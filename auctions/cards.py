@@ -0,0 +1,45 @@
+"""
+Cached auction card fragments for listing pages.
+
+A card's public markup depends only on the auction, so it is rendered once
+per ``(auction_id, version, locale)`` and shared by every visitor.
+``Auction.version`` changes on bids, edits and closes, which moves the
+card to a fresh key; stale entries are simply never read again and age
+out. Per-user and time-dependent parts (watchlist heart, countdown) are
+rendered by the page around the fragment, not inside it.
+
+All cards on a page are fetched with a single ``cache.get_many`` and any
+misses are stored with a single ``cache.set_many``.
+"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+# Also bounds staleness of related data the version does not cover
+# (e.g. a category rename)
+CARD_CACHE_TIMEOUT = 60 * 60
+
+
+def card_cache_key(template_name, auction):
+    # created_at guards against a reused id (e.g. after a database restore)
+    # picking up another auction's card
+    stamp = int(auction.created_at.timestamp() * 1e6)
+    return f"auction_card:{template_name}:{auction.pk}:{auction.version}:{get_language()}:{stamp}"
+
+
+def attach_cards(auctions, template_name):
+    """Set ``card_html`` on each auction from the cache, rendering misses."""
+    keys = {auction.pk: card_cache_key(template_name, auction) for auction in auctions}
+    cached = cache.get_many(keys.values())
+
+    rendered = {}
+    for auction in auctions:
+        key = keys[auction.pk]
+        if key not in cached:
+            rendered[key] = render_to_string(template_name, {'auction': auction})
+        auction.card_html = mark_safe(cached[key] if key in cached else rendered[key])
+
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+    return auctions
@@ -0,0 +1,106 @@
+"""
+Conditional GET support for auction pages and APIs.
+
+``Auction.version`` and ``Auction.updated_at`` change on every bid,
+extension, edit and gallery change, so they are enough to revalidate a
+cached response. They are read with one primary-key lookup per request;
+on a match the view is skipped entirely and a 304 is returned, so none
+of the bid, gallery or reputation queries run.
+
+An auction also changes without a write when bidding closes (the winner
+is sent to checkout): at the end time, or for soft-close auctions once
+the idle window after it has passed. The ETag records whether bidding
+had closed and Last-Modified moves to that moment.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from auction_close.utils import idle_window
+
+from .models import Auction, Bid
+
+
+def _load_validators(auction_id):
+    """(version, last_modified, ended) for an auction, or None if it does not exist."""
+    row = Auction.objects.filter(pk=auction_id).values_list(
+        'version', 'updated_at', 'end_time', 'close_mode__mode'
+    ).first()
+    if row is None:
+        return None
+    version, updated_at, closes_at, close_mode = row
+    now = timezone.now()
+    if close_mode == 'SOFT' and closes_at <= now:
+        # Still taking bids until the idle window has passed
+        last_bid_at = Bid.objects.filter(auction_id=auction_id).aggregate(last=Max('timestamp'))['last']
+        closes_at = max(closes_at, last_bid_at or closes_at) + idle_window()
+    ended = closes_at <= now
+    return version, max(updated_at, closes_at) if ended else updated_at, ended
+
+
+def _validators(request, auction_id):
+    # condition() asks for the ETag and Last-Modified separately; share one lookup
+    cache = request.__dict__.setdefault('_auction_validators', {})
+    if auction_id not in cache:
+        cache[auction_id] = _load_validators(auction_id)
+    return cache[auction_id]
+
+
+def _make_etag(auction_id, version, user_id=None, ended=False):
+    tag = f'auction-{auction_id}-v{version}'
+    if ended:
+        tag += '-ended'
+    if user_id is not None:
+        tag += f'-u{user_id}'
+    return tag
+
+
+def auction_condition(per_user=False):
+    """
+    ``condition()`` keyed on the auction in the ``auction_id`` URL kwarg.
+
+    With ``per_user`` the ETag also covers who is logged in (pages that
+    render the user's navigation), and pending flash messages disable
+    revalidation so they are not swallowed by a 304.
+    """
+    def etag_func(request, auction_id, *args, **kwargs):
+        if per_user and len(get_messages(request)):
+            return None
+        validators = _validators(request, auction_id)
+        if validators is None:
+            return None
+        user_id = (request.user.pk or 0) if per_user else None
+        return _make_etag(auction_id, validators[0], user_id, ended=validators[2])
+
+    def last_modified_func(request, auction_id, *args, **kwargs):
+        if per_user and len(get_messages(request)):
+            return None
+        validators = _validators(request, auction_id)
+        return validators and validators[1]
+
+    return condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+
+async def aconditional_response(request, auction_id):
+    """
+    Async counterpart for API views: return ``(response, headers)``.
+
+    ``response`` is a 304/412 to send as is, or None to run the view and
+    add ``headers`` to its response. The validators are the ones
+    ``auction_condition()`` sends, so both implementations agree.
+    """
+    validators = await sync_to_async(_validators)(request, auction_id)
+    if validators is None:
+        return None, {}
+    etag = quote_etag(_make_etag(auction_id, validators[0], ended=validators[2]))
+    last_modified = int(validators[1].timestamp())
+    headers = {'ETag': etag, 'Last-Modified': http_date(last_modified)}
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        for name, value in headers.items():
+            response.headers.setdefault(name, value)
+    return response, headers
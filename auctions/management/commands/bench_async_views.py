@@ -0,0 +1,102 @@
+"""
+Management command to compare the sync and async implementations of the
+hot endpoints under the same concurrency.
+Run: python manage.py bench_async_views --requests 2000 --concurrency 8
+
+Sync views are driven the way Django's ASGI handler runs them
+(``sync_to_async(thread_sensitive=True)``), so both modes share the same
+event loop and worker budget. Uses the first auction and user in the
+database unless --auction / --user are given.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory
+
+from auctions import views, async_views
+from auctions.models import Auction
+from auction_ws.utils import broadcast_auction_update, abroadcast_auction_update
+from notifications import views as notification_views
+from notifications import async_views as notification_async_views
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sync vs async views (requests/sec and p99 latency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run (default: 2000)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent in-flight requests (default: 8)')
+        parser.add_argument('--auction', type=int, help='Auction id to query (default: first auction)')
+        parser.add_argument('--user', type=int, help='User id for notification endpoints (default: first user)')
+
+    def handle(self, *args, **options):
+        auction = Auction.objects.filter(id=options['auction']) if options['auction'] else Auction.objects.order_by('id')
+        auction = auction.first()
+        user = User.objects.filter(id=options['user']) if options['user'] else User.objects.order_by('id')
+        user = user.first()
+        if auction is None or user is None:
+            raise CommandError('Need at least one auction and one user (try: python manage.py seed_data)')
+
+        factory = AsyncRequestFactory()
+
+        def status_request():
+            return factory.get(f'/auctions/api/status/{auction.id}/')
+
+        def unread_request():
+            request = factory.get('/notifications/api/unread/')
+            request.user = user
+
+            async def auser():
+                return user
+            request.auser = auser
+            return request
+
+        payload = {"current_price": str(auction.current_price), "highest_bidder": user.username, "end_time": None}
+        cases = [
+            ('auction_status_api', status_request,
+             lambda r: views.auction_status_api(r, auction.id),
+             lambda r: async_views.auction_status_api(r, auction.id)),
+            ('unread_notifications_api', unread_request,
+             notification_views.unread_notifications_api,
+             notification_async_views.unread_notifications_api),
+            ('broadcast_auction_update', lambda: None,
+             lambda r: broadcast_auction_update(auction.id, payload),
+             lambda r: abroadcast_auction_update(auction.id, payload)),
+        ]
+
+        total = options['requests']
+        concurrency = options['concurrency']
+        self.stdout.write(f'{total} requests per run, concurrency {concurrency}\n')
+        self.stdout.write(f'{"endpoint":<28}{"mode":<7}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}')
+
+        for name, make_request, sync_call, async_call in cases:
+            sync_runner = sync_to_async(sync_call, thread_sensitive=True)
+            for mode, call in (('sync', sync_runner), ('async', async_call)):
+                rps, p50, p99 = asyncio.run(self._run(call, make_request, total, concurrency))
+                self.stdout.write(f'{name:<28}{mode:<7}{rps:>10.0f}{p50:>10.2f}{p99:>10.2f}')
+
+    async def _run(self, call, make_request, total, concurrency):
+        latencies = []
+        remaining = [total]
+
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                request = make_request()
+                started = time.perf_counter()
+                await call(request)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000
+        return len(latencies) / elapsed, p50, p99
@@ -0,0 +1,83 @@
+"""
+Management command to benchmark auction search against the old icontains scan.
+Run: python manage.py bench_search --rows 1000000
+
+Inserts synthetic auctions inside a transaction (rolled back at the end,
+so the database is left untouched), then times a few representative
+queries through search_auctions() and through title/description
+icontains.
+"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from auctions.models import Auction
+from auctions.search import search_auctions
+
+User = get_user_model()
+
+WORDS = (
+    'vintage antique rare gold silver watch painting oil canvas vase porcelain '
+    'chinese mughal brass bronze sculpture coin stamp manuscript rug persian '
+    'teak rosewood cabinet chair lamp clock pocket camera leica guitar violin '
+    'sapphire ruby emerald diamond necklace ring bracelet saree silk pashmina '
+    'motorcycle royal enfield jeep poster cricket signed bat ball jersey'
+).split()
+
+QUERIES = ['vintage watch', 'persian rug', 'signed cricket bat', 'leica', 'zzznomatch']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark FTS auction search vs icontains on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Synthetic auctions to insert (default: 1000000)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query (default: 5)')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = random.Random(42)
+
+        with transaction.atomic():
+            owner = User.objects.create_user(username=f'bench_search_{int(time.time())}')
+            end_time = timezone.now() + timedelta(days=7)
+
+            self.stdout.write(f'Inserting {rows} auctions...')
+            started = time.perf_counter()
+            for offset in range(0, rows, options['batch_size']):
+                Auction.objects.bulk_create([
+                    Auction(
+                        title=' '.join(rng.choices(WORDS, k=4)),
+                        description=' '.join(rng.choices(WORDS, k=40)),
+                        starting_price=Decimal('100.00'),
+                        current_price=Decimal('100.00'),
+                        end_time=end_time,
+                        owner=owner,
+                    )
+                    for _ in range(min(options['batch_size'], rows - offset))
+                ])
+            self.stdout.write(f'  done in {time.perf_counter() - started:.1f}s (includes index maintenance)\n')
+
+            base = Auction.objects.filter(owner=owner)
+            self.stdout.write(f'{"query":<22}{"method":<11}{"top-20 ms":>11}{"matches":>10}')
+            for query in QUERIES:
+                icontains = base.filter(Q(title__icontains=query) | Q(description__icontains=query)).order_by('-created_at')
+                ranked = search_auctions(base, query)
+                for method, queryset in (('icontains', icontains), ('fts', ranked)):
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        list(queryset.values_list('id', flat=True)[:20])
+                        timings.append(time.perf_counter() - started)
+                    matches = queryset.count()
+                    self.stdout.write(f'{query:<22}{method:<11}{min(timings) * 1000:>11.1f}{matches:>10}')
+
+            transaction.set_rollback(True)
@@ -0,0 +1,140 @@
+"""
+Management command to profile worker boot: import time and memory per app.
+Run: python manage.py import_profile
+
+Boots Django (``django.setup()`` plus the ROOT_URLCONF, as a web worker
+does) in fresh interpreters so nothing is already imported:
+
+- once under ``python -X importtime`` for the import time of every
+  module, summed per installed app (longest matching app name) or per
+  top-level package for everything else
+- once under tracemalloc for the memory still held per app after boot,
+  the peak traced memory and the peak RSS
+
+It also lists heavy optional dependencies (HEAVY_MODULES) that were
+loaded during boot; they should only be imported on first use (PDF
+rendering, the analytics API, ...). Use --json to track the numbers
+over time, e.g. from CI.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+HEAVY_MODULES = ('weasyprint', 'reportlab', 'PIL', 'numpy', 'pandas', 'cairocffi', 'fontTools')
+
+BOOT = (
+    'import importlib, django\n'
+    'django.setup()\n'
+    'from django.conf import settings\n'
+    'importlib.import_module(settings.ROOT_URLCONF)\n'
+)
+
+MEMORY_PROBE = '''
+import json, resource, sys, time, tracemalloc
+tracemalloc.start()
+started = time.perf_counter()
+{boot}
+boot_seconds = time.perf_counter() - started
+_, peak = tracemalloc.get_traced_memory()
+files = {{}}
+for name, module in list(sys.modules.items()):
+    path = getattr(module, '__file__', None)
+    if path:
+        files[path] = name
+held = {{}}
+for stat in tracemalloc.take_snapshot().statistics('filename'):
+    name = files.get(stat.traceback[0].filename)
+    if name:
+        held[name] = held.get(name, 0) + stat.size
+print(json.dumps({{
+    'boot_seconds': boot_seconds,
+    'peak_traced': peak,
+    'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    'held': held,
+    'modules': sorted(sys.modules),
+}}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Report per-app import time and memory of a worker boot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Rows to show (default: 20)')
+        parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+
+    def handle(self, *args, **options):
+        app_names = sorted((config.name for config in apps.get_app_configs()), key=len, reverse=True)
+
+        def owner(module):
+            for name in app_names:
+                if module == name or module.startswith(name + '.'):
+                    return name
+            return module.split('.')[0]
+
+        import_us = {}
+        for module, self_us in self._import_times():
+            import_us[owner(module)] = import_us.get(owner(module), 0) + self_us
+        probe = json.loads(self._run(['-c', MEMORY_PROBE.format(boot=BOOT)]).stdout)
+        held = {}
+        for module, size in probe['held'].items():
+            held[owner(module)] = held.get(owner(module), 0) + size
+        heavy = sorted({module.split('.')[0] for module in probe['modules']} & set(HEAVY_MODULES))
+
+        report = {
+            'boot_seconds': round(probe['boot_seconds'], 4),
+            'import_seconds': round(sum(import_us.values()) / 1e6, 4),
+            'peak_traced_bytes': probe['peak_traced'],
+            'max_rss_bytes': probe['max_rss'],
+            'heavy_loaded': heavy,
+            'apps': [
+                {
+                    'name': name,
+                    'is_app': name in app_names,
+                    'import_ms': round(import_us.get(name, 0) / 1000, 2),
+                    'memory_kb': round(held.get(name, 0) / 1024, 1),
+                }
+                for name in sorted(set(import_us) | set(held), key=lambda n: import_us.get(n, 0), reverse=True)
+            ],
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{"app / package":<32}{"import ms":>12}{"memory KB":>12}')
+        for row in report['apps'][:options['top']]:
+            marker = '' if row['is_app'] else ' *'
+            self.stdout.write(f'{row["name"] + marker:<32}{row["import_ms"]:>12.1f}{row["memory_kb"]:>12.0f}')
+        self.stdout.write('(* not an installed app)')
+        self.stdout.write(
+            f"\nImports {report['import_seconds'] * 1000:.0f} ms, boot {report['boot_seconds'] * 1000:.0f} ms "
+            f"under tracemalloc, peak traced {report['peak_traced_bytes'] / 2**20:.1f} MB, "
+            f"max RSS {report['max_rss_bytes'] / 2**20:.1f} MB"
+        )
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"Heavy modules loaded at boot: {', '.join(heavy)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('No heavy optional modules loaded at boot'))
+
+    def _import_times(self):
+        """(module, self microseconds) for every module imported during boot."""
+        result = self._run(['-X', 'importtime', '-c', BOOT])
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _, module = line[len('import time:'):].split('|')
+            yield module.strip(), int(self_us)
+
+    def _run(self, args):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+        result = subprocess.run(
+            [sys.executable, *args], capture_output=True, text=True, env=env, cwd=settings.BASE_DIR
+        )
+        if result.returncode:
+            raise CommandError(f'Boot failed:\n{result.stderr[-2000:]}')
+        return result
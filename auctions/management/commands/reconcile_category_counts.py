@@ -0,0 +1,42 @@
+"""
+Management command to check Category.active_auction_count against the
+real number of active auctions per category.
+Run: python manage.py reconcile_category_counts [--fix]
+
+The counters are kept up to date by Auction.save(), deletes and
+AuctionQuerySet.set_active(); writes that bypass those (raw SQL, plain
+queryset.update(is_active=...)) leave them drifting until this is run.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from auctions.models import Category
+
+
+class Command(BaseCommand):
+    help = 'Verify (and optionally repair) the materialized category auction counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rewrite counters that disagree with the real counts')
+
+    def handle(self, *args, **options):
+        categories = Category.objects.annotate(
+            actual=Count('auctions', filter=Q(auctions__is_active=True))
+        ).order_by('pk')
+
+        drifted = [c for c in categories if c.active_auction_count != c.actual]
+        for category in drifted:
+            self.stdout.write(
+                f'{category.slug}: counter {category.active_auction_count}, actual {category.actual}'
+            )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All category counters match.'))
+            return
+
+        if not options['fix']:
+            raise CommandError(f'{len(drifted)} category counter(s) out of date; rerun with --fix to repair')
+
+        for category in drifted:
+            Category.objects.filter(pk=category.pk).update(active_auction_count=category.actual)
+        self.stdout.write(self.style.SUCCESS(f'Repaired {len(drifted)} category counter(s).'))
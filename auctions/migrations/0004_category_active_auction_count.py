@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counts(apps, schema_editor):
+    Auction = apps.get_model('auctions', 'Auction')
+    Category = apps.get_model('auctions', 'Category')
+    active = (
+        Auction.objects.filter(category=OuterRef('pk'), is_active=True)
+        .values('category').annotate(n=Count('id')).values('n')
+    )
+    Category.objects.update(active_auction_count=Coalesce(Subquery(active), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0003_auction_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_auction_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_category_active_auction_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
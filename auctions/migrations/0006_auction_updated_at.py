@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0005_auction_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
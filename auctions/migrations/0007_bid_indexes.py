@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0006_auction_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['auction', '-amount', '-timestamp'], name='bid_auction_leader_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['user', 'auction', 'amount'], name='bid_user_auction_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.utils import timezone
 from users.models import User
 
 # Create your models here.
@@ -13,6 +15,10 @@ class Category(models.Model):
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Active auctions in this category, maintained by Auction.save()/delete
+    # (see adjust_category_counts) and checked by reconcile_category_counts
+    active_auction_count = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['order', 'name']
@@ -21,6 +27,71 @@ class Category(models.Model):
         return self.name
 
 
+def adjust_category_counts(deltas):
+    """Apply {category_id: delta} to Category.active_auction_count in SQL."""
+    for category_id, delta in deltas.items():
+        if category_id is not None and delta:
+            Category.objects.filter(pk=category_id).update(
+                active_auction_count=F('active_auction_count') + delta
+            )
+
+
+# Saves touching only these fields leave Auction.version alone
+UNVERSIONED_FIELDS = {'view_count'}
+
+
+class AuctionQuerySet(models.QuerySet):
+    """
+    Lifecycle filters evaluated in SQL.
+    
+    Mirrors auction_status.utils.get_auction_status:
+    UPCOMING while a schedule start_time is in the future, LIVE while
+    active and before end_time, ENDED otherwise.
+    """
+    
+    def _started(self, now):
+        return Q(schedule__isnull=True) | Q(schedule__start_time__lte=now)
+    
+    def with_status(self, now=None):
+        """Annotate each auction with ``status`` (UPCOMING / LIVE / ENDED)."""
+        now = now or timezone.now()
+        return self.annotate(status=Case(
+            When(schedule__start_time__gt=now, then=Value('UPCOMING')),
+            When(is_active=True, end_time__gt=now, then=Value('LIVE')),
+            default=Value('ENDED'),
+            output_field=CharField(),
+        ))
+    
+    def live(self, now=None):
+        now = now or timezone.now()
+        return self.filter(self._started(now), is_active=True, end_time__gt=now)
+    
+    def upcoming(self, now=None):
+        now = now or timezone.now()
+        return self.filter(schedule__start_time__gt=now)
+    
+    def ended(self, now=None):
+        now = now or timezone.now()
+        return self.filter(self._started(now)).filter(Q(is_active=False) | Q(end_time__lte=now))
+    
+    def published(self):
+        """Auctions approved through the workflow, or created without one."""
+        return self.filter(Q(workflow__status="LIVE") | Q(workflow__isnull=True))
+    
+    def set_active(self, is_active):
+        """Bulk activate/deactivate, keeping category counters in step."""
+        with transaction.atomic():
+            flipping = self.exclude(is_active=is_active)
+            changed = flipping.values('category_id').annotate(n=Count('id')).order_by()
+            sign = 1 if is_active else -1
+            adjust_category_counts({row['category_id']: sign * row['n'] for row in changed})
+            return flipping.update(is_active=is_active, version=F('version') + 1, updated_at=timezone.now())
+    
+    def touch(self):
+        """Mark auctions changed (e.g. gallery edits) without loading them."""
+        return self.update(version=F('version') + 1, updated_at=timezone.now())
+
+
 class Auction(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -49,6 +120,73 @@ class Auction(models.Model):
     # Analytics
     view_count = models.PositiveIntegerField(default=0)
     
+    # Bumped by every save that changes what listings render; together with
+    # updated_at it drives card caching and conditional GETs
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = AuctionQuerySet.as_manager()
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'is_active' in instance.__dict__ and 'category_id' in instance.__dict__:
+            instance._counted_category_id = instance._counter_key()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or {'is_active', 'category', 'category_id'} & set(fields):
+            self._counted_category_id = self._counter_key()
+    
+    def _counter_key(self):
+        """The category this auction counts towards, or None."""
+        return self.category_id if self.is_active else None
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        
+        # Anything shown on a card (price, end time, edits, close) gets a new
+        # version, which retires cached card fragments. The bump happens in
+        # the UPDATE, like set_active()/touch(), so a stale instance can never
+        # write back a version that has already been used
+        bumped = not self._state.adding and (update_fields is None or set(update_fields) - UNVERSIONED_FIELDS)
+        if bumped:
+            self.version = F('version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'version', 'updated_at']
+        
+        self._save_counted(*args, **kwargs)
+        if bumped:
+            # Leave version deferred: the first read reloads the stored value
+            # (refresh_from_db), and saves that never read it stay one query
+            del self.__dict__['version']
+    
+    def _save_counted(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'is_active', 'category', 'category_id'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        
+        # Only lifecycle transitions (create, activate, close, recategorise)
+        # touch the counters; ordinary saves cost no extra queries
+        if self._state.adding:
+            before = None
+        elif '_counted_category_id' in self.__dict__:
+            before = self._counted_category_id
+        else:
+            # Loaded with is_active/category deferred
+            stored = Auction.objects.filter(pk=self.pk).values('is_active', 'category_id').first()
+            before = stored and (stored['category_id'] if stored['is_active'] else None)
+        after = self._counter_key()
+        
+        if before == after:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic(using=kwargs.get('using')):
+                super().save(*args, **kwargs)
+                adjust_category_counts({before: -1, after: 1})
+        self._counted_category_id = after
+    
     @property
     def highest_bid(self):
         return self.bids.order_by('-amount', '-timestamp').first()
@@ -73,6 +211,15 @@ class AuctionImage(models.Model):
     class Meta:
         ordering = ['order', 'created_at']
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Auction.objects.filter(pk=self.auction_id).touch()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Auction.objects.filter(pk=self.auction_id).touch()
+        return result
+    
     def __str__(self):
         return f"Image for {self.auction.title}"
 
@@ -89,6 +236,12 @@ class Bid(models.Model):
     
     class Meta:
         ordering = ['-amount', '-timestamp']
+        indexes = [
+            # Current leader per auction
+            models.Index(fields=['auction', '-amount', '-timestamp'], name='bid_auction_leader_idx'),
+            # A buyer's best bid per auction (dashboard.views.my_bids)
+            models.Index(fields=['user', 'auction', 'amount'], name='bid_user_auction_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} bid {self.amount} on {self.auction.title}"
@@ -0,0 +1,179 @@
+"""
+Keyset (cursor) pagination for auction listings.
+
+Pages are fetched with ``WHERE (sort_key, id) > (last_sort_key, last_id)``
+on a stable ordering such as ``('-created_at', '-id')`` instead of
+``OFFSET``, and one extra row is read to know whether a next page exists.
+There is no ``COUNT(*)``, so every page costs the same however deep the
+user scrolls or however large the catalogue grows.
+
+Orderings that are not plain model fields (e.g. search relevance) fall
+back to an offset cursor over the queryset's own ordering.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse
+
+PAGE_SIZE = 24
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds times to milliseconds; cursors must be exact
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _resolve_field(model, path):
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _key_value(obj, path, field):
+    *relations, _ = path.split('__')
+    for relation in relations:
+        obj = getattr(obj, relation)
+    return getattr(obj, field.attname)
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.next_url = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, e.g. ``('end_time', 'id')``.
+
+    Keys may follow single-valued relations (``'schedule__start_time'``);
+    select_related them so reading the cursor values costs no queries.
+    The last key should be unique (normally ``id``) so the ordering is
+    total. Pass ``ordering=None`` to keep the queryset's ordering and page
+    by offset instead.
+    """
+
+    def __init__(self, queryset, ordering, per_page=PAGE_SIZE):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = []
+        if ordering:
+            try:
+                for key in ordering:
+                    name = key.lstrip('-')
+                    self.keys.append((name, key.startswith('-'), _resolve_field(queryset.model, name)))
+            except (FieldDoesNotExist, AttributeError):
+                self.keys = []
+        self.ordering = ordering if self.keys else None
+
+    def page(self, cursor=None):
+        if self.keys:
+            queryset = self.queryset.order_by(*self.ordering)
+            values = self._decode_keys(cursor)
+            if values is not None:
+                queryset = queryset.filter(self._after(values))
+            rows = list(queryset[:self.per_page + 1])
+        else:
+            offset = self._decode_offset(cursor)
+            rows = list(self.queryset[offset:offset + self.per_page + 1])
+
+        if len(rows) <= self.per_page:
+            return KeysetPage(rows, None)
+
+        rows = rows[:self.per_page]
+        if self.keys:
+            next_cursor = self._encode([_key_value(rows[-1], name, field) for name, _, field in self.keys])
+        else:
+            next_cursor = self._encode({'offset': offset + self.per_page})
+        return KeysetPage(rows, next_cursor)
+
+    def _after(self, values):
+        """Build (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... honouring each key's direction."""
+        condition = Q()
+        equal_so_far = Q()
+        for (name, descending, _), value in zip(self.keys, values):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal_so_far & Q(**{f'{name}__{lookup}': value})
+            equal_so_far &= Q(**{name: value})
+        return condition
+
+    def _encode(self, payload):
+        raw = json.dumps(payload, cls=_CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+    def _decode_keys(self, cursor):
+        # An unreadable cursor restarts from the first page, like Paginator.get_page
+        if not cursor:
+            return None
+        try:
+            raw = self._decode(cursor)
+            if not isinstance(raw, list) or len(raw) != len(self.keys):
+                return None
+            return [field.to_python(value) for (_, _, field), value in zip(self.keys, raw)]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _decode_offset(self, cursor):
+        if not cursor:
+            return 0
+        try:
+            return max(int(self._decode(cursor)['offset']), 0)
+        except (ValueError, TypeError, KeyError):
+            return 0
+
+
+def paginate(request, queryset, ordering, per_page=None):
+    """Return the page for ``?cursor=`` with ``next_url`` keeping the other query params."""
+    paginator = KeysetPaginator(queryset, ordering, per_page or PAGE_SIZE)
+    page = paginator.page(request.GET.get('cursor'))
+    if page.next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        page.next_url = '?' + params.urlencode()
+    return page
+
+
+def wants_json(request):
+    return request.GET.get('format') == 'json'
+
+
+def serialize_auction(auction):
+    return {
+        'id': auction.id,
+        'title': auction.title,
+        'current_price': str(auction.current_price),
+        'end_time': auction.end_time.isoformat(),
+        'image': auction.image.url if auction.image else None,
+        'is_featured': auction.is_featured,
+    }
+
+
+def page_json_response(page, serialize=serialize_auction):
+    """JSON variant of a listing page for infinite scroll."""
+    return JsonResponse({
+        'results': [serialize(obj) for obj in page],
+        'next': page.next_cursor,
+    })
@@ -0,0 +1,138 @@
+"""
+Full-text search over auction titles and descriptions.
+
+- SQLite: external-content FTS5 table ``auctions_auction_fts`` kept in
+  sync with ``auctions_auction`` by triggers, so every insert, save,
+  ``update()`` and delete is indexed without any Python-side hooks.
+- PostgreSQL: GIN index over a weighted ``tsvector`` of title and
+  description.
+- Other backends fall back to ``icontains``.
+
+``search_auctions`` is the single entry point used by the homepage,
+``auction_list`` and ``discover_auctions``.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'auctions_auction_fts'
+POSTGRES_INDEX = 'auctions_auction_search_gin'
+
+# Title matches count ten times as much as description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='auctions_auction', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON auctions_auction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON auctions_auction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON auctions_auction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+POSTGRES_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def ensure_search_index(connection):
+    """
+    Create the search index for this connection's backend if it is missing.
+
+    Safe to call repeatedly. On SQLite, Django rebuilds ``auctions_auction``
+    for some schema changes, which drops its triggers; this reinstalls them
+    and rebuilds the index so nothing saved in between is missed.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{FTS_TABLE}_a%']
+            )
+            triggers_present = cursor.fetchone()[0] == 3
+            for statement in SQLITE_FTS_SQL:
+                cursor.execute(statement)
+            if not triggers_present:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_INDEX} ON auctions_auction "
+                f"USING gin (({POSTGRES_VECTOR_SQL}))"
+            )
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+
+
+def _fts5_query(query):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_auctions(queryset, query):
+    """
+    Restrict an Auction queryset to matches for ``query``, best match first.
+
+    The relevance score is exposed as ``search_rank``. Any later
+    ``order_by()`` replaces the relevance ordering.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return queryset.none()
+        # Matching rowids come straight from the FTS index; bm25() is lower
+        # for better matches and is only evaluated for those rows
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = auctions_auction.id',
+                [match],
+                output_field=FloatField(),
+            )
+        ).order_by('search_rank')
+
+    if vendor == 'postgresql':
+        return queryset.alias(
+            search_match=RawSQL(
+                f"({POSTGRES_VECTOR_SQL}) @@ websearch_to_tsquery('english', %s)",
+                [query],
+                output_field=BooleanField(),
+            )
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(
+                f"ts_rank(({POSTGRES_VECTOR_SQL}), websearch_to_tsquery('english', %s))",
+                [query],
+                output_field=FloatField(),
+            )
+        ).order_by('-search_rank')
+
+    return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
@@ -0,0 +1,51 @@
+"""
+Cache headers for public page shells.
+
+Listing and detail pages render no per-user auction data; watchlist,
+bid, winner and invoice flags are fetched by the browser from
+``/api/me/auction-state``. The HTML served to an anonymous visitor is
+therefore the same for everyone and may be stored by browsers and shared
+caches for SHELL_MAX_AGE seconds.
+
+Responses always vary on Cookie: logged-in pages still show the user's
+navigation, messages and CSRF tokens, so those are marked private. So is
+any anonymous page that will carry a cookie: the CSRF, session and
+message middleware add theirs after the view returns, so the decision
+looks at what the render used rather than at ``response.cookies``.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+SHELL_MAX_AGE = getattr(settings, 'SHELL_MAX_AGE', 60)
+
+
+def _sets_cookie(request, response):
+    """Whether the response leaves with Set-Cookie or per-visitor content."""
+    return bool(
+        response.cookies
+        # A CSRF token was rendered, or the cookie is about to be (re)issued
+        or request.META.get('CSRF_COOKIE_USED')
+        or request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        or getattr(getattr(request, 'session', None), 'modified', False)
+        # Flash messages shown on this page are cleared with a cookie or session write
+        or len(get_messages(request))
+    )
+
+
+def cacheable_shell(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or response.status_code not in (200, 304):
+            return response
+
+        patch_vary_headers(response, ('Cookie',))
+        if request.user.is_authenticated or _sets_cookie(request, response):
+            patch_cache_control(response, private=True, max_age=0)
+        else:
+            patch_cache_control(response, public=True, max_age=SHELL_MAX_AGE)
+        return response
+    return wrapper
@@ -632,3 +632,1693 @@ class CategoryFilterTests(TestCase):
         self.assertEqual(electronics_auctions.count(), 1)
         self.assertEqual(furniture_auctions.count(), 1)
         self.assertEqual(electronics_auctions.first().title, 'Laptop')
+
+
+class AsyncViewTests(TestCase):
+    """Tests for the async bid and status views."""
+    
+    def setUp(self):
+        from bid_protection.rate_limiting import RateLimitStore
+        RateLimitStore.clear()
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.bidder = User.objects.create_user(
+            username='bidder',
+            email='bidder@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Test Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() + timedelta(days=1),
+            owner=self.seller,
+            is_active=True
+        )
+    
+    def _async_request(self, method, path, user, data=None):
+        from django.test import AsyncRequestFactory
+        from django.contrib.messages.storage.fallback import FallbackStorage
+        from django.contrib.sessions.backends.cache import SessionStore
+        
+        factory = AsyncRequestFactory()
+        request = factory.post(path, data) if method == 'post' else factory.get(path)
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        request.user = user
+        
+        async def auser():
+            return user
+        request.auser = auser
+        return request
+    
+    async def test_async_status_api_matches_sync(self):
+        """Test async status API returns the same payload as the sync view."""
+        from auctions import views, async_views
+        from asgiref.sync import sync_to_async
+        
+        await Bid.objects.acreate(auction=self.auction, user=self.bidder, amount=Decimal('150.00'))
+        request = self._async_request('get', '/', self.bidder)
+        
+        async_response = await async_views.auction_status_api(request, self.auction.id)
+        sync_response = await sync_to_async(views.auction_status_api)(request, self.auction.id)
+        
+        self.assertEqual(async_response.status_code, 200)
+        self.assertJSONEqual(async_response.content, sync_response.content.decode())
+    
+    async def test_async_status_api_validators_match_sync(self):
+        """Test both status API implementations send the same validators once the auction has ended."""
+        from auctions import views, async_views
+        from asgiref.sync import sync_to_async
+        
+        await Auction.objects.filter(pk=self.auction.pk).aupdate(end_time=timezone.now() - timedelta(minutes=1))
+        
+        async_response = await async_views.auction_status_api(
+            self._async_request('get', '/', self.bidder), self.auction.id
+        )
+        sync_response = await sync_to_async(views.auction_status_api)(
+            self._async_request('get', '/', self.bidder), self.auction.id
+        )
+        
+        self.assertIn('-ended', async_response['ETag'])
+        self.assertEqual(async_response['ETag'], sync_response['ETag'])
+        self.assertEqual(async_response['Last-Modified'], sync_response['Last-Modified'])
+    
+    async def test_async_place_bid(self):
+        """Test async bid placement records the bid and event and broadcasts the update."""
+        from unittest import mock
+        from analytics.models import EngagementEvent
+        from auctions import async_views
+        
+        request = self._async_request('post', '/', self.bidder, {'amount': '175.00'})
+        with mock.patch.object(async_views, 'abroadcast_auction_update') as broadcast:
+            response = await async_views.place_bid(request, self.auction.id)
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(await Bid.objects.filter(auction=self.auction, amount=Decimal('175.00')).aexists())
+        await self.auction.arefresh_from_db()
+        self.assertEqual(self.auction.current_price, Decimal('175.00'))
+        broadcast.assert_awaited_once()
+        self.assertEqual(broadcast.await_args.args[1]['highest_bidder'], 'bidder')
+        self.assertTrue(await EngagementEvent.objects.filter(
+            kind=EngagementEvent.BID, auction=self.auction, user=self.bidder, amount=Decimal('175.00')
+        ).aexists())
+    
+    async def test_async_place_bid_rejects_seller(self):
+        """Test async bid placement runs the bid validators."""
+        from auctions import async_views
+        
+        request = self._async_request('post', '/', self.seller, {'amount': '175.00'})
+        response = await async_views.place_bid(request, self.auction.id)
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await Bid.objects.filter(auction=self.auction).aexists())
+    
+    def test_select_view(self):
+        """Test URL names listed in ASYNC_VIEWS pick the async implementation."""
+        from auctions import views, async_views
+        from auctions.async_views import select_view
+        
+        with self.settings(ASYNC_VIEWS=['auction_status_api']):
+            self.assertIs(
+                select_view('auction_status_api', views.auction_status_api, async_views.auction_status_api),
+                async_views.auction_status_api
+            )
+        self.assertIs(
+            select_view('auction_status_api', views.auction_status_api, async_views.auction_status_api),
+            views.auction_status_api
+        )
+
+
+class PresenceTests(TestCase):
+    """Tests for live viewer counts kept by the auction WebSocket consumers."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+    
+    async def test_join_and_leave_counts(self):
+        """Test viewer counts follow connects and disconnects."""
+        from unittest import mock
+        from auction_ws import presence
+        
+        with mock.patch.object(presence, '_schedule_publish', mock.AsyncMock()):
+            await presence.ajoin(7)
+            await presence.ajoin(7)
+            await presence.ajoin(8)
+            await presence.aleave(7)
+            
+            self.assertEqual(await presence.aviewer_count(7), 1)
+            self.assertEqual(await presence.aviewer_count(8), 1)
+            
+            # Extra disconnects never drive the count negative
+            await presence.aleave(7)
+            await presence.aleave(7)
+            self.assertEqual(await presence.aviewer_count(7), 0)
+    
+    async def test_publish_is_coalesced(self):
+        """Test a burst of connects publishes the latest count once per window."""
+        import asyncio
+        from unittest import mock
+        from auction_ws import presence
+        
+        with mock.patch.object(presence, 'PRESENCE_PUBLISH_INTERVAL', 0.05), \
+                mock.patch.object(presence, 'abroadcast_auction_update', mock.AsyncMock()) as broadcast:
+            for _ in range(5):
+                await presence.ajoin(9)
+            await asyncio.sleep(0.2)
+        
+        broadcast.assert_awaited_once_with(9, {"viewers": 5})
+
+
+class SearchTests(TestCase):
+    """Tests for the full-text auction search."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.watch = self._create('Vintage pocket watch', 'Swiss made, 1950s')
+        self.clock = self._create('Wall clock', 'Comes with a matching vintage watch chain')
+        self.vase = self._create('Porcelain vase', 'Ming style')
+    
+    def _create(self, title, description):
+        return Auction.objects.create(
+            title=title,
+            description=description,
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() + timedelta(days=1),
+            owner=self.seller,
+            is_active=True
+        )
+    
+    def test_title_matches_rank_first(self):
+        """Test results are ranked with title matches ahead of description matches."""
+        from auctions.search import search_auctions
+        
+        results = list(search_auctions(Auction.objects.all(), 'vintage watch'))
+        self.assertEqual(results, [self.watch, self.clock])
+    
+    def test_prefix_and_stemmed_match(self):
+        """Test partial words and plural forms still match."""
+        from auctions.search import search_auctions
+        
+        self.assertEqual(list(search_auctions(Auction.objects.all(), 'porcel')), [self.vase])
+        self.assertEqual(list(search_auctions(Auction.objects.all(), 'vases')), [self.vase])
+    
+    def test_index_follows_saves_and_deletes(self):
+        """Test the index is kept in sync when auctions change."""
+        from auctions.search import search_auctions
+        
+        self.vase.title = 'Bronze statue'
+        self.vase.save()
+        self.assertEqual(list(search_auctions(Auction.objects.all(), 'porcelain')), [])
+        self.assertEqual(list(search_auctions(Auction.objects.all(), 'bronze')), [self.vase])
+        
+        self.vase.delete()
+        self.assertEqual(list(search_auctions(Auction.objects.all(), 'bronze')), [])
+    
+    def test_query_syntax_is_escaped(self):
+        """Test user input cannot break the FTS query."""
+        from auctions.search import search_auctions
+        
+        self.assertEqual(list(search_auctions(Auction.objects.all(), 'watch" (')), [self.watch, self.clock])
+        self.assertEqual(list(search_auctions(Auction.objects.all(), '"*()')), [])
+    
+    def test_listing_views_use_search(self):
+        """Test homepage, auction list and discover all return ranked results."""
+        for url in ('/?search=vintage+watch', '/auctions/?q=vintage+watch', '/discover/?q=vintage+watch'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(list(response.context['auctions']), [self.watch, self.clock], url)
+
+
+class AuctionQuerySetTests(TestCase):
+    """Tests for the SQL-side lifecycle filters on Auction.objects."""
+    
+    def setUp(self):
+        from auction_status.models import AuctionSchedule
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        now = timezone.now()
+        self.live = self._create('Live', now + timedelta(days=1))
+        self.scheduled_live = self._create('Started', now + timedelta(days=1))
+        AuctionSchedule.objects.create(auction=self.scheduled_live, start_time=now - timedelta(hours=1))
+        self.upcoming = self._create('Upcoming', now + timedelta(days=3))
+        AuctionSchedule.objects.create(auction=self.upcoming, start_time=now + timedelta(days=1))
+        self.expired = self._create('Expired', now - timedelta(hours=1))
+        self.closed = self._create('Closed', now + timedelta(days=1), is_active=False)
+    
+    def _create(self, title, end_time, is_active=True):
+        return Auction.objects.create(
+            title=title,
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=end_time,
+            owner=self.seller,
+            is_active=is_active
+        )
+    
+    def test_lifecycle_filters(self):
+        """Test live/upcoming/ended partition the auctions."""
+        self.assertCountEqual(Auction.objects.live(), [self.live, self.scheduled_live])
+        self.assertCountEqual(Auction.objects.upcoming(), [self.upcoming])
+        self.assertCountEqual(Auction.objects.ended(), [self.expired, self.closed])
+    
+    def test_with_status_matches_get_auction_status(self):
+        """Test the annotated status agrees with the Python implementation."""
+        from auction_status.utils import get_auction_status
+        
+        for auction in Auction.objects.with_status():
+            self.assertEqual(auction.status, get_auction_status(Auction.objects.get(pk=auction.pk)), auction.title)
+    
+    def test_filters_stay_chainable(self):
+        """Test lifecycle filters return querysets that can be filtered and ordered."""
+        queryset = Auction.objects.live().filter(title__startswith='L').order_by('-created_at')
+        self.assertEqual(list(queryset), [self.live])
+    
+    def test_discover_live_only_query_count(self):
+        """Test discover with live_only does not query per auction."""
+        for i in range(10):
+            self._create(f'Extra {i}', timezone.now() + timedelta(days=1))
+        
+        with self.assertNumQueries(1):
+            response = self.client.get('/discover/?live_only=on')
+        self.assertEqual(len(response.context['auctions']), 12)
+    
+    def test_marketplace_pages_use_lifecycle(self):
+        """Test live and upcoming marketplace pages list the right auctions."""
+        response = self.client.get(reverse('marketplace:live_auctions'))
+        self.assertCountEqual(response.context['auctions'], [self.live, self.scheduled_live])
+        
+        response = self.client.get(reverse('marketplace:upcoming_items'))
+        self.assertEqual(list(response.context['upcoming_auctions']), [self.upcoming])
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for cursor pagination on auction listings."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        end_time = timezone.now() + timedelta(days=1)
+        # Duplicate prices so the id tie-breaker matters
+        self.auctions = [
+            Auction.objects.create(
+                title=f'Item {i}',
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal(100 + i % 3),
+                end_time=end_time,
+                owner=self.seller
+            )
+            for i in range(7)
+        ]
+    
+    def _walk(self, ordering, per_page=3):
+        from auctions.pagination import KeysetPaginator
+        
+        paginator = KeysetPaginator(Auction.objects.all(), ordering, per_page)
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen.extend(page)
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+    
+    def test_pages_cover_ordering_exactly_once(self):
+        """Test walking the cursors yields every auction once, in order."""
+        for ordering in [('-created_at', '-id'), ('end_time', 'id'), ('-current_price', '-id'), ('current_price', 'id')]:
+            expected = list(Auction.objects.order_by(*ordering))
+            self.assertEqual(self._walk(ordering), expected, ordering)
+    
+    def test_invalid_cursor_restarts(self):
+        """Test a garbled cursor falls back to the first page."""
+        from auctions.pagination import KeysetPaginator
+        
+        page = KeysetPaginator(Auction.objects.all(), ('-created_at', '-id'), 3).page('not-a-cursor')
+        self.assertEqual(list(page), list(Auction.objects.order_by('-created_at', '-id')[:3]))
+    
+    def test_listing_json_and_no_count(self):
+        """Test the JSON variant returns a next cursor without running COUNT."""
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with mock.patch('auctions.pagination.PAGE_SIZE', 5), CaptureQueriesContext(connection) as queries:
+            first = self.client.get('/auctions/', {'format': 'json', 'sort': 'end_time'}).json()
+            rest = self.client.get('/auctions/', {'format': 'json', 'sort': 'end_time', 'cursor': first['next']}).json()
+        
+        self.assertEqual(len(first['results']), 5)
+        self.assertEqual(len(rest['results']), 2)
+        self.assertIsNone(rest['next'])
+        ids = [result['id'] for result in first['results'] + rest['results']]
+        self.assertCountEqual(ids, [auction.id for auction in self.auctions])
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries.captured_queries))
+    
+    def test_load_more_link(self):
+        """Test HTML listings link to the next page keeping filters."""
+        from unittest import mock
+        
+        with mock.patch('auctions.pagination.PAGE_SIZE', 5):
+            response = self.client.get('/', {'category': ''})
+        self.assertContains(response, 'Load More')
+        self.assertIn('cursor=', response.context['auctions'].next_url)
+        self.assertIn('category=', response.context['auctions'].next_url)
+
+
+class CategoryCounterTests(TestCase):
+    """Tests for the materialized Category.active_auction_count."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.art = Category.objects.create(name='Art', slug='art')
+        self.coins = Category.objects.create(name='Coins', slug='coins')
+    
+    def _create(self, category, is_active=True):
+        return Auction.objects.create(
+            title='Item',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() + timedelta(days=1),
+            owner=self.seller,
+            category=category,
+            is_active=is_active
+        )
+    
+    def _counts(self):
+        return dict(Category.objects.values_list('slug', 'active_auction_count'))
+    
+    def test_lifecycle_transitions(self):
+        """Test create, close, reactivate, recategorise and delete adjust the counters."""
+        auction = self._create(self.art)
+        self._create(self.art, is_active=False)
+        self.assertEqual(self._counts(), {'art': 1, 'coins': 0})
+        
+        auction.category = self.coins
+        auction.save()
+        self.assertEqual(self._counts(), {'art': 0, 'coins': 1})
+        
+        auction.is_active = False
+        auction.save(update_fields=['is_active'])
+        self.assertEqual(self._counts(), {'art': 0, 'coins': 0})
+        
+        Auction.objects.filter(pk=auction.pk).set_active(True)
+        self.assertEqual(self._counts(), {'art': 0, 'coins': 1})
+        
+        Auction.objects.get(pk=auction.pk).delete()
+        self.assertEqual(self._counts(), {'art': 0, 'coins': 0})
+    
+    def test_ordinary_save_costs_one_query(self):
+        """Test saves that are not lifecycle transitions do not touch counters."""
+        auction = Auction.objects.get(pk=self._create(self.art).pk)
+        auction.current_price = Decimal('150.00')
+        with self.assertNumQueries(1):
+            auction.save()
+    
+    def test_reconcile_command(self):
+        """Test reconcile_category_counts reports and repairs drift."""
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        
+        self._create(self.art)
+        self._create(self.art)
+        Auction.objects.update(is_active=False)  # bypasses the counters
+        
+        with self.assertRaises(CommandError):
+            call_command('reconcile_category_counts', stdout=StringIO())
+        call_command('reconcile_category_counts', '--fix', stdout=StringIO())
+        self.assertEqual(self._counts(), {'art': 0, 'coins': 0})
+    
+    def test_homepage_uses_counters(self):
+        """Test the homepage facet bar shows counter values."""
+        self._create(self.art)
+        response = self.client.get('/')
+        self.assertContains(response, 'Art (1)')
+
+
+class CardCacheTests(TestCase):
+    """Tests for the versioned auction card fragment cache."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.auctions = [
+            Auction.objects.create(
+                title=f'Card {i}',
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=timezone.now() + timedelta(days=1),
+                owner=self.seller
+            )
+            for i in range(5)
+        ]
+    
+    def test_version_bumps_on_card_changes_only(self):
+        """Test bids and edits bump the version but view counts do not."""
+        auction = self.auctions[0]
+        auction.current_price = Decimal('150.00')
+        auction.save(update_fields=['current_price'])
+        self.assertEqual(Auction.objects.get(pk=auction.pk).version, 2)
+        
+        auction.view_count = 10
+        auction.save(update_fields=['view_count'])
+        self.assertEqual(Auction.objects.get(pk=auction.pk).version, 2)
+
+    def test_stale_instance_never_reuses_a_version(self):
+        """Test saving a stale instance after a bulk bump still moves the version forward."""
+        stale = Auction.objects.get(pk=self.auctions[0].pk)
+        Auction.objects.filter(pk=stale.pk).touch()
+        Auction.objects.filter(pk=stale.pk).set_active(False)
+
+        stale.title = 'Renamed'
+        stale.save(update_fields=['title'])
+        self.assertEqual(stale.version, 4)
+        self.assertEqual(Auction.objects.get(pk=stale.pk).version, 4)
+
+    def test_cards_rendered_once_and_invalidated_by_version(self):
+        """Test warm listings reuse cached cards until the auction changes."""
+        from unittest import mock
+        from auctions import cards
+        
+        self.client.get('/')
+        with mock.patch.object(cards, 'render_to_string', wraps=cards.render_to_string) as render:
+            response = self.client.get('/')
+            self.assertEqual(render.call_count, 0)
+            self.assertContains(response, 'Card 0')
+            
+            auction = self.auctions[0]
+            auction.current_price = Decimal('175.00')
+            auction.save(update_fields=['current_price'])
+            response = self.client.get('/')
+            self.assertEqual(render.call_count, 1)
+            self.assertContains(response, '₹175.00')
+    
+    def test_cards_shared_across_users(self):
+        """Test cards cached for one visitor are reused for a logged-in user."""
+        from unittest import mock
+        from auctions import cards
+        
+        User.objects.create_user(username='buyer', email='buyer@test.com', password='testpass123')
+        self.client.get('/')
+        
+        self.client.login(username='buyer', password='testpass123')
+        with mock.patch.object(cards, 'render_to_string', wraps=cards.render_to_string) as render:
+            response = self.client.get('/')
+        self.assertEqual(render.call_count, 0)
+        self.assertContains(response, 'data-show-if="watching" hidden', count=5)
+    
+    def test_warm_listing_query_count(self):
+        """Test a warm anonymous listing costs one auction query."""
+        self.client.get('/auctions/')
+        with self.assertNumQueries(2):  # auctions page + category dropdown
+            self.client.get('/auctions/')
+
+
+class PageShellTests(TestCase):
+    """Tests for public page shells and the per-user state endpoint."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.auctions = [
+            Auction.objects.create(
+                title=f'Shell {i}',
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=timezone.now() + timedelta(days=1),
+                owner=self.seller
+            )
+            for i in range(3)
+        ]
+    
+    def test_anonymous_shells_are_public(self):
+        """Test anonymous listing and detail pages are cacheable and vary on Cookie."""
+        for url in ['/', '/auctions/', f'/auctions/{self.auctions[0].id}/']:
+            response = self.client.get(url)
+            self.assertIn('public', response['Cache-Control'], url)
+            self.assertIn('Cookie', response['Vary'], url)
+    
+    def test_public_shells_carry_no_cookie_or_csrf_token(self):
+        """Test no public response sets a cookie or embeds a CSRF token."""
+        from django.middleware.csrf import get_token
+        from django.contrib.auth.models import AnonymousUser
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from .shells import cacheable_shell
+        
+        urls = ['/', '/auctions/', f'/auctions/{self.auctions[0].id}/']
+        for url in urls:
+            response = self.client.get(url)
+            self.assertIn('public', response['Cache-Control'], url)
+            self.assertFalse(response.cookies, url)
+            self.assertNotIn(b'csrfmiddlewaretoken', response.content, url)
+        
+        # A flash message shown once is cleared with a cookie, so that page is private
+        self.client.post('/newsletter-signup/', {'email': 'fan@test.com'}, HTTP_REFERER='/auctions/')
+        response = self.client.get('/auctions/')
+        self.assertContains(response, 'Thank you for subscribing')
+        self.assertTrue(response.cookies)
+        self.assertIn('private', response['Cache-Control'])
+        
+        # Any shell that renders a CSRF token is private
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        response = cacheable_shell(lambda request: HttpResponse(get_token(request)))(request)
+        self.assertIn('private', response['Cache-Control'])
+    
+    def test_logged_in_pages_are_private(self):
+        """Test pages rendered for a logged-in user are not shared."""
+        self.client.login(username='buyer', password='testpass123')
+        response = self.client.get('/auctions/')
+        self.assertIn('private', response['Cache-Control'])
+    
+    def test_auction_state_api(self):
+        """Test the state endpoint returns per-user flags in one query per flag."""
+        from watchlist.models import Watchlist
+        
+        first, second, third = self.auctions
+        Watchlist.objects.create(user=self.buyer, auction=first)
+        Bid.objects.create(auction=second, user=self.buyer, amount=Decimal('150.00'))
+        Bid.objects.create(auction=third, user=self.buyer, amount=Decimal('150.00'))
+        Bid.objects.create(auction=third, user=self.seller, amount=Decimal('200.00'))
+        
+        self.client.login(username='buyer', password='testpass123')
+        ids = ','.join(str(auction.id) for auction in self.auctions)
+        with self.assertNumQueries(7):  # session + user + five flags
+            response = self.client.get('/api/me/auction-state', {'ids': ids})
+        
+        states = response.json()['auctions']
+        self.assertTrue(states[str(first.id)]['watching'])
+        self.assertFalse(states[str(first.id)]['has_bid'])
+        self.assertTrue(states[str(second.id)]['is_winner'])
+        self.assertTrue(states[str(third.id)]['has_bid'])
+        self.assertFalse(states[str(third.id)]['is_winner'])
+        self.assertIn('no-store', response['Cache-Control'])
+    
+    def test_auction_state_api_anonymous_and_bad_ids(self):
+        """Test anonymous callers get no flags and malformed or too many ids are rejected."""
+        response = self.client.get('/api/me/auction-state', {'ids': '1,2'})
+        self.assertEqual(response.json(), {'authenticated': False, 'auctions': {}})
+        
+        response = self.client.get('/api/me/auction-state', {'ids': '1,x'})
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.get('/api/me/auction-state', {'ids': ','.join(map(str, range(1, 202)))})
+        self.assertEqual(response.status_code, 400)
+
+
+class StatusBatchApiTests(TestCase):
+    """Tests for the multi-auction status endpoint."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.bidder = User.objects.create_user(
+            username='bidder',
+            email='bidder@test.com',
+            password='testpass123'
+        )
+        self.auctions = [
+            Auction.objects.create(
+                title=f'Status {i}',
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=timezone.now() + timedelta(days=1),
+                owner=self.seller
+            )
+            for i in range(20)
+        ]
+        self.ids = ','.join(str(auction.id) for auction in self.auctions)
+    
+    def test_fixed_query_count(self):
+        """Test many auctions are answered in two queries."""
+        for auction in self.auctions[:5]:
+            Bid.objects.create(auction=auction, user=self.bidder, amount=Decimal('120.00'))
+        
+        with self.assertNumQueries(2):
+            response = self.client.get('/auctions/api/status', {'ids': self.ids})
+        data = response.json()['auctions']
+        self.assertEqual(len(data), 20)
+        self.assertEqual(data[str(self.auctions[0].id)]['leader'], 'bidder')
+        self.assertIsNone(data[str(self.auctions[10].id)]['leader'])
+        self.assertEqual(data[str(self.auctions[10].id)]['status'], 'LIVE')
+    
+    def test_not_modified_until_a_bid(self):
+        """Test If-None-Match returns 304 until an auction's version changes."""
+        etag = self.client.get('/auctions/api/status', {'ids': self.ids})['ETag']
+        
+        with self.assertNumQueries(1):
+            response = self.client.get('/auctions/api/status', {'ids': self.ids}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        auction = self.auctions[3]
+        auction.current_price = Decimal('130.00')
+        auction.save(update_fields=['current_price'])
+        response = self.client.get('/auctions/api/status', {'ids': self.ids}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_rejects_too_many_ids(self):
+        """Test requests over the id limit are refused."""
+        ids = ','.join(str(i) for i in range(1, 202))
+        response = self.client.get('/auctions/api/status', {'ids': ids})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag/Last-Modified revalidation of auction endpoints."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Conditional',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() + timedelta(days=1),
+            owner=self.seller
+        )
+        self.status_url = f'/auctions/api/status/{self.auction.id}/'
+        self.detail_url = f'/auctions/{self.auction.id}/'
+    
+    def test_status_api_not_modified_in_one_query(self):
+        """Test an unchanged auction revalidates with a single lookup."""
+        response = self.client.get(self.status_url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(self.status_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_bid_and_gallery_change_etag(self):
+        """Test bids and gallery edits produce a new ETag."""
+        etag = self.client.get(self.status_url)['ETag']
+        self.auction.current_price = Decimal('120.00')
+        self.auction.save(update_fields=['current_price'])
+        response = self.client.get(self.status_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        
+        etag = response['ETag']
+        AuctionImage.objects.create(auction=self.auction, image='auction_gallery/a.gif')
+        response = self.client.get(self.status_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_detail_revalidates_per_user(self):
+        """Test the detail page 304s for the same visitor only."""
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('public', response['Cache-Control'])
+        
+        self.client.login(username='seller', password='testpass123')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_detail_revalidation_sends_winner_to_checkout_after_end(self):
+        """Test a page cached while live is not revalidated once the auction has ended."""
+        buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        Bid.objects.create(auction=self.auction, user=buyer, amount=Decimal('150.00'))
+        Auction.objects.filter(pk=self.auction.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.client.login(username='buyer', password='testpass123')
+        response = self.client.get(self.detail_url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        
+        Auction.objects.filter(pk=self.auction.pk).update(end_time=timezone.now() - timedelta(seconds=1))
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertRedirects(response, f'/payments/checkout/{self.auction.id}/', fetch_redirect_response=False)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 302)
+
+
+class ViewCounterTests(TestCase):
+    """Tests for buffered view counting."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.auctions = [
+            Auction.objects.create(
+                title=f'Viewed {i}',
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=timezone.now() + timedelta(days=1),
+                owner=self.seller
+            )
+            for i in range(2)
+        ]
+    
+    def test_views_flush_in_one_update(self):
+        """Test buffered views are written together in a single query."""
+        from unittest import mock
+        from django.test import override_settings
+        from auctions.views import auction_views
+        
+        first, second = self.auctions
+        with override_settings(VIEW_COUNT_FLUSH_INTERVAL=60), \
+                mock.patch('auctions.view_counter._flusher.start'):
+            for auction in (first, first, first, second):
+                auction_views.record(auction.id)
+            self.assertEqual(Auction.objects.get(pk=first.pk).view_count, 0)
+            self.assertEqual(auction_views.pending(first.id), 3)
+            
+            with self.assertNumQueries(1):
+                self.assertEqual(auction_views.flush(), 4)
+        
+        self.assertEqual(Auction.objects.get(pk=first.pk).view_count, 3)
+        self.assertEqual(Auction.objects.get(pk=second.pk).view_count, 1)
+    
+    def test_failed_flush_keeps_counts(self):
+        """Test counts survive a failed write and go out with the next flush."""
+        from unittest import mock
+        from django.db import DatabaseError
+        from django.test import override_settings
+        from auctions.views import auction_views
+        
+        auction = self.auctions[0]
+        with override_settings(VIEW_COUNT_FLUSH_INTERVAL=60), \
+                mock.patch('auctions.view_counter._flusher.start'):
+            auction_views.record(auction.id)
+            with mock.patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError), \
+                    self.assertLogs('auctions.view_counter', level='ERROR'):
+                self.assertEqual(auction_views.flush(), 0)
+            self.assertEqual(auction_views.pending(auction.id), 1)
+            auction_views.flush()
+        self.assertEqual(Auction.objects.get(pk=auction.pk).view_count, 1)
+    
+    def test_refresh_and_bot_dedup(self):
+        """Test repeat views and crawlers are not counted."""
+        auction = self.auctions[0]
+        url = f'/auctions/{auction.id}/'
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(url, HTTP_USER_AGENT='Googlebot/2.1')
+        self.assertEqual(Auction.objects.get(pk=auction.pk).view_count, 1)
+
+
+class AuctionFinalizerTests(TestCase):
+    """Tests for batch auction finalization."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.rival = User.objects.create_user(
+            username='rival',
+            email='rival@test.com',
+            password='testpass123'
+        )
+    
+    def _ended_auction(self, title, bids=(), reserve=None):
+        from reserve_price.models import ReservePrice
+        auction = Auction.objects.create(
+            title=title,
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() - timedelta(minutes=5),
+            owner=self.seller
+        )
+        for user, amount in bids:
+            Bid.objects.create(auction=auction, user=user, amount=Decimal(amount))
+        if bids:
+            Auction.objects.filter(pk=auction.pk).update(current_price=Decimal(bids[-1][1]))
+        if reserve:
+            ReservePrice.objects.create(auction=auction, amount=Decimal(reserve))
+        return auction
+    
+    def test_finalize_due_auctions(self):
+        """Test winners are invoiced, reserves applied and everyone notified."""
+        from django.core import mail
+        from auction_close.finalizer import finalize_auctions
+        from escrow.models import Escrow
+        from notifications.models import Notification
+        from payments.models import Invoice
+        
+        sold = self._ended_auction('Sold', [(self.rival, '150.00'), (self.buyer, '200.00')])
+        unmet = self._ended_auction('Unmet', [(self.buyer, '150.00')], reserve='500.00')
+        unsold = self._ended_auction('Unsold')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            result = finalize_auctions()
+        
+        self.assertEqual(result, {'closed': 3, 'invoiced': 1, 'reserve_not_met': 1, 'unsold': 1, 'kept_open': 0})
+        self.assertFalse(Auction.objects.filter(is_active=True).exists())
+        invoice = Invoice.objects.get()
+        self.assertEqual((invoice.auction, invoice.buyer, invoice.amount), (sold, self.buyer, Decimal('200.00')))
+        self.assertEqual(invoice.buyer_commission, Decimal('6.00'))
+        self.assertEqual(invoice.seller_commission, Decimal('20.00'))
+        self.assertTrue(Escrow.objects.filter(auction=sold, buyer=self.buyer).exists())
+        self.assertFalse(Invoice.objects.filter(auction__in=[unmet, unsold]).exists())
+        
+        self.assertEqual(Notification.objects.filter(user=self.seller).count(), 3)
+        self.assertEqual(Notification.objects.filter(user=self.buyer).count(), 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['buyer@test.com', 'rival@test.com'])
+        
+        # Nothing is due any more, and a rerun notifies nobody again
+        self.assertEqual(finalize_auctions()['closed'], 0)
+        self.assertEqual(finalize_auctions(Auction.objects.all())['invoiced'], 0)
+        self.assertEqual(Notification.objects.count(), 4)
+    
+    def test_query_count_independent_of_batch_size(self):
+        """Test a chunk costs the same queries for 2 or 8 auctions."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from auction_close.finalizer import finalize_auctions
+        
+        counts = []
+        for size in (2, 8):
+            batch = [
+                self._ended_auction(f'Batch {size}-{i}', [(self.rival, '150.00'), (self.buyer, '200.00')])
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(finalize_auctions(Auction.objects.filter(pk__in=[a.pk for a in batch]))['invoiced'], size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+    
+    def test_checkout_finalizes_pending_auction(self):
+        """Test winner checkout finalizes an auction the cron has not closed yet."""
+        from payments.models import Invoice
+        
+        sold = self._ended_auction('Sold', [(self.buyer, '200.00')])
+        unmet = self._ended_auction('Unmet', [(self.buyer, '150.00')], reserve='500.00')
+        self.client.login(username='buyer', password='testpass123')
+        
+        response = self.client.get(f'/payments/checkout/{sold.id}/')
+        self.assertRedirects(response, f'/payments/invoice/{sold.id}/', fetch_redirect_response=False)
+        self.assertTrue(Invoice.objects.filter(auction=sold).exists())
+        
+        response = self.client.get(f'/payments/checkout/{unmet.id}/')
+        self.assertRedirects(response, f'/auctions/{unmet.id}/', fetch_redirect_response=False)
+        self.assertFalse(Invoice.objects.filter(auction=unmet).exists())
+
+
+class ClosePipelineTests(TestCase):
+    """Tests for the explicit auction close pipeline."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Lifecycle Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() - timedelta(minutes=5),
+            owner=self.seller
+        )
+    
+    def test_ordinary_saves_issue_one_query(self):
+        """Test saves that are not closes run no lifecycle side effects."""
+        auction = Auction.objects.get(pk=self.auction.pk)
+        with self.assertNumQueries(1):
+            auction.view_count += 1
+            auction.save(update_fields=['view_count'])
+        with self.assertNumQueries(1):
+            auction.is_featured = True
+            auction.save()
+    
+    def test_pipeline_outcomes(self):
+        """Test the pipeline decides from the preloaded context without queries."""
+        from auction_close.pipeline import CloseContext, run_close_pipeline
+        from reserve_price.models import ReservePrice
+        
+        bid = Bid(auction=self.auction, user=self.buyer, amount=Decimal('150.00'))
+        reserve = ReservePrice(auction=self.auction, amount=Decimal('200.00'))
+        auction = Auction.objects.select_related('close_mode').get(pk=self.auction.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(run_close_pipeline(CloseContext(auction)), 'UNSOLD')
+            self.assertEqual(run_close_pipeline(CloseContext(auction, winning_bid=bid)), 'SOLD')
+            self.assertEqual(
+                run_close_pipeline(CloseContext(auction, winning_bid=bid, reserve=reserve)), 'RESERVE_NOT_MET'
+            )
+    
+    def test_soft_close_stays_open_during_late_bidding(self):
+        """Test the finalizer keeps soft-close auctions open unless forced."""
+        from auction_close.finalizer import finalize_auctions
+        from auction_close.models import AuctionCloseMode
+        
+        AuctionCloseMode.objects.create(auction=self.auction, mode='SOFT')
+        Bid.objects.create(auction=self.auction, user=self.buyer, amount=Decimal('150.00'))
+        
+        self.assertEqual(finalize_auctions()['closed'], 0)
+        self.assertTrue(Auction.objects.get(pk=self.auction.pk).is_active)
+        
+        result = finalize_auctions(Auction.objects.filter(pk=self.auction.pk), force=True)
+        self.assertEqual((result['closed'], result['invoiced']), (1, 1))
+
+
+class SoftCloseEngineTests(TestCase):
+    """Tests for the in-memory soft-close timers."""
+    
+    def test_bids_reset_the_idle_window(self):
+        """Test stages fire in order and a bid restarts them."""
+        from auction_close.soft_close import SoftCloseEngine
+        
+        start = timezone.now()
+        engine = SoftCloseEngine(idle=timedelta(seconds=30))
+        engine.track(1, start)
+        engine.track(2, start + timedelta(seconds=5))
+        
+        self.assertEqual([s[:2] for s in engine.due(start + timedelta(seconds=10))], [(1, 'GOING_ONCE')])
+        engine.track(1, start + timedelta(seconds=12))
+        # Earlier activity does not move the deadline back
+        self.assertFalse(engine.track(1, start + timedelta(seconds=11)))
+        self.assertEqual(engine.closes_at(1), start + timedelta(seconds=42))
+        
+        stages = [s[:2] for s in engine.due(start + timedelta(seconds=35))]
+        self.assertEqual(stages, [
+            (2, 'GOING_ONCE'), (1, 'GOING_ONCE'), (2, 'GOING_TWICE'), (1, 'GOING_TWICE'), (2, 'SOLD'),
+        ])
+        self.assertEqual([s[:2] for s in engine.due(start + timedelta(seconds=60))], [(1, 'SOLD')])
+    
+    def test_runner_closes_after_idle_window(self):
+        """Test the runner broadcasts stages, resets on bids and closes once."""
+        from unittest import mock
+        from django.test import override_settings
+        from auction_close.models import AuctionCloseMode
+        from auction_close.soft_close import SoftCloseRunner
+        from payments.models import Invoice
+        
+        seller = User.objects.create_user(username='seller', email='seller@test.com', password='testpass123')
+        buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='testpass123')
+        end = timezone.now()
+        auction = Auction.objects.create(
+            title='Soft Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=end,
+            owner=seller
+        )
+        AuctionCloseMode.objects.create(auction=auction, mode='SOFT')
+        
+        with override_settings(SOFT_CLOSE_IDLE_SECONDS=30), \
+                mock.patch('auction_close.soft_close.broadcast_auction_update') as broadcast:
+            runner = SoftCloseRunner()
+            self.assertEqual(runner.step(end + timedelta(seconds=11)), set())
+            
+            bid = Bid.objects.create(auction=auction, user=buyer, amount=Decimal('150.00'))
+            Bid.objects.filter(pk=bid.pk).update(timestamp=end + timedelta(seconds=15))
+            self.assertEqual(runner.step(end + timedelta(seconds=16)), set())
+            self.assertEqual(runner.step(end + timedelta(seconds=40)), set())
+            self.assertTrue(Auction.objects.get(pk=auction.pk).is_active)
+            
+            self.assertEqual(runner.step(end + timedelta(seconds=46)), {auction.pk})
+            self.assertEqual(runner.step(end + timedelta(seconds=90)), set())
+        
+        stages = [call.args[1]['soft_close']['stage'] for call in broadcast.call_args_list]
+        self.assertEqual(stages, ['GOING_ONCE', 'OPEN', 'GOING_ONCE', 'GOING_TWICE', 'SOLD'])
+        self.assertFalse(Auction.objects.get(pk=auction.pk).is_active)
+        self.assertEqual(Invoice.objects.filter(auction=auction, buyer=buyer).count(), 1)
+    
+    def test_bid_view_accepts_bids_until_idle(self):
+        """Test bids placed through the bid view are taken in the idle window and reset it."""
+        from unittest import mock
+        from django.test import override_settings
+        from auction_close.models import AuctionCloseMode
+        from auction_close.soft_close import SoftCloseRunner
+        
+        seller = User.objects.create_user(username='seller', email='seller@test.com', password='testpass123')
+        buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='testpass123')
+        rival = User.objects.create_user(username='rival', email='rival@test.com', password='testpass123')
+        auction = Auction.objects.create(
+            title='Soft Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() - timedelta(seconds=10),
+            owner=seller
+        )
+        AuctionCloseMode.objects.create(auction=auction, mode='SOFT')
+        bid_url = f'/auctions/place-bid/{auction.id}/'
+        detail_url = f'/auctions/{auction.id}/'
+        
+        with override_settings(SOFT_CLOSE_IDLE_SECONDS=30), \
+                mock.patch('auction_close.soft_close.broadcast_auction_update') as broadcast:
+            runner = SoftCloseRunner()
+            runner.step(timezone.now())
+            
+            self.client.login(username='buyer', password='testpass123')
+            self.client.post(bid_url, {'amount': '150.00'})
+            bid = Bid.objects.get(auction=auction, user=buyer)
+            self.assertEqual(runner.step(timezone.now()), set())
+            self.assertEqual(broadcast.call_args.args[1]['soft_close']['stage'], 'OPEN')
+            self.assertEqual(runner.engine.closes_at(auction.id), bid.timestamp + timedelta(seconds=30))
+            # Still bidding, so the leader is not sent to checkout yet
+            self.assertEqual(self.client.get(detail_url).status_code, 200)
+            
+            # Once the window has passed without bids, bidding is closed
+            Bid.objects.filter(pk=bid.pk).update(timestamp=timezone.now() - timedelta(seconds=31))
+            Auction.objects.filter(pk=auction.pk).update(end_time=timezone.now() - timedelta(seconds=60))
+            self.assertRedirects(
+                self.client.get(detail_url), f'/payments/checkout/{auction.id}/', fetch_redirect_response=False
+            )
+            self.client.login(username='rival', password='testpass123')
+            self.client.post(bid_url, {'amount': '200.00'})
+            self.assertFalse(Bid.objects.filter(auction=auction, user=rival).exists())
+
+
+class ShardLeaseTests(TestCase):
+    """Tests for sharded, lease-based close workers."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+    
+    def _ended_auctions(self, count, end_time):
+        auctions = []
+        for i in range(count):
+            auction = Auction.objects.create(
+                title=f'Sharded {i}',
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=end_time,
+                owner=self.seller
+            )
+            Bid.objects.create(auction=auction, user=self.buyer, amount=Decimal('150.00'))
+            auctions.append(auction)
+        return auctions
+    
+    def test_workers_split_shards(self):
+        """Test a second worker gets its fair share once the first rebalances."""
+        from auction_close.leases import ShardWorker
+        
+        now = timezone.now()
+        first = ShardWorker('first', shards=4, duration=timedelta(seconds=30))
+        second = ShardWorker('second', shards=4, duration=timedelta(seconds=30))
+        
+        self.assertEqual(first.heartbeat(now), [0, 1, 2, 3])
+        self.assertEqual(second.heartbeat(now), [])
+        first.heartbeat(now + timedelta(seconds=5))
+        second.heartbeat(now + timedelta(seconds=5))
+        
+        self.assertEqual(len(first.held), 2)
+        self.assertEqual(len(second.held), 2)
+        self.assertFalse(set(first.held) & set(second.held))
+    
+    def test_crash_and_takeover_closes_each_auction_once(self):
+        """Test shards of a crashed worker are taken over and nothing closes twice."""
+        from auction_close.leases import ShardWorker
+        from notifications.models import Notification
+        from payments.models import Invoice
+        
+        now = timezone.now()
+        lease = timedelta(seconds=30)
+        early = self._ended_auctions(6, now - timedelta(minutes=10))
+        late = self._ended_auctions(6, now + timedelta(seconds=10))
+        
+        crashed = ShardWorker('crashed', shards=4, duration=lease)
+        survivor = ShardWorker('survivor', shards=4, duration=lease)
+        crashed.heartbeat(now)
+        survivor.heartbeat(now)
+        crashed.step(now)
+        survivor.step(now)
+        self.assertFalse(Auction.objects.filter(pk__in=[a.pk for a in early], is_active=True).exists())
+        
+        # The crashed worker stops heartbeating; its leases run out
+        later = now + lease + timedelta(seconds=1)
+        survivor.step(later)
+        self.assertEqual(sorted(survivor.held), [0, 1, 2, 3])
+        
+        # Coming back after the takeover it has lost every lease and closes nothing
+        self.assertFalse(any(crashed.holds(shard, later) for shard in range(4)))
+        self.assertEqual(crashed.close_due(later)['closed'], 0)
+        crashed.step(later)
+        survivor.step(later)
+        
+        for auction in early + late:
+            self.assertFalse(Auction.objects.get(pk=auction.pk).is_active)
+            self.assertEqual(Invoice.objects.filter(auction=auction).count(), 1)
+            self.assertEqual(
+                Notification.objects.filter(user=self.seller, auction=auction, message__contains='has ended').count(), 1
+            )
+
+
+class InvoicePdfCacheTests(TestCase):
+    """Tests for cached, content-addressed invoice PDFs."""
+    
+    def setUp(self):
+        import tempfile
+        from unittest import mock
+        from django.test import override_settings
+        from payments.models import Invoice
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Invoiced',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('150.00'),
+            end_time=timezone.now() - timedelta(hours=1),
+            owner=self.seller,
+            is_active=False
+        )
+        self.invoice = Invoice.objects.create(
+            auction=self.auction,
+            buyer=self.buyer,
+            seller=self.seller,
+            amount=Decimal('150.00'),
+            buyer_commission=Decimal('4.50'),
+            seller_commission=Decimal('15.00')
+        )
+        self.url = f'/payments/invoice/{self.invoice.id}/download/'
+        
+        pdf_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(pdf_dir.cleanup)
+        root = override_settings(INVOICE_PDF_ROOT=pdf_dir.name, INVOICE_PDF_WORKERS=0)
+        root.enable()
+        self.addCleanup(root.disable)
+        
+        self.renders = []
+        patcher = mock.patch('payments.invoice_pdf.html_to_pdf', side_effect=self._fake_render)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _fake_render(self, html, path):
+        self.renders.append(html)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'%PDF-1.7 fake')
+        return str(path)
+    
+    def test_download_renders_once_and_revalidates(self):
+        """Test buyer and seller share one render and a matching ETag gets a 304."""
+        self.client.login(username='buyer', password='testpass123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7 fake')
+        etag = response['ETag']
+        
+        self.client.login(username='seller', password='testpass123')
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(self.renders), 1)
+    
+    def test_shipping_charge_change_rerenders(self):
+        """Test a new shipping charge is a new version and the command renders it."""
+        from io import StringIO
+        from django.core.management import call_command
+        from escrow.models import Escrow
+        from shipping.models import ShippingDetail
+        
+        call_command('render_invoice_pdfs', stdout=StringIO())
+        call_command('render_invoice_pdfs', stdout=StringIO())
+        self.assertEqual(len(self.renders), 1)
+        
+        escrow = Escrow.objects.create(auction=self.auction, buyer=self.buyer, seller=self.seller)
+        ShippingDetail.objects.create(
+            escrow=escrow,
+            full_name='John Doe',
+            phone='9876543210',
+            address_line1='123 Main Street',
+            city='Mumbai',
+            state='Maharashtra',
+            postal_code='400001',
+            delivery_charge=Decimal('80.00')
+        )
+        out = StringIO()
+        call_command('render_invoice_pdfs', '--prune', stdout=out)
+        self.assertEqual(len(self.renders), 2)
+        self.assertIn('80.00', self.renders[-1])
+        self.assertIn('Pruned 1', out.getvalue())
+
+
+class ImportProfileTests(TestCase):
+    """Tests for lazily imported heavy dependencies."""
+    
+    def test_worker_boot_skips_heavy_modules(self):
+        """Test booting Django and the URLconf loads no heavy optional module."""
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+        
+        out = StringIO()
+        call_command('import_profile', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        
+        self.assertEqual(report['heavy_loaded'], [])
+        self.assertIn('auctions', [row['name'] for row in report['apps'] if row['is_app']])
+
+
+class SettlementTests(TestCase):
+    """Tests for versioned commission rules and seller settlement."""
+    
+    def setUp(self):
+        from commission.models import CommissionRule
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.now = timezone.now()
+        self.change = self.now - timedelta(days=10)
+        CommissionRule.objects.create(effective_from=self.now - timedelta(days=400))
+        CommissionRule.objects.create(
+            effective_from=self.change,
+            buyer_percent=Decimal('2.50'),
+            seller_percent=Decimal('8.25')
+        )
+    
+    def _paid_invoice(self, amount, ended, seller=None, stored=('0.00', '0.00')):
+        from payments.models import Invoice
+        seller = seller or self.seller
+        auction = Auction.objects.create(
+            title='Sold',
+            description='Test',
+            starting_price=Decimal('1.00'),
+            current_price=Decimal(amount),
+            end_time=ended,
+            owner=seller,
+            is_active=False
+        )
+        return Invoice.objects.create(
+            auction=auction,
+            buyer=self.buyer,
+            seller=seller,
+            amount=Decimal(amount),
+            buyer_commission=Decimal(stored[0]),
+            seller_commission=Decimal(stored[1]),
+            status='PAID',
+            is_paid=True
+        )
+    
+    def test_rule_in_force_at_end_time(self):
+        """Test commissions come from the rule in force when the auction ended."""
+        from commission.services import CommissionSchedule, calculate_commission
+        
+        schedule = CommissionSchedule()
+        self.assertEqual(schedule.rates_at(self.change - timedelta(seconds=1)), (Decimal('3.00'), Decimal('10.00')))
+        self.assertEqual(schedule.rates_at(self.change), (Decimal('2.50'), Decimal('8.25')))
+        self.assertEqual(schedule.rates_at(self.now - timedelta(days=500)), (Decimal('3.00'), Decimal('10.00')))
+        # 8.25% of 100.10 = 8.25825 -> 8.26; 2.5% = 2.5025 -> 2.50
+        self.assertEqual(calculate_commission(Decimal('100.10')), (Decimal('8.26'), Decimal('2.50')))
+        # Before any rule both fall back to the same default rates
+        self.assertEqual(
+            calculate_commission(Decimal('100.00'), self.now - timedelta(days=500)),
+            (Decimal('10.00'), Decimal('3.00'))
+        )
+    
+    def test_fast_fee_matches_decimal_rounding(self):
+        """Test integer paise maths rounds exactly like commission_amount."""
+        import random
+        from commission.services import commission_amount
+        from commission.settlement import _fee, _units
+        
+        rng = random.Random(7)
+        for _ in range(2000):
+            amount = Decimal(rng.randrange(1, 10**9)).scaleb(-2)
+            percent = Decimal(rng.randrange(0, 10000)).scaleb(-2)
+            self.assertEqual(_fee(_units(amount), _units(percent)), _units(commission_amount(amount, percent)))
+    
+    def test_settle_per_seller_and_csv(self):
+        """Test payouts follow the invoices, mismatches with versioned rules are flagged, and rows stream to CSV."""
+        import csv
+        from io import StringIO
+        from django.core.management import call_command
+        from commission.settlement import settle
+        
+        other = User.objects.create_user(username='other', email='other@test.com', password='testpass123')
+        self._paid_invoice('1000.00', self.change - timedelta(days=1), stored=('30.00', '100.00'))
+        self._paid_invoice('200.00', self.change + timedelta(days=1), stored=('5.00', '16.50'))
+        self._paid_invoice('50.00', self.change + timedelta(days=2), seller=other)
+        unpaid = self._paid_invoice('999.00', self.change + timedelta(days=1))
+        unpaid.status, unpaid.is_paid = 'PENDING', False
+        unpaid.save()
+        self._paid_invoice('999.00', self.now - timedelta(days=60))
+        
+        settlement = settle(self.now - timedelta(days=30), self.now)
+        rows = {row['seller']: row for row in settlement.rows()}
+        self.assertEqual(rows['seller']['invoices'], 2)
+        self.assertEqual(rows['seller']['gross'], Decimal('1200.00'))
+        self.assertEqual(rows['seller']['seller_commission'], Decimal('116.50'))
+        self.assertEqual(rows['seller']['payout'], Decimal('1083.50'))
+        self.assertEqual(rows['seller']['mismatched'], 0)
+        # Paid on what was invoiced; the rule's 8.25% of 50 = 4.125 -> 4.13 is only reported
+        self.assertEqual(rows['other']['seller_commission'], Decimal('0.00'))
+        self.assertEqual(rows['other']['payout'], Decimal('50.00'))
+        self.assertEqual(rows['other']['mismatched'], 1)
+        self.assertEqual(rows['other']['rule_seller_commission'], Decimal('4.13'))
+        self.assertEqual(settlement.mismatched, 1)
+        self.assertEqual(settlement.totals()['payout'], Decimal('1133.50'))
+        
+        out = StringIO()
+        call_command(
+            'settle_payouts',
+            '--start', (self.now - timedelta(days=30)).date().isoformat(),
+            '--end', (self.now + timedelta(days=1)).date().isoformat(),
+            stdout=out, stderr=StringIO()
+        )
+        exported = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([row['seller'] for row in exported], ['seller', 'other'])
+        self.assertEqual(exported[0]['payout'], '1083.50')
+        self.assertEqual(exported[1]['mismatched'], '1')
+
+
+class PaymentVerificationTests(TestCase):
+    """Tests for bulk payment proof verification."""
+    
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='finance',
+            email='finance@test.com',
+            password='testpass123',
+            is_staff=True,
+            is_superuser=True
+        )
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+    
+    def _proof(self, amount='150.00', paid='150.00', payer=None, status='pending'):
+        from escrow.models import Escrow
+        from payments.models import Invoice, PaymentProof
+        auction = Auction.objects.create(
+            title='Paid for',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal(amount),
+            end_time=timezone.now() - timedelta(hours=1),
+            owner=self.seller,
+            is_active=False
+        )
+        Invoice.objects.create(
+            auction=auction,
+            buyer=self.buyer,
+            seller=self.seller,
+            amount=Decimal(amount),
+            buyer_commission=Decimal('4.50'),
+            seller_commission=Decimal('15.00')
+        )
+        Escrow.objects.create(auction=auction, buyer=self.buyer, seller=self.seller)
+        return PaymentProof.objects.create(
+            auction=auction,
+            payer=payer or self.buyer,
+            payee=self.seller,
+            amount=Decimal(paid),
+            direction='to_platform',
+            screenshot='payment_proofs/proof.png',
+            status=status
+        )
+    
+    def test_verify_batch_with_fixed_queries(self):
+        """Test a batch is verified in the same number of queries whatever its size."""
+        from django.core import mail
+        from escrow.models import Escrow
+        from notifications.models import Notification
+        from payments.models import Invoice, PaymentProof, PaymentVerification
+        from payments.verification import verify_proofs
+        
+        small = [self._proof() for _ in range(2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            # 9 for the proofs, invoices, escrows and audit; 8 to post the ledger
+            with self.assertNumQueries(17) as small_queries:
+                verify_proofs(PaymentProof.objects.filter(pk__in=[p.pk for p in small]), self.staff)
+        large = [self._proof() for _ in range(6)]
+        with self.assertNumQueries(len(small_queries.captured_queries)):
+            result = verify_proofs(PaymentProof.objects.filter(pk__in=[p.pk for p in large]), self.staff)
+        
+        self.assertEqual(result, {'verified': 6, 'invoices_paid': 6, 'escrows_paid': 6, 'skipped': {}})
+        self.assertEqual(PaymentProof.objects.filter(status='verified', verified_by=self.staff).count(), 8)
+        self.assertEqual(Invoice.objects.filter(status='PAID', is_paid=True).count(), 8)
+        self.assertEqual(Escrow.objects.filter(status='PAID').count(), 8)
+        self.assertEqual(PaymentVerification.objects.filter(action='VERIFIED').count(), 8)
+        self.assertEqual(Notification.objects.filter(user=self.buyer).count(), 8)
+        self.assertEqual(Notification.objects.filter(user=self.seller).count(), 8)
+        self.assertEqual(len(mail.outbox), 4)
+    
+    def test_invalid_proofs_are_skipped(self):
+        """Test underpaid, foreign and already handled proofs stay untouched."""
+        from payments.models import Invoice, PaymentProof, PaymentVerification
+        from payments.verification import verify_proofs
+        
+        good = self._proof()
+        underpaid = self._proof(paid='120.00')
+        stranger = self._proof(payer=self.seller)
+        handled = self._proof(status='rejected')
+        
+        result = verify_proofs(PaymentProof.objects.all(), self.staff)
+        
+        self.assertEqual(result['verified'], 1)
+        self.assertEqual(result['skipped'], {'underpaid': 1, 'not_buyer': 1, 'not_pending': 1})
+        self.assertEqual(PaymentProof.objects.get(pk=underpaid.pk).status, 'pending')
+        self.assertEqual(PaymentProof.objects.get(pk=handled.pk).status, 'rejected')
+        self.assertEqual(list(Invoice.objects.filter(is_paid=True).values_list('auction', flat=True)), [good.auction_id])
+        self.assertEqual(
+            PaymentVerification.objects.get(proof=stranger).reason, 'not_buyer'
+        )
+    
+    def test_admin_action(self):
+        """Test the admin action verifies the selection and reports skips."""
+        from payments.models import PaymentProof
+        
+        proofs = [self._proof(), self._proof(paid='1.00')]
+        self.client.login(username='finance', password='testpass123')
+        response = self.client.post('/admin/payments/paymentproof/', {
+            'action': 'verify_payment',
+            '_selected_action': [proof.pk for proof in proofs],
+        }, follow=True)
+        
+        self.assertContains(response, 'Verified 1 payment(s)')
+        self.assertContains(response, 'Skipped 1: 1 underpaid')
+        self.assertEqual(PaymentProof.objects.filter(status='verified').count(), 1)
+
+
+class ReconciliationTests(TestCase):
+    """Tests for bank statement reconciliation."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+    
+    def _invoice(self, amount, commission='0.00'):
+        from escrow.models import Escrow
+        from payments.models import Invoice
+        auction = Auction.objects.create(
+            title='Reconciled',
+            description='Test',
+            starting_price=Decimal('1.00'),
+            current_price=Decimal(amount),
+            end_time=timezone.now() - timedelta(hours=1),
+            owner=self.seller,
+            is_active=False
+        )
+        Escrow.objects.create(auction=auction, buyer=self.buyer, seller=self.seller)
+        return Invoice.objects.create(
+            auction=auction,
+            buyer=self.buyer,
+            seller=self.seller,
+            amount=Decimal(amount),
+            buyer_commission=Decimal(commission),
+            seller_commission=Decimal('0.00')
+        )
+    
+    def test_pay_invoice_records_reference(self):
+        """Test a bank transfer reference waits for reconciliation."""
+        from payments.models import InvoicePayment
+        
+        invoice = self._invoice('100.00')
+        self.client.login(username='buyer', password='testpass123')
+        self.client.post(f'/payments/pay/{invoice.id}/', {'method': 'NEFT', 'reference_id': ' UTR 42 '})
+        
+        payment = InvoicePayment.objects.get(invoice=invoice)
+        self.assertEqual((payment.reference_id, payment.status), ('UTR 42', 'INITIATED'))
+    
+    def test_statement_matches_references_invoices_and_proofs(self):
+        """Test one pass classifies lines and marks full payments as paid."""
+        import csv
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from escrow.models import Escrow
+        from payments.models import Invoice, InvoicePayment, PaymentProof
+        
+        by_reference = self._invoice('1000.00', commission='30.00')
+        payment = InvoicePayment.objects.create(
+            invoice=by_reference, method='NEFT', reference_id='UTR-111', status='INITIATED'
+        )
+        in_two_parts = self._invoice('500.00')
+        short = self._invoice('300.00')
+        by_proof = self._invoice('777.00')
+        proof = PaymentProof.objects.create(
+            auction=by_proof.auction,
+            payer=self.buyer,
+            payee=self.seller,
+            amount=Decimal('777.00'),
+            direction='to_platform',
+            screenshot='payment_proofs/proof.png'
+        )
+        
+        lines = [
+            ('Date', 'Narration', 'Chq./Ref.No.', 'Deposit Amt.'),
+            ('01/10/26', 'NEFT buyer', 'UTR111', '1,030.00'),
+            ('01/10/26', f'Auction INV-{in_two_parts.id} part 1', '', '200.00'),
+            ('02/10/26', 'ATM withdrawal', 'W1', ''),
+            ('02/10/26', f'INV{in_two_parts.id} rest', 'X9', '300.00'),
+            ('02/10/26', f'INV #{short.id}', '', '100.00'),
+            ('03/10/26', 'UPI payment', 'U77', '777.00'),
+            ('03/10/26', 'Unknown sender', 'ZZZ', '55.00'),
+            ('03/10/26', 'NEFT buyer again', 'UTR111', '1,030.00'),
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as statement:
+            csv.writer(statement).writerows(lines)
+        self.addCleanup(os.unlink, statement.name)
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as report:
+            pass
+        self.addCleanup(os.unlink, report.name)
+        
+        out = StringIO()
+        call_command('reconcile_statement', statement.name, '--report', report.name, stdout=out)
+        
+        self.assertIn('3 matched, 2 partial, 2 unmatched, 1 ignored', out.getvalue())
+        with open(report.name, newline='') as report_file:
+            statuses = [row['status'] for row in csv.DictReader(report_file)]
+        self.assertEqual(
+            statuses, ['matched', 'partial', 'ignored', 'matched', 'partial', 'matched', 'unmatched', 'unmatched']
+        )
+        paid = set(Invoice.objects.filter(is_paid=True, status='PAID').values_list('pk', flat=True))
+        self.assertEqual(paid, {by_reference.pk, in_two_parts.pk, by_proof.pk})
+        self.assertEqual(InvoicePayment.objects.get(pk=payment.pk).status, 'SUCCESS')
+        self.assertEqual(PaymentProof.objects.get(pk=proof.pk).status, 'verified')
+        self.assertEqual(Escrow.objects.get(auction=short.auction).status, 'PENDING_PAYMENT')
+        self.assertEqual(Escrow.objects.filter(status='PAID').count(), 3)
+    
+    def test_proof_matches_invoice_total_with_commission(self):
+        """Test a transfer of the invoice total matches a proof that records only the winning bid."""
+        from payments.models import Invoice, PaymentProof
+        from payments.reconciliation import MATCHED, apply, reconcile
+        
+        invoice = self._invoice('1000.00', commission='30.00')
+        Invoice.objects.filter(pk=invoice.pk).update(transport_charge=Decimal('50.00'))
+        proof = PaymentProof.objects.create(
+            auction=invoice.auction,
+            payer=self.buyer,
+            payee=self.seller,
+            amount=invoice.auction.current_price,
+            direction='to_platform',
+            screenshot='payment_proofs/proof.png'
+        )
+        
+        result = reconcile(['Narration,Reference,Amount', 'UPI payment,U1,"1,080.00"'])
+        self.assertEqual(result.counts[MATCHED], 1)
+        self.assertEqual(result.matched_proofs, {proof.pk})
+        apply(result)
+        self.assertTrue(Invoice.objects.get(pk=invoice.pk).is_paid)
+        self.assertEqual(PaymentProof.objects.get(pk=proof.pk).status, 'verified')
@@ -1,5 +1,6 @@
 from django.urls import path
-from . import views
+from . import views, async_views
+from .async_views import select_view
 from .bulk_upload import bulk_upload_auctions, download_csv_template
 
 urlpatterns = [
@@ -8,7 +9,8 @@ urlpatterns = [
     path('bulk-upload/', bulk_upload_auctions, name='bulk_upload_auctions'),
     path('bulk-upload/template/', download_csv_template, name='download_csv_template'),
     path('<int:auction_id>/', views.auction_detail, name='auction_detail'),
-    path('place-bid/<int:auction_id>/', views.auction_detail, name='place_bid'),
-    path('api/status/<int:auction_id>/', views.auction_status_api, name='auction_status_api'),
+    path('place-bid/<int:auction_id>/', select_view('place_bid', views.auction_detail, async_views.place_bid), name='place_bid'),
+    path('api/status', views.auction_status_batch_api, name='auction_status_batch_api'),
+    path('api/status/<int:auction_id>/', select_view('auction_status_api', views.auction_status_api, async_views.auction_status_api), name='auction_status_api'),
 ]
  
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Buffered view counters.
+
+Detail pages used to run ``UPDATE ... SET view_count = view_count + 1``
+(or a full ``save()``) on every hit, taking a write lock per view that
+competes with bid transactions. Views are now tallied in process memory
+and written by a background thread every VIEW_COUNT_FLUSH_INTERVAL
+seconds, as one UPDATE per model (per 500 objects):
+
+    UPDATE auctions_auction
+    SET view_count = view_count + CASE id WHEN 1 THEN 12 WHEN 7 THEN 3 END
+    WHERE id IN (1, 7)
+
+The flush thread and the flush at interpreter exit come from
+auctions.buffering, so a graceful worker shutdown loses nothing; a
+failed flush puts its counts back for the next attempt. A hard kill
+loses at most one interval.
+
+With VIEW_COUNT_DEDUP_SECONDS set, repeat views of the same object by
+the same visitor (session, else IP + user agent) inside that window are
+ignored, and user agents that look like crawlers are never counted.
+Setting VIEW_COUNT_FLUSH_INTERVAL to 0 writes every view immediately
+(as aliaunction.test_settings does).
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, Value, When
+
+from .buffering import PeriodicFlusher
+
+logger = logging.getLogger(__name__)
+
+# Keeps each UPDATE's parameter count well inside SQLite's limit
+FLUSH_BATCH_SIZE = 500
+
+BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|preview|headless', re.IGNORECASE)
+
+
+class ViewCounter:
+    def __init__(self, model, field, label):
+        self.model = model
+        self.field = field
+        self.label = label
+        self._pending = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, pk, request=None):
+        """Count one view of ``pk`` unless it is a bot or a recent repeat."""
+        if request is not None and not _should_count(request, self.label, pk):
+            return False
+        with self._lock:
+            self._pending[pk] += 1
+        if _flusher.immediate():
+            self.flush()
+        else:
+            _flusher.start()
+        return True
+
+    def pending(self, pk):
+        with self._lock:
+            return self._pending.get(pk, 0)
+
+    def flush(self):
+        """Write all pending increments, one UPDATE per FLUSH_BATCH_SIZE objects."""
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+        items = list(batch.items())
+        written = 0
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            chunk = dict(items[start:start + FLUSH_BATCH_SIZE])
+            try:
+                delta = Case(*[When(pk=pk, then=Value(count)) for pk, count in chunk.items()], default=Value(0))
+                self.model._default_manager.filter(pk__in=list(chunk)).update(
+                    **{self.field: F(self.field) + delta}
+                )
+            except Exception:
+                logger.exception('Failed to flush %s view counts; retrying later', self.label)
+                with self._lock:
+                    self._pending.update(dict(items[start:]))
+                break
+            written += sum(chunk.values())
+        return written
+
+
+def _should_count(request, label, pk):
+    dedup_seconds = getattr(settings, 'VIEW_COUNT_DEDUP_SECONDS', 0)
+    if not dedup_seconds:
+        return True
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if BOT_PATTERN.search(user_agent):
+        return False
+    visitor = getattr(request, 'session', None) and request.session.session_key
+    if not visitor:
+        raw = f"{request.META.get('REMOTE_ADDR', '')}|{user_agent}"
+        visitor = hashlib.sha1(raw.encode()).hexdigest()
+    return cache.add(f'viewdedup:{label}:{pk}:{visitor}', 1, dedup_seconds)
+
+
+_counters = []
+
+
+def register(model, field):
+    counter = ViewCounter(model, field, model._meta.label_lower)
+    _counters.append(counter)
+    return counter
+
+
+def flush_all():
+    return sum(counter.flush() for counter in _counters)
+
+
+_flusher = PeriodicFlusher('view-counter-flush', flush_all, 'VIEW_COUNT_FLUSH_INTERVAL')
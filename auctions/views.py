@@ -1,24 +1,42 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import F
+from django.db.models import OuterRef, Subquery
 from .models import Auction, Bid
 from .forms import AuctionForm, BidForm
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
 from django.core.mail import send_mail
 from django.conf import settings
 from notifications.models import Notification
 from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from django.core.exceptions import ValidationError
 from auction_ws.utils import broadcast_auction_update
 from bid_protection.validators import validate_bid
 from bid_protection.rate_limiting import rate_limit_bids
 from auction_status.utils import get_auction_status
 from reserve_price.utils import reserve_status
+from auction_close.utils import in_soft_close_window
 from reviews.utils import get_reputation
 from datetime import timedelta
+import hashlib
 from watchlist.models import Watchlist
-from payments.models import Invoice
+from payments.models import Invoice, PaymentProof
+from .search import search_auctions
+from .pagination import paginate, wants_json, page_json_response
+from .cards import attach_cards
+from .shells import cacheable_shell
+from .conditional import auction_condition
+from . import view_counter
+from analytics import events as engagement
+from analytics.models import EngagementEvent
+
+# Most auctions auction_state_api / auction_status_batch_api answer for in one call
+AUCTION_STATE_MAX_IDS = 200
+AUCTION_STATUS_MAX_IDS = 200
+
+auction_views = view_counter.register(Auction, 'view_count')
 
 # Create your views here.
 
@@ -63,6 +81,9 @@ def apply_anti_sniping(auction):
     
     now = timezone.now()
     time_remaining = auction.end_time - now
+    if time_remaining <= timedelta(0):
+        # A bid in a soft-close idle window; the idle timer restarts instead
+        return False
     threshold = timedelta(minutes=config.threshold_minutes)
     
     if time_remaining <= threshold:
@@ -80,20 +101,16 @@ def apply_anti_sniping(auction):
     return False
 
 
+@cacheable_shell
 def auction_list(request):
-    # Show all auctions that haven't expired yet
-    # Include auctions with workflow__status="LIVE" OR auctions without workflow objects
-    from django.db.models import Q
+    # Show live auctions that are approved (workflow LIVE) or have no workflow
     from auctions.models import Category
     from datetime import timedelta
     
     now = timezone.now()
     
-    # Base queryset
-    auctions = Auction.objects.filter(
-        Q(workflow__status="LIVE") | Q(workflow__isnull=True),
-        end_time__gt=now
-    )
+    # Base queryset: approved auctions that are currently live
+    auctions = Auction.objects.published().live(now).select_related('category', 'workflow')
     
     # Get filter parameters
     search_query = request.GET.get('q', '').strip()
@@ -103,14 +120,7 @@ def auction_list(request):
     ending_soon = request.GET.get('ending_soon', '') == '1'
     new_auctions = request.GET.get('new', '') == '1'
     live_only = request.GET.get('live_only', '') == '1'
-    sort_by = request.GET.get('sort', '-created_at')
-    
-    # Apply search filter
-    if search_query:
-        auctions = auctions.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+    sort_by = request.GET.get('sort', '')
     
     # Apply category filter
     if category_slug:
@@ -139,16 +149,28 @@ def auction_list(request):
         new_threshold = now - timedelta(days=7)
         auctions = auctions.filter(created_at__gte=new_threshold)
     
-    # Live only filter (already applied by default, but explicit check)
-    if live_only:
-        auctions = auctions.filter(is_active=True)
+    # Apply search filter (ranked by relevance unless another sort is chosen)
+    if search_query:
+        auctions = search_auctions(auctions, search_query)
     
-    # Sort
-    valid_sorts = ['-created_at', 'created_at', '-current_price', 'current_price', 'end_time', '-end_time']
-    if sort_by in valid_sorts:
-        auctions = auctions.order_by(sort_by)
-    else:
-        auctions = auctions.order_by('-created_at')
+    # Sort: each option pages on a stable (key, id) pair; relevance pages by offset
+    sort_keys = {
+        '-created_at': ('-created_at', '-id'),
+        'created_at': ('created_at', 'id'),
+        '-current_price': ('-current_price', '-id'),
+        'current_price': ('current_price', 'id'),
+        'end_time': ('end_time', 'id'),
+        '-end_time': ('-end_time', '-id'),
+    }
+    if sort_by not in sort_keys and not search_query:
+        sort_by = '-created_at'
+    page = paginate(request, auctions, sort_keys.get(sort_by))
+    if search_query:
+        engagement.record_many(EngagementEvent.IMPRESSION, page.object_list, request.user)
+    if wants_json(request):
+        return page_json_response(page)
+    
+    attach_cards(page.object_list, 'auctions/_list_card.html')
     
     # Get featured auctions first
     featured = auctions.filter(is_featured=True).order_by('featured_order')
@@ -157,7 +179,7 @@ def auction_list(request):
     categories = Category.objects.filter(is_active=True).order_by('order', 'name')
     
     return render(request, 'auctions/auction_list.html', {
-        'auctions': auctions,
+        'auctions': page,
         'featured_auctions': featured,
         'categories': categories,
         'now': now,
@@ -193,47 +215,30 @@ def send_auction_won_email(winner, auction):
         )
 
 
+@cacheable_shell
+@auction_condition(per_user=True)
 @rate_limit_bids
 def auction_detail(request, auction_id):
     auction = get_object_or_404(Auction, id=auction_id)
     
-    # Increment view count
-    Auction.objects.filter(id=auction_id).update(view_count=F('view_count') + 1)
+    # Buffered; written in batches by auctions.view_counter / analytics.events
+    if auction_views.record(auction.id, request):
+        engagement.record(EngagementEvent.VIEW, auction, request.user)
     
     bids = auction.bids.order_by('-timestamp')
     reviews = [] 
     gallery_images = auction.images.all()
-    has_bid = False
     already_reviewed = False
-    is_winner = False
-    has_payment_proof = False
-    in_watchlist = False
-    has_invoice = False
-    invoice_id = None
-    watchlist_ids = []
     
-    if request.user.is_authenticated:
-        has_bid = bids.filter(user=request.user).exists()
-        # Check if in watchlist
-        watchlist_ids = list(Watchlist.objects.filter(user=request.user).values_list('auction_id', flat=True))
-        in_watchlist = auction.id in watchlist_ids
-        # Check if user is the winner (highest bidder)
+    # Per-user flags (watchlist, bids, winner, invoice) are hydrated from
+    # auction_state_api; only the winner's checkout redirect happens here
+    if request.user.is_authenticated and auction.end_time <= timezone.now():
         highest_bid = auction.bids.order_by('-amount', '-timestamp').first()
-        if highest_bid and highest_bid.user == request.user:
-            is_winner = True
-            if auction.end_time <= timezone.now():
-                if not Invoice.objects.filter(auction=auction).exists():
-                    return redirect('winner_checkout', auction_id=auction.id)
-            
-            # Check if invoice exists for this auction
-            try:
-                invoice = Invoice.objects.get(auction=auction)
-                has_invoice = True
-                invoice_id = invoice.id
-            except Invoice.DoesNotExist:
-                pass
-        # Check if user has already uploaded payment proof
-        has_payment_proof = auction.payment_proofs.filter(payer=request.user, direction='to_platform').exists()
+        if highest_bid and highest_bid.user_id == request.user.id and reserve_status(auction) != 'NOT_MET':
+            # Soft-close auctions keep taking bids until bidding goes idle
+            still_bidding = in_soft_close_window(auction)
+            if not still_bidding and not Invoice.objects.filter(auction=auction).exists():
+                return redirect('winner_checkout', auction_id=auction.id)
     
     if request.method == 'POST':
         if not request.user.is_authenticated:
@@ -262,6 +267,7 @@ def auction_detail(request, auction_id):
                 ip_address=get_client_ip(request),
                 user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
             )
+            engagement.record(EngagementEvent.BID, auction, request.user, amount)
             auction.current_price = amount
             auction.save()
             
@@ -296,14 +302,7 @@ def auction_detail(request, auction_id):
         'form': form, 
         'reviews': reviews, 
         'gallery_images': gallery_images,
-        'has_bid': has_bid, 
         'already_reviewed': already_reviewed,
-        'is_winner': is_winner,
-        'has_payment_proof': has_payment_proof,
-        'in_watchlist': in_watchlist,
-        'has_invoice': has_invoice,
-        'invoice_id': invoice_id,
-        'watchlist_ids':  watchlist_ids,
         'status': get_auction_status(auction),
         'reserve_status': reserve_status(auction),
         'seller_reputation': get_reputation(auction.owner),
@@ -312,6 +311,94 @@ def auction_detail(request, auction_id):
     })
 
 
+def auction_state_api(request):
+    """
+    Per-user flags for the auctions shown on a page: ``?ids=1,2,3`` (max 200).
+    
+    Pages render the same HTML for everyone and fetch this to mark
+    watchlist hearts, dispute links and winner/invoice actions. Each flag
+    is one query across all requested auctions.
+    """
+    try:
+        ids = list(dict.fromkeys(int(i) for i in request.GET.get('ids', '').split(',') if i.strip()))
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma-separated list of integers'}, status=400)
+    if len(ids) > AUCTION_STATE_MAX_IDS:
+        return JsonResponse({'error': f'at most {AUCTION_STATE_MAX_IDS} ids per request'}, status=400)
+    
+    user = request.user
+    states = {}
+    if user.is_authenticated and ids:
+        watching = set(Watchlist.objects.filter(user=user, auction_id__in=ids).values_list('auction_id', flat=True))
+        bid_on = set(Bid.objects.filter(user=user, auction_id__in=ids).values_list('auction_id', flat=True))
+        leader = Bid.objects.filter(auction=OuterRef('pk')).order_by('-amount', '-timestamp').values('user_id')[:1]
+        leading = set(
+            Auction.objects.filter(id__in=ids).annotate(leader_id=Subquery(leader))
+            .filter(leader_id=user.id).values_list('id', flat=True)
+        )
+        invoices = dict(Invoice.objects.filter(buyer=user, auction_id__in=ids).values_list('auction_id', 'id'))
+        proofs = set(
+            PaymentProof.objects.filter(payer=user, direction='to_platform', auction_id__in=ids)
+            .values_list('auction_id', flat=True)
+        )
+        for auction_id in ids:
+            states[auction_id] = {
+                'watching': auction_id in watching,
+                'has_bid': auction_id in bid_on,
+                'is_winner': auction_id in leading,
+                'invoice_id': invoices.get(auction_id),
+                'has_payment_proof': auction_id in proofs,
+            }
+    
+    response = JsonResponse({'authenticated': user.is_authenticated, 'auctions': states})
+    patch_vary_headers(response, ('Cookie',))
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+def auction_status_batch_api(request):
+    """
+    Live price, end time, leader and status for ``?ids=1,2,3`` (max 200).
+    
+    Answers in at most two queries however many ids are asked for. The
+    ETag hashes each auction's (id, version, status); a matching
+    If-None-Match gets a 304 after the first, light query.
+    """
+    try:
+        ids = sorted({int(i) for i in request.GET.get('ids', '').split(',') if i.strip()})
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma-separated list of integers'}, status=400)
+    if len(ids) > AUCTION_STATUS_MAX_IDS:
+        return JsonResponse({'error': f'at most {AUCTION_STATUS_MAX_IDS} ids per request'}, status=400)
+    
+    auctions = Auction.objects.filter(id__in=ids).with_status().order_by('id')
+    versions = list(auctions.values_list('id', 'version', 'status'))
+    etag = quote_etag(hashlib.sha1(repr(versions).encode()).hexdigest())
+    
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        leader = Bid.objects.filter(auction=OuterRef('pk')).order_by('-amount', '-timestamp').values('user__username')[:1]
+        rows = auctions.annotate(leader=Subquery(leader)).values(
+            'id', 'current_price', 'end_time', 'status', 'leader'
+        )
+        response = JsonResponse({
+            'auctions': {
+                row['id']: {
+                    'current_price': str(row['current_price']),
+                    'end_time': row['end_time'].isoformat(),
+                    'leader': row['leader'],
+                    'status': row['status'],
+                }
+                for row in rows
+            }
+        })
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@auction_condition()
 def auction_status_api(request, auction_id):
     auction = get_object_or_404(Auction, id=auction_id)
     bids = auction.bids.order_by('-timestamp')[:10]
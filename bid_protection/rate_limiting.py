@@ -4,6 +4,7 @@ Provides simple in-memory rate limiting for bids and login attempts.
 """
 import time
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.http import JsonResponse
 from django.shortcuts import render
 
@@ -66,71 +67,94 @@ def get_client_ip(request):
     return request.META.get('REMOTE_ADDR', 'unknown')
 
 
+def _rate_limited_response(request, endpoint, reset_time):
+    """Build the 429 response for a request that exceeded its limit."""
+    wait_time = int(reset_time - time.time())
+    
+    # Return JSON for AJAX requests
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'error': 'rate_limited',
+            'message': f'Too many requests. Please wait {wait_time} seconds.',
+            'retry_after': wait_time
+        }, status=429)
+    
+    # Return HTML for regular requests
+    from django.contrib import messages
+    messages.error(request, f'Too many attempts. Please wait {wait_time} seconds before trying again.')
+    
+    # For login, redirect back to login page
+    if 'login' in endpoint.lower():
+        from django.shortcuts import redirect
+        return redirect('login')
+    
+    # For other endpoints, just show the error
+    return render(request, 'rate_limited.html', {
+        'wait_time': wait_time,
+        'retry_after': reset_time
+    }, status=429)
+
+
+def _add_rate_limit_headers(response, max_requests, remaining, reset_time):
+    response['X-RateLimit-Limit'] = str(max_requests)
+    response['X-RateLimit-Remaining'] = str(remaining)
+    response['X-RateLimit-Reset'] = str(int(reset_time))
+    return response
+
+
 def rate_limit(max_requests=10, window_seconds=60, key_func=None):
     """
     Rate limiting decorator for views.
     
+    Works for both sync and async views; async views keep running on the
+    event loop and resolve the user with ``request.auser()``.
+    
     Args:
         max_requests: Maximum number of requests allowed in the time window
         window_seconds: Time window in seconds
         key_func: Optional function to extract rate limit key from request
                   Default uses IP address
     """
+    def get_identifier(request, user):
+        if key_func:
+            return key_func(request)
+        # Use IP + user ID if authenticated
+        ip = get_client_ip(request)
+        if user.is_authenticated:
+            return f"{ip}:user:{user.id}"
+        return ip
+    
     def decorator(view_func):
+        # Get endpoint name
+        endpoint = f"{view_func.__module__}.{view_func.__name__}"
+        
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                is_allowed, remaining, reset_time = RateLimitStore.check_rate_limit(
+                    get_identifier(request, user), endpoint, max_requests, window_seconds
+                )
+                if not is_allowed:
+                    return _rate_limited_response(request, endpoint, reset_time)
+                
+                response = await view_func(request, *args, **kwargs)
+                return _add_rate_limit_headers(response, max_requests, remaining, reset_time)
+            return async_wrapper
+        
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            # Get identifier for rate limiting
-            if key_func:
-                identifier = key_func(request)
-            else:
-                # Use IP + user ID if authenticated
-                ip = get_client_ip(request)
-                if request.user.is_authenticated:
-                    identifier = f"{ip}:user:{request.user.id}"
-                else:
-                    identifier = ip
-            
-            # Get endpoint name
-            endpoint = f"{view_func.__module__}.{view_func.__name__}"
-            
             # Check rate limit
             is_allowed, remaining, reset_time = RateLimitStore.check_rate_limit(
-                identifier, endpoint, max_requests, window_seconds
+                get_identifier(request, request.user), endpoint, max_requests, window_seconds
             )
             
             if not is_allowed:
-                wait_time = int(reset_time - time.time())
-                
-                # Return JSON for AJAX requests
-                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                    return JsonResponse({
-                        'error': 'rate_limited',
-                        'message': f'Too many requests. Please wait {wait_time} seconds.',
-                        'retry_after': wait_time
-                    }, status=429)
-                
-                # Return HTML for regular requests
-                from django.contrib import messages
-                messages.error(request, f'Too many attempts. Please wait {wait_time} seconds before trying again.')
-                
-                # For login, redirect back to login page
-                if 'login' in endpoint.lower():
-                    from django.shortcuts import redirect
-                    return redirect('login')
-                
-                # For other endpoints, just show the error
-                return render(request, 'rate_limited.html', {
-                    'wait_time': wait_time,
-                    'retry_after': reset_time
-                }, status=429)
+                return _rate_limited_response(request, endpoint, reset_time)
             
             # Add rate limit headers to response
             response = view_func(request, *args, **kwargs)
-            response['X-RateLimit-Limit'] = str(max_requests)
-            response['X-RateLimit-Remaining'] = str(remaining)
-            response['X-RateLimit-Reset'] = str(int(reset_time))
-            
-            return response
+            return _add_rate_limit_headers(response, max_requests, remaining, reset_time)
         return wrapper
     return decorator
 
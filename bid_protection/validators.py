@@ -1,5 +1,6 @@
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from auction_close.utils import in_soft_close_window
 from auction_status.utils import get_auction_status
 from .models import UserStatus
 
@@ -12,13 +13,18 @@ def validate_bid(user, auction, amount):
     if auction.owner == user:
         raise ValidationError("You cannot bid on your own auction.")
 
+    # Soft-close auctions keep taking bids after end_time until bidding
+    # has been idle for SOFT_CLOSE_IDLE_SECONDS (auction_close.soft_close)
+    now = timezone.now()
+    soft_close_open = now >= auction.end_time and in_soft_close_window(auction, now)
+
     # Auction status validation
     status = get_auction_status(auction)
-    if status != "LIVE":
+    if status != "LIVE" and not soft_close_open:
         raise ValidationError("Bidding is allowed only on live auctions.")
 
     # Auction end time
-    if timezone.now() >= auction.end_time:
+    if now >= auction.end_time and not soft_close_open:
         raise ValidationError("This auction has already ended.")
 
     # User suspension check
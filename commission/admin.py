@@ -3,9 +3,8 @@ from .models import CommissionRule
 
 @admin.register(CommissionRule)
 class CommissionRuleAdmin(admin.ModelAdmin):
-    list_display = ("seller_percent", "buyer_percent", "is_active", "created_at")
-
-    def save_model(self, request, obj, form, change):
-        if obj.is_active:
-            CommissionRule.objects.exclude(id=obj.id).update(is_active=False)
-        super().save_model(request, obj, form, change)
+    # Rules are versions: add a new one with a later effective_from instead
+    # of editing or deactivating the old one (see commission.services)
+    list_display = ("effective_from", "seller_percent", "buyer_percent", "is_active", "created_at")
+    list_filter = ("is_active",)
+    date_hierarchy = "effective_from"
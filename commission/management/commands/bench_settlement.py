@@ -0,0 +1,117 @@
+"""
+Management command to measure settlement throughput and memory.
+Run: python manage.py bench_settlement --invoices 1000000
+
+Creates paid invoices (one ended auction each) spread over --sellers
+sellers and two commission rules inside a transaction that is rolled
+back at the end, so the database is left untouched. Settles them with
+the streaming engine and, with --baseline, by loading Invoice instances
+and computing each commission with Decimal, and reports invoices per
+second and peak traced memory for each.
+"""
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from auctions.models import Auction
+from commission.models import CommissionRule
+from commission.services import CommissionSchedule, commission_amount
+from commission.settlement import paid_invoices, settle
+from payments.models import Invoice
+from users.models import User
+
+BATCH_SIZE = 2000
+
+
+def settle_with_instances(start, end):
+    """The obvious ORM version: model instances and a Decimal per rule check."""
+    schedule = CommissionSchedule()
+    sellers = {}
+    for invoice in paid_invoices(start, end).select_related('auction'):
+        buyer_percent, seller_percent = schedule.rates_at(invoice.auction.end_time)
+        rule_seller = commission_amount(invoice.amount, seller_percent)
+        totals = sellers.setdefault(invoice.seller_id, [0, Decimal('0'), Decimal('0'), Decimal('0'), 0, Decimal('0')])
+        totals[0] += 1
+        totals[1] += invoice.amount
+        totals[2] += invoice.buyer_commission
+        totals[3] += invoice.seller_commission
+        totals[5] += rule_seller
+        if (invoice.buyer_commission != commission_amount(invoice.amount, buyer_percent)
+                or invoice.seller_commission != rule_seller):
+            totals[4] += 1
+    return sellers
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the streaming settlement engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invoices', type=int, default=1000000, help='Paid invoices to settle (default: 1000000)')
+        parser.add_argument('--sellers', type=int, default=1000, help='Distinct sellers (default: 1000)')
+        parser.add_argument('--baseline', action='store_true', help='Also time the model-instance version')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start, end = self._create_invoices(options['invoices'], options['sellers'])
+            methods = [('streaming', lambda: settle(start, end))]
+            if options['baseline']:
+                methods.append(('instances', lambda: settle_with_instances(start, end)))
+
+            self.stdout.write(f'{"method":<12}{"invoices":>10}{"seconds":>10}{"invoices/s":>12}{"peak MB":>10}')
+            for method, run in methods:
+                tracemalloc.start()
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                count = options['invoices']
+                self.stdout.write(f'{method:<12}{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}{peak / 2**20:>10.1f}')
+            transaction.set_rollback(True)
+
+    def _create_invoices(self, count, seller_count):
+        rng = random.Random(42)
+        stamp = time.time_ns()
+        now = timezone.now()
+        start, end = now - timedelta(days=30), now
+        CommissionRule.objects.bulk_create([
+            CommissionRule(effective_from=start - timedelta(days=365)),
+            CommissionRule(effective_from=start + timedelta(days=15), seller_percent=Decimal('8.50'), buyer_percent=Decimal('2.75')),
+        ])
+        sellers = User.objects.bulk_create([
+            User(username=f'bench_settle_{stamp}_{i}', email=f'seller{i}@example.com') for i in range(seller_count)
+        ])
+        buyer = User.objects.create_user(username=f'bench_settle_{stamp}_buyer', email='buyer@example.com')
+
+        self.stdout.write(f'Creating {count} paid invoices...')
+        for offset in range(0, count, BATCH_SIZE):
+            size = min(BATCH_SIZE, count - offset)
+            auctions = Auction.objects.bulk_create([
+                Auction(
+                    title=f'Bench settlement {offset + i}',
+                    description='Synthetic',
+                    starting_price=Decimal('100.00'),
+                    current_price=Decimal('100.00'),
+                    end_time=start + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+                    owner=rng.choice(sellers),
+                    is_active=False,
+                )
+                for i in range(size)
+            ])
+            invoices = []
+            for auction in auctions:
+                amount = Decimal(rng.randrange(10000, 10000000)).scaleb(-2)
+                invoices.append(Invoice(
+                    auction=auction, buyer=buyer, seller=auction.owner, amount=amount,
+                    buyer_commission=commission_amount(amount, Decimal('3.00')),
+                    seller_commission=commission_amount(amount, Decimal('10.00')),
+                    status='PAID', is_paid=True,
+                ))
+            Invoice.objects.bulk_create(invoices)
+        return start, end
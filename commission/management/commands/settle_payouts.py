@@ -0,0 +1,70 @@
+"""
+Management command to settle seller payouts for a period.
+Run: python manage.py settle_payouts --start 2026-09-01 --end 2026-10-01 --output payouts.csv
+
+Totals paid invoices of auctions that ended in [start, end) per seller,
+paying out on the invoiced commission and flagging invoices that differ
+from the rule in force when the auction ended (see commission.settlement),
+and streams one CSV row per seller to --output (default: stdout).
+Without dates it settles the previous calendar month.
+"""
+from datetime import date, datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from commission.settlement import SETTLE_CHUNK_SIZE, settle, write_csv
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD')
+
+
+def _month_start_before(day):
+    """First day of the month before ``day`` (or of its own month if ``day`` is mid-month)."""
+    if day.day > 1:
+        return day.replace(day=1)
+    if day.month == 1:
+        return date(day.year - 1, 12, 1)
+    return date(day.year, day.month - 1, 1)
+
+
+class Command(BaseCommand):
+    help = 'Compute per-seller payouts for a period and export them as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day of the period (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Day after the period (YYYY-MM-DD)')
+        parser.add_argument('--output', help='CSV file to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=SETTLE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        this_month = timezone.localdate().replace(day=1)
+        end = _parse_date(options['end']) if options['end'] else this_month
+        start = _parse_date(options['start']) if options['start'] else _month_start_before(end)
+        if start >= end:
+            raise CommandError('--start must be before --end')
+
+        settlement = settle(
+            timezone.make_aware(datetime.combine(start, time.min)),
+            timezone.make_aware(datetime.combine(end, time.min)),
+            chunk_size=options['chunk_size'],
+        )
+        if options['output']:
+            with open(options['output'], 'w', newline='') as out:
+                write_csv(settlement, out)
+            report = self.stdout
+        else:
+            write_csv(settlement, self.stdout)
+            report = self.stderr
+
+        totals = settlement.totals()
+        report.write(self.style.SUCCESS(
+            f"Settled {start} to {end}: {totals['invoices']} invoice(s) for {totals['sellers']} seller(s), "
+            f"gross {totals['gross']}, commission {totals['seller_commission']} seller / "
+            f"{totals['buyer_commission']} buyer, payout {totals['payout']} "
+            f"({totals['mismatched']} invoice(s) differ from the commission rule)"
+        ))
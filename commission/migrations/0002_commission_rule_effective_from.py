@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:04
+
+from datetime import datetime, timezone
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_effective_from(apps, schema_editor):
+    """
+    Rules take effect when they were created. Before versioning the active
+    rule applied to every auction, so the oldest active one also covers
+    everything that closed before it.
+    """
+    CommissionRule = apps.get_model('commission', 'CommissionRule')
+    for rule in CommissionRule.objects.order_by('created_at', 'pk'):
+        rule.effective_from = rule.created_at
+        rule.save(update_fields=['effective_from'])
+    first = CommissionRule.objects.filter(is_active=True).order_by('created_at', 'pk').first()
+    if first is not None:
+        first.effective_from = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        first.save(update_fields=['effective_from'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commission', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='commissionrule',
+            options={'ordering': ['effective_from', 'pk']},
+        ),
+        migrations.AddField(
+            model_name='commissionrule',
+            name='effective_from',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_effective_from, migrations.RunPython.noop),
+    ]
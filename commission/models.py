@@ -1,6 +1,13 @@
 from django.db import models
+from django.utils import timezone
 
 class CommissionRule(models.Model):
+    """
+    Commission percentages in force from ``effective_from`` until the next
+    active rule takes over. Rules are versions, not settings: an auction is
+    charged by the rule in force when it ended (commission.services), so
+    old rules stay around; untick ``is_active`` to withdraw one.
+    """
     seller_percent = models.DecimalField(max_digits=5, decimal_places=2, default=10.00)
     buyer_percent = models.DecimalField(max_digits=5, decimal_places=2, default=3.00)
 
@@ -8,8 +15,12 @@ class CommissionRule(models.Model):
         default="Transport charges are paid by Buyer directly to Seller"
     )
 
+    effective_from = models.DateTimeField(default=timezone.now, db_index=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ["effective_from", "pk"]
+
     def __str__(self):
-        return "Active Commission Rule"
+        return f"Commission from {self.effective_from:%Y-%m-%d %H:%M}: buyer {self.buyer_percent}%, seller {self.seller_percent}%"
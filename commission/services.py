@@ -1,17 +1,56 @@
-from decimal import Decimal
+"""
+Commission rules and amounts.
+
+A sale is charged by the CommissionRule in force when its auction ended
+(``Auction.end_time``), so closing, checkout and settlement
+(commission.settlement) always agree, even after the rates change.
+Amounts are exact: percent of the amount, rounded half-up to the paisa.
+"""
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+
 from .models import CommissionRule
 
-def get_active_commission():
-    return CommissionRule.objects.filter(is_active=True).last()
+# Used when no rule is in force
+DEFAULT_BUYER_PERCENT = Decimal('3.00')
+DEFAULT_SELLER_PERCENT = Decimal('10.00')
+
+CENT = Decimal('0.01')
+
 
+def commission_amount(amount, percent):
+    """``percent`` % of ``amount``, rounded half-up to two places."""
+    return (amount * percent / 100).quantize(CENT, rounding=ROUND_HALF_UP)
 
-def calculate_commission(amount):
-    rule = get_active_commission()
 
-    if not rule:
-        return Decimal("0.00"), Decimal("0.00")
+class CommissionSchedule:
+    """Active rules by effective_from; one query, then bisect per lookup."""
+
+    def __init__(self, rules=None):
+        if rules is None:
+            rules = CommissionRule.objects.filter(is_active=True).order_by('effective_from', 'pk')
+        self.rules = list(rules)
+        self._starts = [rule.effective_from for rule in self.rules]
+
+    def rule_at(self, when):
+        index = bisect_right(self._starts, when) - 1
+        return self.rules[index] if index >= 0 else None
+
+    def rates_at(self, when):
+        """(buyer_percent, seller_percent) in force at ``when``."""
+        rule = self.rule_at(when)
+        if rule is None:
+            return DEFAULT_BUYER_PERCENT, DEFAULT_SELLER_PERCENT
+        return rule.buyer_percent, rule.seller_percent
+
+
+def get_active_commission():
+    return CommissionSchedule().rule_at(timezone.now())
 
-    seller_fee = (amount * rule.seller_percent) / 100
-    buyer_fee = (amount * rule.buyer_percent) / 100
 
-    return seller_fee, buyer_fee
+def calculate_commission(amount, when=None):
+    """(seller_fee, buyer_fee) for ``amount`` under the rates in force at ``when`` (default: now)."""
+    buyer_percent, seller_percent = CommissionSchedule().rates_at(when or timezone.now())
+    return commission_amount(amount, seller_percent), commission_amount(amount, buyer_percent)
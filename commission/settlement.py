@@ -0,0 +1,181 @@
+"""
+Seller settlement for a period.
+
+``settle(start, end)`` totals the paid invoices of auctions that ended in
+``[start, end)`` per seller: gross sales, the buyer and seller commission
+that was invoiced, and the payout (gross less invoiced seller commission;
+transport is paid by the buyer straight to the seller). It is one pass
+over one query:
+
+- invoices are streamed with ``values_list().iterator()``, so memory
+  grows with the number of sellers in the period, not of invoices
+- each invoice's commission is also checked against the rule in force at
+  its auction's end time (commission.services.CommissionSchedule), not
+  whatever rule is active at settlement time; the database picks the
+  rule (a CASE over the rules' effective_from), so no datetime is built
+  per row
+- amounts arrive as integer paise (rounded by the database) and the
+  maths is done in paise and basis points, which rounds
+  exactly like ``commission_amount`` (Decimal, half-up) without a Decimal
+  operation per row; results are Decimals again
+
+Payouts always follow the invoices, since that is what buyers were charged
+and sellers were shown. Invoices whose stored commission differs from the
+rule (created before rules were versioned, or edited by hand) are counted
+as ``mismatched`` per seller, with the seller commission the rule would
+have charged, for finance to review. ``write_csv`` streams the per-seller
+rows (``manage.py settle_payouts``).
+"""
+import csv
+from decimal import Decimal
+
+from django.db.models import BigIntegerField, Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Round
+
+from payments.models import Invoice
+from users.models import User
+
+from .services import DEFAULT_BUYER_PERCENT, DEFAULT_SELLER_PERCENT, CommissionSchedule
+
+SETTLE_CHUNK_SIZE = 5000
+
+CSV_COLUMNS = (
+    'seller_id', 'seller', 'invoices', 'gross', 'buyer_commission', 'seller_commission', 'payout',
+    'mismatched', 'rule_seller_commission',
+)
+
+# Indexes into a seller's running totals
+COUNT, GROSS, BUYER, SELLER, MISMATCHED, RULE_SELLER = range(6)
+
+
+def _units(value):
+    """Decimal with two places -> integer hundredths (paise, basis points)."""
+    return int(value.scaleb(2))
+
+
+def _fee(cents, basis_points):
+    # cents * bp / 10000, rounded half-up (amounts are never negative)
+    return (cents * basis_points * 2 + 10000) // 20000
+
+
+def _in_cents(field):
+    # Done by the database: saves a Decimal conversion per column per row
+    return Cast(Round(F(field) * 100), BigIntegerField())
+
+
+def _rule_index(starts):
+    """Index of the rule in force at the auction's end time; -1 before the first."""
+    whens = [
+        When(auction__end_time__gte=start, then=Value(index))
+        for index, start in reversed(list(enumerate(starts)))
+    ]
+    if not whens:
+        return Value(-1)
+    return Case(*whens, default=Value(-1), output_field=IntegerField())
+
+
+def _money(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def paid_invoices(start, end):
+    return Invoice.objects.filter(
+        Q(is_paid=True) | Q(status='PAID'),
+        auction__end_time__gte=start,
+        auction__end_time__lt=end,
+    )
+
+
+class Settlement:
+    """Per-seller totals for one period, in paise."""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.invoices = 0
+        self.mismatched = 0
+        self.sellers = {}
+
+    def totals(self):
+        totals = [0] * 6
+        for row in self.sellers.values():
+            for index, value in enumerate(row):
+                totals[index] += value
+        return {
+            'sellers': len(self.sellers),
+            'invoices': totals[COUNT],
+            'mismatched': self.mismatched,
+            'gross': _money(totals[GROSS]),
+            'buyer_commission': _money(totals[BUYER]),
+            'seller_commission': _money(totals[SELLER]),
+            'payout': _money(totals[GROSS] - totals[SELLER]),
+            'rule_seller_commission': _money(totals[RULE_SELLER]),
+        }
+
+    def rows(self, batch_size=1000):
+        """Per-seller payout dicts in seller id order, usernames fetched in batches."""
+        seller_ids = sorted(self.sellers)
+        for offset in range(0, len(seller_ids), batch_size):
+            batch = seller_ids[offset:offset + batch_size]
+            names = dict(User.objects.filter(pk__in=batch).values_list('pk', 'username'))
+            for seller_id in batch:
+                count, gross, buyer, seller, mismatched, rule_seller = self.sellers[seller_id]
+                yield {
+                    'seller_id': seller_id,
+                    'seller': names.get(seller_id, ''),
+                    'invoices': count,
+                    'gross': _money(gross),
+                    'buyer_commission': _money(buyer),
+                    'seller_commission': _money(seller),
+                    'payout': _money(gross - seller),
+                    'mismatched': mismatched,
+                    'rule_seller_commission': _money(rule_seller),
+                }
+
+
+def settle(start, end, chunk_size=SETTLE_CHUNK_SIZE):
+    """Settle paid invoices of auctions that ended in [start, end)."""
+    schedule = CommissionSchedule()
+    # Rates per rule in basis points; index -1 (before any rule) gets the defaults
+    rates = [(_units(rule.buyer_percent), _units(rule.seller_percent)) for rule in schedule.rules]
+    rates.append((_units(DEFAULT_BUYER_PERCENT), _units(DEFAULT_SELLER_PERCENT)))
+
+    settlement = Settlement(start, end)
+    sellers = settlement.sellers
+    rows = (
+        paid_invoices(start, end)
+        .order_by()
+        .annotate(
+            amount_cents=_in_cents('amount'),
+            buyer_cents=_in_cents('buyer_commission'),
+            seller_cents=_in_cents('seller_commission'),
+            rule=_rule_index([rule.effective_from for rule in schedule.rules]),
+        )
+        .values_list('seller_id', 'amount_cents', 'buyer_cents', 'seller_cents', 'rule')
+        .iterator(chunk_size=chunk_size)
+    )
+    for seller_id, cents, buyer, seller, rule in rows:
+        buyer_bp, seller_bp = rates[rule]
+        rule_seller = _fee(cents, seller_bp)
+
+        totals = sellers.get(seller_id)
+        if totals is None:
+            totals = sellers[seller_id] = [0] * 6
+        totals[COUNT] += 1
+        totals[GROSS] += cents
+        totals[BUYER] += buyer
+        totals[SELLER] += seller
+        totals[RULE_SELLER] += rule_seller
+        if buyer != _fee(cents, buyer_bp) or seller != rule_seller:
+            totals[MISMATCHED] += 1
+    settlement.invoices = sum(row[COUNT] for row in sellers.values())
+    settlement.mismatched = sum(row[MISMATCHED] for row in sellers.values())
+    return settlement
+
+
+def write_csv(settlement, out):
+    """Stream the settlement's per-seller rows to the file-like ``out``."""
+    writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for row in settlement.rows():
+        writer.writerow(row)
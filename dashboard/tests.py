@@ -1,3 +1,237 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+
+from auctions.models import Auction, Bid
+from users.models import User
+
+
+class MyAuctionsDashboardTests(TestCase):
+    """Tests for the seller dashboard."""
+    
+    def setUp(self):
+        from auction_status.models import AuctionSchedule
+        from auction_workflow.models import AuctionWorkflow
+        from watchlist.models import Watchlist
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyers = [
+            User.objects.create_user(
+                username=f'buyer{i}',
+                email=f'buyer{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        now = timezone.now()
+        
+        def make(title, **kwargs):
+            kwargs.setdefault('end_time', now + timedelta(days=1))
+            return Auction.objects.create(
+                title=title,
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                owner=self.seller,
+                **kwargs
+            )
+        
+        self.live = [make(f'Live {i}') for i in range(6)]
+        self.ended = make('Ended', end_time=now - timedelta(hours=1))
+        self.upcoming = make('Upcoming')
+        AuctionSchedule.objects.create(auction=self.upcoming, start_time=now + timedelta(hours=2))
+        self.draft = make('Draft')
+        AuctionWorkflow.objects.create(auction=self.draft, status='DRAFT')
+        
+        for auction in self.live:
+            AuctionWorkflow.objects.create(auction=auction, status='LIVE')
+            for i, buyer in enumerate(self.buyers):
+                Bid.objects.create(auction=auction, user=buyer, amount=Decimal(110 + i))
+                Watchlist.objects.create(user=buyer, auction=auction)
+        
+        self.client.login(username='seller', password='testpass123')
+    
+    def test_tabs_split_by_status(self):
+        """Test auctions land on the live, ended and drafts tabs with annotated stats."""
+        response = self.client.get('/dashboard/my-auctions/')
+        self.assertEqual(response.context['tab_counts'], {'live': 6, 'ended': 2, 'drafts': 1})
+        self.assertEqual(response.context['total_auctions'], 9)
+        listed = list(response.context['auctions'])
+        self.assertEqual({a.pk for a in listed}, {a.pk for a in self.live})
+        self.assertTrue(all(a.bid_count == 3 and a.watcher_count == 3 for a in listed))
+        
+        response = self.client.get('/dashboard/my-auctions/?tab=ended')
+        self.assertEqual({a.pk for a in response.context['auctions']}, {self.ended.pk, self.upcoming.pk})
+        
+        response = self.client.get('/dashboard/my-auctions/?tab=drafts')
+        self.assertContains(response, 'DRAFT')
+    
+    def test_query_count_is_constant(self):
+        """Test the page costs the same queries regardless of how many auctions are listed."""
+        from unittest import mock
+        
+        with mock.patch('auctions.pagination.PAGE_SIZE', 4):
+            with self.assertNumQueries(5):
+                response = self.client.get('/dashboard/my-auctions/')
+            self.assertTrue(response.context['auctions'].has_next)
+            
+            with self.assertNumQueries(5):
+                self.client.get(response.context['auctions'].next_url.replace('?', '/dashboard/my-auctions/?'))
+
+
+class MyBidsDashboardTests(TestCase):
+    """Tests for the buyer bids dashboard."""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.rival = User.objects.create_user(
+            username='rival',
+            email='rival@test.com',
+            password='testpass123'
+        )
+        now = timezone.now()
+        
+        def make(title, ends, bids):
+            auction = Auction.objects.create(
+                title=title,
+                description='Test',
+                starting_price=Decimal('100.00'),
+                current_price=Decimal('100.00'),
+                end_time=now + ends,
+                owner=self.seller
+            )
+            for user, amount in bids:
+                Bid.objects.create(auction=auction, user=user, amount=Decimal(amount))
+            return auction
+        
+        self.active = [
+            make(f'Active {i}', timedelta(days=1), [(self.buyer, 110), (self.rival, 120), (self.buyer, 130)])
+            for i in range(5)
+        ]
+        self.won = make('Won', -timedelta(hours=1), [(self.rival, 150), (self.buyer, 200)])
+        self.lost = make('Lost', -timedelta(hours=2), [(self.buyer, 150), (self.rival, 200)])
+        make('Not mine', timedelta(days=1), [(self.rival, 150)])
+        
+        self.client.login(username='buyer', password='testpass123')
+    
+    def test_tabs_and_winning_flags(self):
+        """Test auctions are grouped per tab with the user's best bid and leader flag."""
+        response = self.client.get('/dashboard/my-bids/')
+        self.assertEqual(response.context['tab_counts'], {'active': 5, 'won': 1, 'lost': 1})
+        self.assertEqual(response.context['total_bids'], 12)
+        listed = list(response.context['auctions'])
+        self.assertEqual({a.pk for a in listed}, {a.pk for a in self.active})
+        self.assertTrue(all(a.user_highest_bid == Decimal('130') and a.is_winning for a in listed))
+        
+        won = list(self.client.get('/dashboard/my-bids/?tab=won').context['auctions'])
+        self.assertEqual([(a.pk, a.user_highest_bid) for a in won], [(self.won.pk, Decimal('200'))])
+        
+        lost = list(self.client.get('/dashboard/my-bids/?tab=lost').context['auctions'])
+        self.assertEqual([(a.pk, a.is_winning) for a in lost], [(self.lost.pk, False)])
+    
+    def test_query_count_is_constant(self):
+        """Test each page is a fixed number of queries with no per-row lookups."""
+        from unittest import mock
+        
+        with mock.patch('auctions.pagination.PAGE_SIZE', 2):
+            with self.assertNumQueries(5):
+                response = self.client.get('/dashboard/my-bids/')
+            page = response.context['auctions']
+            self.assertTrue(page.has_next)
+            
+            with self.assertNumQueries(5):
+                response = self.client.get('/dashboard/my-bids/' + page.next_url)
+            self.assertEqual(len(response.context['auctions']), 2)
+
 
-# Create your tests here.
+class SellerAnalyticsApiTests(TestCase):
+    """Tests for the seller time series API."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Charted Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('100.00'),
+            end_time=timezone.now() + timedelta(days=1),
+            owner=self.seller
+        )
+        # Created at the top of an hour three hours ago, bids in hours 0, 0 and 2
+        created = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+        Auction.objects.filter(pk=self.auction.pk).update(created_at=created)
+        for minutes, amount in ((10, 110), (20, 150), (130, 200)):
+            bid = Bid.objects.create(auction=self.auction, user=self.buyer, amount=Decimal(amount))
+            Bid.objects.filter(pk=bid.pk).update(timestamp=created + timedelta(minutes=minutes))
+        
+        self.client.login(username='seller', password='testpass123')
+    
+    def test_hourly_series(self):
+        """Test bucketed counts, price curve and percentiles."""
+        response = self.client.get(f'/dashboard/api/analytics/?auction={self.auction.id}')
+        data = response.json()
+        self.assertEqual(data['bids'], [2, 0, 1, 0])
+        self.assertEqual(data['cumulative_bids'], [2, 2, 3, 3])
+        self.assertEqual(data['price'], [150.0, 150.0, 200.0, 200.0])
+        self.assertEqual(data['percentiles']['p50'], 150.0)
+        self.assertEqual(data['bucket_starts'][1] - data['bucket_starts'][0], 3600)
+    
+    def test_columns_are_epoch_seconds_from_the_database(self):
+        """Test the database-side epoch conversion matches Python's timestamps."""
+        from analytics.timeseries import load_columns
+        
+        bid_times, bid_amounts, watch_times = load_columns(self.auction)
+        expected = [bid.timestamp.timestamp() for bid in self.auction.bids.order_by('timestamp')]
+        self.assertEqual(len(bid_times), 3)
+        for got, want in zip(bid_times, expected):
+            self.assertAlmostEqual(got, want, delta=0.001)
+        self.assertEqual(list(bid_amounts), [110.0, 150.0, 200.0])
+        self.assertEqual(len(watch_times), 0)
+    
+    def test_cached_per_version(self):
+        """Test repeat requests are served from cache until the auction changes."""
+        url = f'/dashboard/api/analytics/?auction={self.auction.id}'
+        self.client.get(url)
+        with self.assertNumQueries(3):  # session, user, auction
+            self.client.get(url)
+        
+        Bid.objects.create(auction=self.auction, user=self.buyer, amount=Decimal('250.00'))
+        self.auction.current_price = Decimal('250.00')
+        self.auction.save()
+        self.assertEqual(sum(self.client.get(url).json()['bids']), 4)
+    
+    def test_rejects_other_sellers_and_bad_params(self):
+        """Test only the owner can chart an auction and bad params are rejected."""
+        self.assertEqual(self.client.get('/dashboard/api/analytics/?auction=x').status_code, 400)
+        self.assertEqual(
+            self.client.get(f'/dashboard/api/analytics/?auction={self.auction.id}&bucket=week').status_code, 400
+        )
+        self.client.login(username='buyer', password='testpass123')
+        self.assertEqual(self.client.get(f'/dashboard/api/analytics/?auction={self.auction.id}').status_code, 404)
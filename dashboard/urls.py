@@ -6,5 +6,6 @@ urlpatterns = [
     path('my-auctions/', views.my_auctions, name='my_auctions'),
     path('my-bids/', views.my_bids, name='my_bids'),
     path('bulk-upload/', views.bulk_upload, name='bulk_upload'),
+    path('api/analytics/', views.analytics_api, name='seller_analytics_api'),
 ]
 
@@ -1,111 +1,133 @@
 """
 Dashboard views for sellers and buyers.
 """
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.db.models import Count, Sum
+from django.utils.cache import patch_cache_control
+from django.db.models import BooleanField, Count, Exists, ExpressionWrapper, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 
-from auctions.models import Auction
-from auction_status.utils import get_auction_status
+from auctions.models import Auction, Bid
+from auctions.pagination import paginate
 from watchlist.models import Watchlist
+from analytics.rollups import seller_totals
+
+
+# Workflow states shown on the "Drafts & Pending" tab
+DRAFT_STATUSES = ('DRAFT', 'PENDING')
+
+MY_AUCTIONS_TABS = ('live', 'ended', 'drafts')
+
+
+def _count_of(model, **lookups):
+    """Correlated COUNT(*) subquery; unlike joined Counts these don't multiply each other's rows."""
+    rows = model.objects.filter(**lookups).order_by().values(*lookups).annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(rows), 0)
 
 
 @login_required
 def my_auctions(request):
     """
-    Seller dashboard showing all their auctions with stats.
+    Seller dashboard showing their auctions by tab (live / ended / drafts) with stats.
+    
+    Tab sizes come from one conditional aggregate and the selected tab is
+    paginated with watcher and bid counts annotated, so the page costs
+    the same few queries however many auctions the seller has.
     """
     user = request.user
+    now = timezone.now()
     
-    # Get all auctions by this user
-    auctions = Auction.objects.filter(owner=user).order_by('-created_at')
-    
-    # Separate by status
-    live_auctions = []
-    ended_auctions = []
-    draft_auctions = []
+    drafts = Q(workflow__status__in=DRAFT_STATUSES)
+    auctions = Auction.objects.filter(owner=user).with_status(now)
+    tab_filters = {
+        'drafts': drafts,
+        'live': ~drafts & Q(status='LIVE'),
+        # Everything not live, including auctions scheduled to start later
+        'ended': ~drafts & ~Q(status='LIVE'),
+    }
+    counts = auctions.aggregate(**{
+        tab: Count('id', filter=condition) for tab, condition in tab_filters.items()
+    })
     
-    for auction in auctions:
-        status = get_auction_status(auction)
-        auction.current_status = status
-        
-        # Add stats
-        auction.watcher_count = Watchlist.objects.filter(auction=auction).count()
-        auction.bid_count = auction.bids.count()
-        
-        if hasattr(auction, 'workflow'):
-            if auction.workflow.status == 'DRAFT':
-                draft_auctions.append(auction)
-                continue
-            elif auction.workflow.status == 'PENDING':
-                draft_auctions.append(auction)
-                continue
-        
-        if status == 'LIVE':
-            live_auctions.append(auction)
-        else:
-            ended_auctions.append(auction)
+    tab = request.GET.get('tab', 'live')
+    if tab not in MY_AUCTIONS_TABS:
+        tab = 'live'
+    listing = (
+        auctions.filter(tab_filters[tab])
+        .select_related('workflow', 'schedule')
+        .annotate(
+            watcher_count=_count_of(Watchlist, auction=OuterRef('pk')),
+            bid_count=_count_of(Bid, auction=OuterRef('pk')),
+        )
+    )
+    page = paginate(request, listing, ('-created_at', '-id'))
     
-    # Calculate totals
-    total_views = sum(a.view_count for a in auctions)
-    total_bids = sum(a.bid_count for a in auctions)
-    total_watchers = sum(a.watcher_count for a in auctions)
+    # Totals come from the engagement rollups (refreshed by rollup_engagement)
+    totals = seller_totals(user)
     
     return render(request, 'dashboard/my_auctions.html', {
-        'live_auctions': live_auctions,
-        'ended_auctions': ended_auctions,
-        'draft_auctions': draft_auctions,
-        'total_auctions': len(auctions),
-        'total_views': total_views,
-        'total_bids': total_bids,
-        'total_watchers': total_watchers,
+        'tab': tab,
+        'auctions': page,
+        'tab_counts': counts,
+        'total_auctions': sum(counts.values()),
+        'total_views': totals['views'],
+        'total_bids': totals['bids'],
+        'total_watchers': totals['watchers'],
     })
 
 
+MY_BIDS_TABS = {
+    # tab -> keyset ordering
+    'active': ('end_time', 'id'),
+    'won': ('-end_time', '-id'),
+    'lost': ('-end_time', '-id'),
+}
+
+
 @login_required
 def my_bids(request):
     """
-    Buyer dashboard showing all their bids.
+    Buyer dashboard showing the auctions they have bid on, by tab.
+    
+    One row per auction: the user's best bid is a grouped Max() and the
+    current leader a correlated subquery, so winning/lost is decided in
+    SQL and the page costs the same few queries however many bids the
+    user has placed.
     """
     user = request.user
+    now = timezone.now()
     
-    # Get all auctions the user has bid on
-    from auctions.models import Bid
-    user_bids = Bid.objects.filter(user=user).select_related('auction').order_by('-timestamp')
-    
-    # Group bids by auction
-    auctions_bid_on = {}
-    for bid in user_bids:
-        if bid.auction.id not in auctions_bid_on:
-            auction = bid.auction
-            auction.current_status = get_auction_status(auction)
-            auction.user_highest_bid = bid.amount
-            auction.is_winning = (auction.highest_bid and auction.highest_bid.user == user)
-            auctions_bid_on[auction.id] = auction
-        else:
-            # Update if this is a higher bid
-            if bid.amount > auctions_bid_on[bid.auction.id].user_highest_bid:
-                auctions_bid_on[bid.auction.id].user_highest_bid = bid.amount
-    
-    # Separate by status
-    active_bids = []
-    won_auctions = []
-    lost_auctions = []
-    
-    for auction in auctions_bid_on.values():
-        if auction.current_status == 'LIVE':
-            active_bids.append(auction)
-        elif auction.is_winning:
-            won_auctions.append(auction)
-        else:
-            lost_auctions.append(auction)
+    mine = Bid.objects.filter(auction=OuterRef('pk'), user=user).order_by()
+    best = mine.values('auction').annotate(best=Max('amount')).values('best')
+    leader = Bid.objects.filter(auction=OuterRef('pk')).order_by('-amount', '-timestamp').values('user_id')[:1]
+    auctions = (
+        Auction.objects.filter(Exists(mine))
+        .with_status(now)
+        .annotate(user_highest_bid=Subquery(best), leader_id=Subquery(leader))
+        .annotate(is_winning=ExpressionWrapper(Q(leader_id=user.id), output_field=BooleanField()))
+    )
+    live = Q(status='LIVE')
+    tab_filters = {
+        'active': live,
+        'won': ~live & Q(leader_id=user.id),
+        'lost': ~live & ~Q(leader_id=user.id),
+    }
+    counts = auctions.aggregate(**{
+        tab: Count('id', filter=condition) for tab, condition in tab_filters.items()
+    })
+    
+    tab = request.GET.get('tab', 'active')
+    if tab not in MY_BIDS_TABS:
+        tab = 'active'
+    page = paginate(request, auctions.filter(tab_filters[tab]), MY_BIDS_TABS[tab])
     
     return render(request, 'dashboard/my_bids.html', {
-        'active_bids': active_bids,
-        'won_auctions': won_auctions,
-        'lost_auctions': lost_auctions,
-        'total_bids': len(user_bids),
+        'tab': tab,
+        'auctions': page,
+        'tab_counts': counts,
+        'total_bids': Bid.objects.filter(user=user).count(),
     })
 
 
@@ -133,6 +155,36 @@ def dashboard_home(request):
     })
 
 
+@login_required
+def analytics_api(request):
+    """
+    Time series for one of the seller's auctions: ``?auction=<id>&bucket=hour|day``.
+    
+    Returns bids per bucket, cumulative bids, the price curve, watcher
+    growth and bid amount percentiles (see analytics.timeseries).
+    """
+    # Imported here so NumPy is only loaded by workers that serve this API
+    from analytics.timeseries import BUCKETS, auction_series
+    
+    bucket = request.GET.get('bucket', 'hour')
+    if bucket not in BUCKETS:
+        return JsonResponse({'error': f"bucket must be one of {', '.join(BUCKETS)}"}, status=400)
+    try:
+        auction_id = int(request.GET.get('auction', ''))
+    except ValueError:
+        return JsonResponse({'error': 'auction must be an auction id'}, status=400)
+    
+    auction = get_object_or_404(Auction, pk=auction_id, owner=request.user)
+    try:
+        series = auction_series(auction, bucket)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    response = JsonResponse({'auction': auction.pk, 'bucket': bucket, 'bucket_seconds': BUCKETS[bucket], **series})
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
 @login_required
 def bulk_upload(request):
     """
@@ -1,3 +1,8 @@
+from django.db import transaction
+
+from ledger.models import LedgerTransaction
+from ledger.services import record_deposit
+
 from .models import Deposit
 from .rules import get_buyer_deposit
 from .rules import get_seller_deposit
@@ -11,26 +16,36 @@ def has_active_buyer_deposit(user):
 
 
 def create_buyer_deposit(user, auction):
-    return Deposit.objects.create(
-        user=user,
-        auction=auction,
-        deposit_type="BUYER",
-        amount=get_buyer_deposit()
-    )
+    with transaction.atomic():
+        deposit = Deposit.objects.create(
+            user=user,
+            auction=auction,
+            deposit_type="BUYER",
+            amount=get_buyer_deposit()
+        )
+        record_deposit(deposit, LedgerTransaction.DEPOSIT_LOCKED)
+    return deposit
 
 def create_seller_deposit(user, auction):
-    return Deposit.objects.create(
-        user=user,
-        auction=auction,
-        deposit_type="SELLER",
-        amount=get_seller_deposit()
-    )
+    with transaction.atomic():
+        deposit = Deposit.objects.create(
+            user=user,
+            auction=auction,
+            deposit_type="SELLER",
+            amount=get_seller_deposit()
+        )
+        record_deposit(deposit, LedgerTransaction.DEPOSIT_LOCKED)
+    return deposit
 
 def refund_deposit(deposit):
-    deposit.status = "REFUNDED"
-    deposit.save()
+    with transaction.atomic():
+        deposit.status = "REFUNDED"
+        deposit.save()
+        record_deposit(deposit, LedgerTransaction.DEPOSIT_REFUNDED)
 
 
 def forfeit_deposit(deposit):
-    deposit.status = "FORFEITED"
-    deposit.save()
+    with transaction.atomic():
+        deposit.status = "FORFEITED"
+        deposit.save()
+        record_deposit(deposit, LedgerTransaction.DEPOSIT_FORFEITED)
@@ -1,8 +1,12 @@
 """
 Escrow service functions for status updates.
 """
+from django.db import transaction
 from django.utils import timezone
 
+from ledger.services import record_escrow_released
+from payments.models import Invoice
+
 
 def mark_shipped(escrow):
     """Mark escrow status as SHIPPED by seller."""
@@ -17,13 +21,16 @@ def mark_shipped(escrow):
 def mark_delivered(escrow):
     """Mark escrow status as DELIVERED by buyer."""
     if escrow.status == 'SHIPPED':
-        escrow.status = 'DELIVERED'
-        escrow.last_updated = timezone.now()
-        escrow.save()
-        
-        # Automatically mark as COMPLETED after delivery confirmation
-        escrow.status = 'COMPLETED'
-        escrow.save()
+        with transaction.atomic():
+            escrow.status = 'DELIVERED'
+            escrow.last_updated = timezone.now()
+            escrow.save()
+
+            # Automatically mark as COMPLETED after delivery confirmation
+            escrow.status = 'COMPLETED'
+            escrow.save()
+            # The sale leaves escrow (auctions closed before invoicing have none)
+            record_escrow_released(Invoice.objects.filter(auction_id=escrow.auction_id))
         return True
     return False
 
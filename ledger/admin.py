@@ -0,0 +1,48 @@
+from django.contrib import admin
+
+from .models import Account, Entry, LedgerTransaction
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    # The ledger is only written through ledger.services
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class EntryInline(admin.TabularInline):
+    model = Entry
+    fields = ('account', 'amount', 'balance_after')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Account)
+class AccountAdmin(ReadOnlyAdmin):
+    list_display = ('kind', 'user', 'balance', 'entry_count', 'updated_at')
+    list_filter = ('kind',)
+    search_fields = ('user__username',)
+
+
+@admin.register(LedgerTransaction)
+class LedgerTransactionAdmin(ReadOnlyAdmin):
+    list_display = ('reference', 'kind', 'memo', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('reference',)
+    inlines = [EntryInline]
+
+
+@admin.register(Entry)
+class EntryAdmin(ReadOnlyAdmin):
+    list_display = ('transaction', 'account', 'amount', 'balance_after', 'created_at')
+    list_select_related = ('transaction', 'account__user')
+    search_fields = ('transaction__reference', 'account__user__username')
@@ -0,0 +1,51 @@
+"""
+Management command to post money movements that predate the ledger.
+Run: python manage.py backfill_ledger
+
+Posts every deposit (locked, then refunded or forfeited), every paid
+invoice and the release of every completed escrow, in batches. Posting
+is idempotent by reference, so the command can be rerun safely and
+skips anything the services have already recorded.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from deposits.models import Deposit
+from ledger.models import LedgerTransaction
+from ledger.services import (
+    deposit_postings, escrow_released_postings, invoice_paid_postings, post_many,
+)
+from payments.models import Invoice
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Post existing deposits, paid invoices and completed escrows to the ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        size = options['batch_size']
+        paid = Invoice.objects.filter(Q(is_paid=True) | Q(status='PAID'))
+        sources = [
+            (Deposit.objects.all(), lambda batch: deposit_postings(batch, LedgerTransaction.DEPOSIT_LOCKED)),
+            (Deposit.objects.filter(status='REFUNDED'),
+             lambda batch: deposit_postings(batch, LedgerTransaction.DEPOSIT_REFUNDED)),
+            (Deposit.objects.filter(status='FORFEITED'),
+             lambda batch: deposit_postings(batch, LedgerTransaction.DEPOSIT_FORFEITED)),
+            (paid, invoice_paid_postings),
+            (paid.filter(auction__escrow__status='COMPLETED'), escrow_released_postings),
+        ]
+        posted = 0
+        for queryset, postings in sources:
+            batch = []
+            for row in queryset.order_by('pk').iterator(chunk_size=size):
+                batch.append(row)
+                if len(batch) == size:
+                    posted += post_many(postings(batch))
+                    batch = []
+            if batch:
+                posted += post_many(postings(batch))
+        self.stdout.write(self.style.SUCCESS(f'Posted {posted} transaction(s).'))
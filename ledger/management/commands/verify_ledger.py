@@ -0,0 +1,79 @@
+"""
+Management command to replay the ledger and check the materialized balances.
+Run: python manage.py verify_ledger [--fix]
+
+Streams every entry in (account, id) order and keeps a running sum per
+account; checks it against each entry's balance_after and, at the end of
+the account, against Account.balance and Account.entry_count. Also
+checks that every transaction's entries sum to zero.
+
+--fix rewrites account balances and counts from the replay. Entries are
+append-only, so an unbalanced transaction or a wrong balance_after can
+only be corrected by posting a new transaction; those are reported and
+the command fails either way.
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from ledger.models import Account, Entry
+
+
+class Command(BaseCommand):
+    help = 'Replay the ledger and verify (and optionally repair) materialized account balances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rewrite account balances that disagree with the replay')
+
+    def handle(self, *args, **options):
+        accounts = {account.pk: account for account in Account.objects.all()}
+        replayed = {pk: (Decimal('0'), 0) for pk in accounts}
+        bad_entries = 0
+
+        entries = Entry.objects.order_by('account_id', 'id').values_list('id', 'account_id', 'amount', 'balance_after')
+        for entry_id, account_id, amount, balance_after in entries.iterator(chunk_size=5000):
+            running, count = replayed[account_id]
+            running += amount
+            replayed[account_id] = (running, count + 1)
+            if running != balance_after:
+                bad_entries += 1
+                self.stdout.write(f'entry {entry_id}: balance_after {balance_after}, replayed {running}')
+
+        drifted = [
+            (account, *replayed[pk]) for pk, account in accounts.items()
+            if (account.balance, account.entry_count) != replayed[pk]
+        ]
+        for account, balance, count in drifted:
+            self.stdout.write(
+                f'account {account.pk} ({account.kind}, user {account.holder_id}): balance {account.balance} '
+                f'over {account.entry_count} entries, replayed {balance} over {count}'
+            )
+
+        unbalanced = (
+            Entry.objects.values('transaction_id').annotate(total=Sum('amount'))
+            .exclude(total=0).order_by('transaction_id')
+        )
+        for row in unbalanced:
+            self.stdout.write(f"transaction {row['transaction_id']}: entries sum to {row['total']}")
+        unbalanced = len(unbalanced)
+
+        if not (drifted or bad_entries or unbalanced):
+            self.stdout.write(self.style.SUCCESS(f'Ledger balances: {len(accounts)} account(s) match the replay.'))
+            return
+
+        if drifted and options['fix']:
+            for account, balance, count in drifted:
+                Account.objects.filter(pk=account.pk).update(balance=balance, entry_count=count)
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(drifted)} account balance(s).'))
+            drifted = []
+
+        problems = []
+        if drifted:
+            problems.append(f'{len(drifted)} account balance(s) out of date (rerun with --fix to repair)')
+        if bad_entries:
+            problems.append(f'{bad_entries} entry balance(s) wrong')
+        if unbalanced:
+            problems.append(f'{unbalanced} unbalanced transaction(s)')
+        if problems:
+            raise CommandError('; '.join(problems))
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('DEPOSIT_LOCKED', 'Deposit locked'), ('DEPOSIT_REFUNDED', 'Deposit refunded'), ('DEPOSIT_FORFEITED', 'Deposit forfeited'), ('INVOICE_PAID', 'Invoice paid'), ('ESCROW_RELEASED', 'Escrow released')], max_length=20)),
+                ('reference', models.CharField(max_length=100, unique=True)),
+                ('memo', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Account',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('EXTERNAL', 'Paid in (-) / out (+) by the user'), ('DEPOSITS_LOCKED', 'Deposits locked'), ('ESCROW_HELD', 'Sales held in escrow'), ('PAYOUT_DUE', 'Released to seller, awaiting payout'), ('COMMISSION', 'Commission earned'), ('FORFEITS', 'Forfeited deposits')], max_length=20)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_accounts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Entry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='ledger.account')),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='ledger.ledgertransaction')),
+            ],
+            options={
+                'verbose_name_plural': 'entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(fields=('kind', 'user'), name='ledger_account_kind_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('kind',), name='ledger_platform_account_kind'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['account', 'id'], name='ledger_entry_account_idx'),
+        ),
+    ]
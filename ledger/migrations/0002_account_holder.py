@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_holders(apps, schema_editor):
+    Account = apps.get_model('ledger', 'Account')
+    Account.objects.update(holder_id=F('user_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='account',
+            name='ledger_account_kind_user',
+        ),
+        migrations.RemoveConstraint(
+            model_name='account',
+            name='ledger_platform_account_kind',
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='holder_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(copy_holders, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='account',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AlterField(
+            model_name='account',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_accounts', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='entry',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=20),
+        ),
+        migrations.AlterField(
+            model_name='entry',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=2, max_digits=20),
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(fields=('kind', 'holder_id'), name='ledger_account_kind_holder'),
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(condition=models.Q(('holder_id__isnull', True)), fields=('kind',), name='ledger_platform_account_kind'),
+        ),
+    ]
@@ -0,0 +1,118 @@
+"""
+Double-entry ledger.
+
+Every money movement (a deposit locked, refunded or forfeited, an
+invoice paid, escrow released to the seller) is a LedgerTransaction with
+two or more Entries whose amounts sum to zero. Entries are append-only:
+they cannot be saved twice, updated or deleted. Each Account keeps its
+running ``balance`` (and entry count), updated in the same database
+transaction as the entries, so a balance is one row lookup; every entry
+also stores the balance it left behind, which ``manage.py verify_ledger``
+replays.
+"""
+from django.db import models
+
+from users.models import User
+
+
+class Account(models.Model):
+    """One balance: per user for user accounts, or platform-wide (no user)."""
+    EXTERNAL = "EXTERNAL"
+    DEPOSITS_LOCKED = "DEPOSITS_LOCKED"
+    ESCROW_HELD = "ESCROW_HELD"
+    PAYOUT_DUE = "PAYOUT_DUE"
+    COMMISSION = "COMMISSION"
+    FORFEITS = "FORFEITS"
+
+    KIND_CHOICES = [
+        (EXTERNAL, "Paid in (-) / out (+) by the user"),
+        (DEPOSITS_LOCKED, "Deposits locked"),
+        (ESCROW_HELD, "Sales held in escrow"),
+        (PAYOUT_DUE, "Released to seller, awaiting payout"),
+        (COMMISSION, "Commission earned"),
+        (FORFEITS, "Forfeited deposits"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_accounts")
+    # The owner's user id, kept when the user is deleted (``user`` then
+    # becomes NULL) so their history stays attributable; None for platform
+    # accounts. Accounts are looked up by this, not by ``user``.
+    holder_id = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    balance = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "holder_id"], name="ledger_account_kind_holder"),
+            models.UniqueConstraint(
+                fields=["kind"], condition=models.Q(holder_id__isnull=True), name="ledger_platform_account_kind"
+            ),
+        ]
+
+    def __str__(self):
+        if self.holder_id is None:
+            owner = "platform"
+        else:
+            owner = self.user.username if self.user_id else f"deleted user {self.holder_id}"
+        return f"{self.get_kind_display()} ({owner}): {self.balance}"
+
+
+class LedgerTransaction(models.Model):
+    """A balanced set of entries; ``reference`` makes posting idempotent."""
+    DEPOSIT_LOCKED = "DEPOSIT_LOCKED"
+    DEPOSIT_REFUNDED = "DEPOSIT_REFUNDED"
+    DEPOSIT_FORFEITED = "DEPOSIT_FORFEITED"
+    INVOICE_PAID = "INVOICE_PAID"
+    ESCROW_RELEASED = "ESCROW_RELEASED"
+
+    KIND_CHOICES = [
+        (DEPOSIT_LOCKED, "Deposit locked"),
+        (DEPOSIT_REFUNDED, "Deposit refunded"),
+        (DEPOSIT_FORFEITED, "Deposit forfeited"),
+        (INVOICE_PAID, "Invoice paid"),
+        (ESCROW_RELEASED, "Escrow released"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    reference = models.CharField(max_length=100, unique=True)
+    memo = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.reference
+
+
+class EntryQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise TypeError("Ledger entries are append-only")
+
+    def delete(self):
+        raise TypeError("Ledger entries are append-only")
+
+
+class Entry(models.Model):
+    transaction = models.ForeignKey(LedgerTransaction, on_delete=models.PROTECT, related_name="entries")
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name="entries")
+    # Positive increases the account's balance, negative decreases it
+    amount = models.DecimalField(max_digits=20, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=20, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = EntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = "entries"
+        indexes = [models.Index(fields=["account", "id"], name="ledger_entry_account_idx")]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise TypeError("Ledger entries are append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("Ledger entries are append-only")
+
+    def __str__(self):
+        return f"{self.account} {self.amount:+}"
@@ -0,0 +1,196 @@
+"""
+Posting to the ledger.
+
+``post_many`` writes any number of balanced transactions with a fixed
+number of queries: transactions whose reference already exists are
+skipped (so posting is idempotent and services may report the same event
+twice), the accounts involved are fetched or created and locked in id
+order, every entry gets the balance it leaves behind, and the new
+balances are written back with one ``bulk_update``, all in one database
+transaction. ``balance`` is a single indexed row lookup.
+
+The deposit, escrow and payment services call the ``record_*`` helpers
+below in the same transaction as their own writes.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Account, Entry, LedgerTransaction
+
+ZERO = Decimal('0.00')
+
+
+class UnbalancedTransaction(ValueError):
+    pass
+
+
+def balance(kind, user=None):
+    """Current balance of an account (zero if it has never been used)."""
+    account = Account.objects.filter(kind=kind, holder_id=_user_id(user)).values_list('balance', flat=True).first()
+    return account if account is not None else ZERO
+
+
+def post(reference, kind, lines, memo=''):
+    """Post one transaction: ``lines`` are (account kind, user or None, amount)."""
+    return post_many([(reference, kind, lines, memo)])
+
+
+def post_many(postings):
+    """
+    Post ``postings`` [(reference, kind, lines, memo)]; returns how many
+    were new. Lines with a zero amount are dropped.
+    """
+    postings = [
+        (reference, kind, [line for line in lines if line[2]], memo)
+        for reference, kind, lines, memo in postings
+    ]
+    for reference, _, lines, _ in postings:
+        if sum(amount for _, _, amount in lines) != 0:
+            raise UnbalancedTransaction(f'{reference} does not balance')
+
+    with transaction.atomic():
+        existing = set(LedgerTransaction.objects.filter(
+            reference__in=[posting[0] for posting in postings]
+        ).values_list('reference', flat=True))
+        new, seen = [], set()
+        for posting in postings:
+            if posting[0] not in existing and posting[0] not in seen:
+                seen.add(posting[0])
+                new.append(posting)
+        if not new:
+            return 0
+
+        accounts = _lock_accounts({(kind, _user_id(user)) for _, _, lines, _ in new for kind, user, _ in lines})
+        transactions = LedgerTransaction.objects.bulk_create([
+            LedgerTransaction(reference=reference, kind=kind, memo=memo[:255])
+            for reference, kind, _, memo in new
+        ])
+
+        now = timezone.now()
+        entries = []
+        for ledger_transaction, (_, _, lines, _) in zip(transactions, new):
+            for kind, user, amount in lines:
+                account = accounts[(kind, _user_id(user))]
+                account.balance += amount
+                account.entry_count += 1
+                account.updated_at = now
+                entries.append(Entry(
+                    transaction=ledger_transaction, account=account, amount=amount, balance_after=account.balance
+                ))
+        Entry.objects.bulk_create(entries)
+        Account.objects.bulk_update(accounts.values(), ['balance', 'entry_count', 'updated_at'])
+    return len(new)
+
+
+def _user_id(user):
+    return getattr(user, 'pk', user)
+
+
+def _lock_accounts(keys):
+    """{(kind, user_id): Account}, created if missing and locked in id order."""
+    def lookup(keys):
+        query = Q()
+        for kind, user_id in keys:
+            query |= Q(kind=kind, holder_id=user_id) if user_id is not None else Q(kind=kind, holder_id__isnull=True)
+        return query
+
+    Account.objects.bulk_create(
+        [Account(kind=kind, user_id=user_id, holder_id=user_id) for kind, user_id in keys], ignore_conflicts=True
+    )
+    locked = Account.objects.filter(lookup(keys)).order_by('pk').select_for_update()
+    return {(account.kind, account.holder_id): account for account in locked}
+
+
+# Domain events. A user's EXTERNAL account goes down by what they pay in
+# and up by what is paid back out to them.
+
+def deposit_postings(deposits, kind):
+    """Lock moves money in from the user; refund gives it back; forfeit keeps it."""
+    postings = []
+    for deposit in deposits:
+        if kind == LedgerTransaction.DEPOSIT_LOCKED:
+            lines = [(Account.EXTERNAL, deposit.user_id, -deposit.amount),
+                     (Account.DEPOSITS_LOCKED, deposit.user_id, deposit.amount)]
+        elif kind == LedgerTransaction.DEPOSIT_REFUNDED:
+            lines = [(Account.DEPOSITS_LOCKED, deposit.user_id, -deposit.amount),
+                     (Account.EXTERNAL, deposit.user_id, deposit.amount)]
+        else:
+            lines = [(Account.DEPOSITS_LOCKED, deposit.user_id, -deposit.amount),
+                     (Account.FORFEITS, None, deposit.amount)]
+        postings.append((
+            f'deposit:{deposit.pk}:{kind.rsplit("_", 1)[-1].lower()}',
+            kind,
+            lines,
+            f'{deposit.deposit_type.title()} deposit {deposit.pk}',
+        ))
+    return postings
+
+
+def record_deposit(deposit, kind):
+    return post_many(deposit_postings([deposit], kind))
+
+
+def _held(invoice):
+    # Transport is collected with the sale and passed on to the seller
+    return invoice.amount + invoice.transport_charge
+
+
+def invoice_paid_postings(invoices):
+    """The buyer pays the invoice; the sale is held in escrow, buyer commission is earned."""
+    return [
+        (
+            f'invoice:{invoice.pk}:paid',
+            LedgerTransaction.INVOICE_PAID,
+            [
+                (Account.EXTERNAL, invoice.buyer_id, -invoice.total_payable()),
+                (Account.ESCROW_HELD, invoice.seller_id, _held(invoice)),
+                (Account.COMMISSION, None, invoice.buyer_commission),
+            ],
+            f'Invoice {invoice.pk}',
+        )
+        for invoice in invoices
+    ]
+
+
+def record_invoices_paid(invoices):
+    return post_many(invoice_paid_postings(invoices))
+
+
+def escrow_released_postings(invoices):
+    """
+    On delivery the sale leaves escrow: seller commission is earned, the rest is due to the seller.
+
+    Exactly what INVOICE_PAID put in escrow is released (transport may have
+    been re-quoted since); invoices whose payment was never posted are
+    skipped until it is (``manage.py backfill_ledger``).
+    """
+    invoices = list(invoices)
+    held = dict(
+        Entry.objects.filter(
+            transaction__reference__in=[f'invoice:{invoice.pk}:paid' for invoice in invoices],
+            account__kind=Account.ESCROW_HELD,
+        ).values_list('transaction__reference', 'amount')
+    )
+    postings = []
+    for invoice in invoices:
+        amount = held.get(f'invoice:{invoice.pk}:paid')
+        if amount is None:
+            continue
+        postings.append((
+            f'invoice:{invoice.pk}:released',
+            LedgerTransaction.ESCROW_RELEASED,
+            [
+                (Account.ESCROW_HELD, invoice.seller_id, -amount),
+                (Account.COMMISSION, None, invoice.seller_commission),
+                (Account.PAYOUT_DUE, invoice.seller_id, amount - invoice.seller_commission),
+            ],
+            f'Invoice {invoice.pk}',
+        ))
+    return postings
+
+
+def record_escrow_released(invoices):
+    return post_many(escrow_released_postings(invoices))
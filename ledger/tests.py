@@ -0,0 +1,210 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from auctions.models import Auction
+from ledger.models import Account, Entry, LedgerTransaction
+from ledger.services import UnbalancedTransaction, balance, post
+from users.models import User
+
+
+class LedgerTests(TestCase):
+    """Tests for the double-entry ledger and its materialized balances."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@test.com',
+            password='testpass123'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@test.com',
+            password='testpass123'
+        )
+        self.auction = Auction.objects.create(
+            title='Ledger Auction',
+            description='Test',
+            starting_price=Decimal('100.00'),
+            current_price=Decimal('1500.00'),
+            end_time=timezone.now() - timedelta(hours=1),
+            owner=self.seller
+        )
+
+    def _invoice(self):
+        from payments.models import Invoice
+
+        return Invoice.objects.create(
+            auction=self.auction,
+            buyer=self.buyer,
+            seller=self.seller,
+            amount=Decimal('1500.00'),
+            buyer_commission=Decimal('45.00'),
+            seller_commission=Decimal('150.00'),
+            transport_charge=Decimal('100.00'),
+        )
+
+    def _assert_ledger_balances(self):
+        """Every transaction sums to zero, so all balances do too."""
+        total = sum(Account.objects.values_list('balance', flat=True))
+        self.assertEqual(total, Decimal('0'))
+
+    def test_post_is_balanced_and_idempotent(self):
+        """Test unbalanced postings are refused and a reference is only posted once."""
+        lines = [
+            (Account.EXTERNAL, self.buyer, Decimal('-10.00')),
+            (Account.COMMISSION, None, Decimal('10.00')),
+        ]
+        with self.assertRaises(UnbalancedTransaction):
+            post('test:1', LedgerTransaction.INVOICE_PAID, lines[:1])
+
+        self.assertEqual(post('test:1', LedgerTransaction.INVOICE_PAID, lines), 1)
+        self.assertEqual(post('test:1', LedgerTransaction.INVOICE_PAID, lines), 0)
+        self.assertEqual(Entry.objects.count(), 2)
+        self.assertEqual(balance(Account.COMMISSION), Decimal('10.00'))
+        self.assertEqual(balance(Account.EXTERNAL, self.buyer), Decimal('-10.00'))
+        self.assertEqual(balance(Account.PAYOUT_DUE, self.seller), Decimal('0.00'))
+
+    def test_balance_is_one_lookup(self):
+        """Test a balance is read from the account row, not summed from entries."""
+        for number in range(5):
+            post(f'test:{number}', LedgerTransaction.INVOICE_PAID, [
+                (Account.EXTERNAL, self.buyer, Decimal('-1.00')),
+                (Account.COMMISSION, None, Decimal('1.00')),
+            ])
+        with self.assertNumQueries(1):
+            self.assertEqual(balance(Account.COMMISSION), Decimal('5.00'))
+        account = Account.objects.get(kind=Account.COMMISSION)
+        self.assertEqual(account.entry_count, 5)
+        self.assertEqual(
+            list(account.entries.order_by('pk').values_list('balance_after', flat=True)),
+            [Decimal(n) for n in range(1, 6)]
+        )
+
+    def test_deposit_lifecycle(self):
+        """Test locking, refunding and forfeiting deposits moves their amounts between accounts."""
+        from deposits.services import create_buyer_deposit, forfeit_deposit, refund_deposit
+
+        refunded = create_buyer_deposit(self.buyer, self.auction)
+        forfeited = create_buyer_deposit(self.buyer, self.auction)
+        self.assertEqual(balance(Account.DEPOSITS_LOCKED, self.buyer), Decimal('2000.00'))
+
+        refund_deposit(refunded)
+        forfeit_deposit(forfeited)
+        self.assertEqual(balance(Account.DEPOSITS_LOCKED, self.buyer), Decimal('0.00'))
+        self.assertEqual(balance(Account.EXTERNAL, self.buyer), Decimal('-1000.00'))
+        self.assertEqual(balance(Account.FORFEITS), Decimal('1000.00'))
+        self.assertTrue(LedgerTransaction.objects.filter(reference=f'deposit:{refunded.pk}:refunded').exists())
+        self._assert_ledger_balances()
+
+    def test_invoice_paid_and_escrow_released(self):
+        """Test a verified payment holds the sale in escrow and delivery releases it to the seller."""
+        from escrow.models import Escrow
+        from escrow.services import mark_delivered, mark_shipped
+        from payments.models import PaymentProof
+        from payments.verification import verify_proofs
+
+        self._invoice()
+        escrow = Escrow.objects.create(auction=self.auction, buyer=self.buyer, seller=self.seller)
+        PaymentProof.objects.create(
+            auction=self.auction,
+            payer=self.buyer,
+            payee=self.seller,
+            amount=Decimal('1645.00'),
+            direction='to_platform',
+            screenshot='payment_proofs/proof.png',
+        )
+        verify_proofs(PaymentProof.objects.all(), self.seller)
+
+        self.assertEqual(balance(Account.EXTERNAL, self.buyer), Decimal('-1645.00'))
+        self.assertEqual(balance(Account.ESCROW_HELD, self.seller), Decimal('1600.00'))
+        self.assertEqual(balance(Account.COMMISSION), Decimal('45.00'))
+
+        escrow.refresh_from_db()
+        mark_shipped(escrow)
+        mark_delivered(escrow)
+        self.assertEqual(balance(Account.ESCROW_HELD, self.seller), Decimal('0.00'))
+        self.assertEqual(balance(Account.PAYOUT_DUE, self.seller), Decimal('1450.00'))
+        self.assertEqual(balance(Account.COMMISSION), Decimal('195.00'))
+        self._assert_ledger_balances()
+
+    def test_release_uses_the_amount_held_at_payment(self):
+        """Test a transport charge changed after payment leaves nothing behind in escrow."""
+        from ledger.services import record_escrow_released, record_invoices_paid
+
+        invoice = self._invoice()
+        record_invoices_paid([invoice])
+        invoice.transport_charge = Decimal('160.00')
+        invoice.save()
+
+        record_escrow_released([invoice])
+        self.assertEqual(balance(Account.ESCROW_HELD, self.seller), Decimal('0.00'))
+        self.assertEqual(balance(Account.PAYOUT_DUE, self.seller), Decimal('1450.00'))
+        self._assert_ledger_balances()
+
+    def test_deleting_a_user_keeps_their_accounts(self):
+        """Test a user with ledger history can be deleted and their accounts stay attributable."""
+        from deposits.services import create_buyer_deposit
+
+        create_buyer_deposit(self.buyer, self.auction)
+        buyer_id = self.buyer.pk
+        self.buyer.delete()
+
+        account = Account.objects.get(kind=Account.DEPOSITS_LOCKED)
+        self.assertIsNone(account.user_id)
+        self.assertEqual(account.holder_id, buyer_id)
+        self.assertEqual(balance(Account.DEPOSITS_LOCKED, buyer_id), Decimal('1000.00'))
+        call_command('verify_ledger', stdout=StringIO())
+
+    def test_entries_are_append_only(self):
+        """Test entries cannot be updated or deleted."""
+        post('test:1', LedgerTransaction.INVOICE_PAID, [
+            (Account.EXTERNAL, self.buyer, Decimal('-1.00')),
+            (Account.COMMISSION, None, Decimal('1.00')),
+        ])
+        entry = Entry.objects.first()
+        with self.assertRaises(TypeError):
+            entry.save()
+        with self.assertRaises(TypeError):
+            entry.delete()
+        with self.assertRaises(TypeError):
+            Entry.objects.update(amount=0)
+        with self.assertRaises(TypeError):
+            Entry.objects.all().delete()
+
+    def test_verify_ledger_detects_and_fixes_drift(self):
+        """Test verify_ledger replays entries and repairs drifted balances with --fix."""
+        from deposits.services import create_buyer_deposit
+
+        create_buyer_deposit(self.buyer, self.auction)
+        call_command('verify_ledger', stdout=StringIO())
+
+        Account.objects.filter(kind=Account.DEPOSITS_LOCKED).update(balance=Decimal('1.00'))
+        with self.assertRaises(CommandError):
+            call_command('verify_ledger', stdout=StringIO())
+
+        call_command('verify_ledger', '--fix', stdout=StringIO())
+        self.assertEqual(balance(Account.DEPOSITS_LOCKED, self.buyer), Decimal('1000.00'))
+        call_command('verify_ledger', stdout=StringIO())
+
+    def test_backfill_posts_existing_history_once(self):
+        """Test backfill_ledger posts existing deposits and invoices, and is safe to rerun."""
+        from deposits.models import Deposit
+
+        Deposit.objects.create(user=self.buyer, auction=self.auction, deposit_type='BUYER',
+                               amount=Decimal('1000.00'), status='REFUNDED')
+        invoice = self._invoice()
+        invoice.is_paid = True
+        invoice.save()
+
+        call_command('backfill_ledger', stdout=StringIO())
+        call_command('backfill_ledger', stdout=StringIO())
+        self.assertEqual(LedgerTransaction.objects.count(), 3)
+        self.assertEqual(balance(Account.EXTERNAL, self.buyer), Decimal('-1645.00'))
+        self.assertEqual(balance(Account.ESCROW_HELD, self.seller), Decimal('1600.00'))
+        call_command('verify_ledger', stdout=StringIO())
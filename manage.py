@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aliaunction.settings')
+    # The test suite runs background work inline (aliaunction.test_settings)
+    settings_module = 'aliaunction.test_settings' if sys.argv[1:2] == ['test'] else 'aliaunction.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
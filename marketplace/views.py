@@ -2,24 +2,36 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from auctions.models import Auction
 from django.db.models import Q
-from datetime import datetime, timedelta
 from django.db.models import Count
 from django.utils import timezone
+from django.core.cache import cache
+from auctions.pagination import paginate, wants_json, page_json_response
+
+# Header stats are shared by every visitor and may lag by this many seconds
+STATS_CACHE_SECONDS = 60
+
 
 def live_auctions(request):
     """Live auctions page showing currently active auctions"""
-    from django.db.models import Count
+    auctions = Auction.objects.live().annotate(bid_count=Count('bids'))
+    page = paginate(request, auctions, ('-created_at', '-id'))
+    if wants_json(request):
+        return page_json_response(page)
     
-    auctions = Auction.objects.filter(is_active=True).annotate(
-        bid_count=Count('bids')
-    ).order_by('-created_at')
-    
-    # Calculate total bids across all active auctions
-    total_bids = auctions.aggregate(total=Count('bids'))['total'] or 0
+    # Active auctions and total bids across them, counted once per window
+    stats = cache.get_or_set(
+        'marketplace:live_stats',
+        lambda: Auction.objects.live().aggregate(
+            auction_count=Count('id', distinct=True),
+            total_bids=Count('bids'),
+        ),
+        STATS_CACHE_SECONDS,
+    )
     
     context = {
-        'auctions': auctions,
-        'total_bids': total_bids,
+        'auctions': page,
+        'auction_count': stats['auction_count'],
+        'total_bids': stats['total_bids'],
         'page_title': 'Live Auctions',
         'page_description': 'Discover and bid on unique items in real-time auctions',
         'now': timezone.now()
@@ -28,15 +40,21 @@ def live_auctions(request):
 
 def upcoming_items(request):
     """Upcoming items page showing auctions that will start soon"""
-    # Get auctions that will end in the next 7 days
-    future_date = datetime.now() + timedelta(days=7)
-    upcoming_auctions = Auction.objects.filter(
-        end_time__gt=datetime.now(),
-        end_time__lte=future_date
-    ).order_by('end_time')
+    # Scheduled auctions that have not started yet, soonest first
+    upcoming_auctions = Auction.objects.upcoming().select_related('schedule')
+    page = paginate(request, upcoming_auctions, ('schedule__start_time', 'id'))
+    if wants_json(request):
+        return page_json_response(page)
+    
+    upcoming_count = cache.get_or_set(
+        'marketplace:upcoming_count',
+        lambda: Auction.objects.upcoming().count(),
+        STATS_CACHE_SECONDS,
+    )
     
     context = {
-        'upcoming_auctions': upcoming_auctions,
+        'upcoming_auctions': page,
+        'upcoming_count': upcoming_count,
         'page_title': 'Upcoming Items',
         'page_description': 'Preview exciting items coming to auction soon',
         'now': timezone.now()
@@ -4,6 +4,8 @@ from django.utils import timezone
 from django.urls import reverse
 from django.utils.text import slugify
 
+from auctions import view_counter
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True, blank=True)
@@ -84,9 +86,10 @@ class Article(models.Model):
     def get_absolute_url(self):
         return reverse('news:article_detail', kwargs={'slug': self.slug})
     
-    def increment_views(self):
-        self.views += 1
-        self.save(update_fields=['views'])
+    def increment_views(self, request=None):
+        """Count a view; the write is batched by auctions.view_counter."""
+        if article_views.record(self.pk, request):
+            self.views += 1
     
     @property
     def reading_time(self):
@@ -114,3 +117,6 @@ class Comment(models.Model):
     @property
     def is_reply(self):
         return self.parent is not None
+
+
+article_views = view_counter.register(Article, 'views')
@@ -72,7 +72,7 @@ def article_detail(request, slug):
     article = get_object_or_404(Article, slug=slug, status='published')
     
     # Increment view count
-    article.increment_views()
+    article.increment_views(request)
     
     # Handle comment submission
     if request.method == 'POST' and request.user.is_authenticated:
@@ -0,0 +1,32 @@
+"""
+Async versions of the notification polling endpoints.
+
+The navbar polls ``api/unread/`` every few seconds for every logged-in
+tab, so these are the first candidates for ``settings.ASYNC_VIEWS``.
+"""
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from .models import Notification
+
+
+@login_required
+async def unread_notifications_api(request):
+    user = await request.auser()
+    notifications = Notification.objects.filter(user=user, is_read=False).order_by('-created_at')
+    data = [
+        {
+            'id': n.id,
+            'message': n.message,
+            'auction_id': n.auction_id,
+            'created_at': n.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        async for n in notifications
+    ]
+    return JsonResponse({'notifications': data})
+
+
+@login_required
+async def mark_notification_read(request, notification_id):
+    user = await request.auser()
+    await Notification.objects.filter(id=notification_id, user=user).aupdate(is_read=True)
+    return JsonResponse({'success': True})
@@ -127,14 +127,13 @@ The AuctionVistas Team
     )
 
 
-def send_auction_won_notification(winner, auction):
+def auction_won_email(winner, auction):
     """
-    Send winning notification email and create invoice prompt.
+    (subject, message) telling the winner to check out.
     """
-    if winner.email:
-        send_mail(
-            subject=f'🎉 Congratulations! You Won: {auction.title}',
-            message=f'''Hi {winner.username},
+    return (
+        f'🎉 Congratulations! You Won: {auction.title}',
+        f'''Hi {winner.username},
 
 Congratulations! You have won the auction for "{auction.title}"!
 
@@ -148,6 +147,22 @@ Checkout: /payments/checkout/{auction.id}/
 Thank you for using AuctionVistas!
 The AuctionVistas Team
 ''',
+    )
+
+
+def auction_won_message(auction):
+    return f'🎉 Congratulations! You won the auction "{auction.title}"! Click to proceed to checkout.'
+
+
+def send_auction_won_notification(winner, auction):
+    """
+    Send winning notification email and create invoice prompt.
+    """
+    if winner.email:
+        subject, message = auction_won_email(winner, auction)
+        send_mail(
+            subject=subject,
+            message=message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[winner.email],
             fail_silently=True
@@ -157,18 +172,17 @@ The AuctionVistas Team
     Notification.objects.create(
         user=winner,
         auction=auction,
-        message=f'🎉 Congratulations! You won the auction "{auction.title}"! Click to proceed to checkout.'
+        message=auction_won_message(auction)
     )
 
 
-def send_auction_lost_notification(user, auction, winner_username):
+def auction_lost_email(user, auction, winner_username):
     """
-    Send notification to losing bidders.
+    (subject, message) telling a losing bidder who won.
     """
-    if user.email:
-        send_mail(
-            subject=f'Auction Ended: {auction.title}',
-            message=f'''Hi {user.username},
+    return (
+        f'Auction Ended: {auction.title}',
+        f'''Hi {user.username},
 
 The auction for "{auction.title}" has ended.
 
@@ -181,6 +195,18 @@ Browse Auctions: /auctions/
 Thank you for participating!
 The AuctionVistas Team
 ''',
+    )
+
+
+def send_auction_lost_notification(user, auction, winner_username):
+    """
+    Send notification to losing bidders.
+    """
+    if user.email:
+        subject, message = auction_lost_email(user, auction, winner_username)
+        send_mail(
+            subject=subject,
+            message=message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[user.email],
             fail_silently=True
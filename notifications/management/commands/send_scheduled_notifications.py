@@ -12,8 +12,6 @@ from auctions.models import Auction
 from notifications.email_service import (
     send_auction_starting_soon,
     send_auction_ending_soon,
-    send_auction_won_notification,
-    send_auction_lost_notification
 )
 
 
@@ -107,52 +105,14 @@ class Command(BaseCommand):
         return count
 
     def _process_ended_auctions(self, now, dry_run):
-        """Notify winners and losing bidders about ended auctions."""
-        count = 0
-        
-        # Find auctions that ended in the last hour and haven't been processed
-        window_start = now - timedelta(hours=1)
-        window_end = now
-        
-        ended_auctions = Auction.objects.filter(
-            end_time__gte=window_start,
-            end_time__lte=window_end,
-            is_active=True  # Still marked active but actually ended
-        )
+        """Close ended auctions, which notifies winners, losing bidders and sellers."""
+        from auction_close.finalizer import due_auctions, finalize_auctions
         
-        for auction in ended_auctions:
-            # Get the highest bid
-            highest_bid = auction.bids.order_by('-amount', '-timestamp').first()
-            
-            if highest_bid:
-                winner = highest_bid.user
-                self.stdout.write(f'  Auction "{auction.title}" won by {winner.username}')
-                
-                if not dry_run:
-                    # Notify winner
-                    send_auction_won_notification(winner, auction)
-                    count += 1
-                    
-                    # Notify losing bidders
-                    losing_bidders = set(
-                        auction.bids.exclude(user=winner).values_list('user', flat=True)
-                    )
-                    from users.models import User
-                    for user_id in losing_bidders:
-                        try:
-                            user = User.objects.get(id=user_id)
-                            send_auction_lost_notification(user, auction, winner.username)
-                            count += 1
-                        except User.DoesNotExist:
-                            pass
-                    
-                    # Mark auction as inactive
-                    auction.is_active = False
-                    auction.save(update_fields=['is_active'])
-            else:
-                self.stdout.write(f'  Auction "{auction.title}" ended with no bids')
-                if not dry_run:
-                    auction.is_active = False
-                    auction.save(update_fields=['is_active'])
+        if dry_run:
+            due = due_auctions(now).count()
+            self.stdout.write(f'  {due} ended auction(s) would be closed')
+            return 0
         
-        return count
+        result = finalize_auctions(now=now)
+        self.stdout.write(f"  Closed {result['closed']} auction(s), {result['invoiced']} invoiced")
+        return result['closed']
@@ -1,9 +1,10 @@
 from django.urls import path
-from . import views
+from auctions.async_views import select_view
+from . import views, async_views
 
 urlpatterns = [
     path('', views.notifications_list, name='notifications_list'),
-    path('api/unread/', views.unread_notifications_api, name='unread_notifications_api'),
-    path('api/read/<int:notification_id>/', views.mark_notification_read, name='mark_notification_read'),
+    path('api/unread/', select_view('unread_notifications_api', views.unread_notifications_api, async_views.unread_notifications_api), name='unread_notifications_api'),
+    path('api/read/<int:notification_id>/', select_view('mark_notification_read', views.mark_notification_read, async_views.mark_notification_read), name='mark_notification_read'),
     path('mark-all-read/', views.mark_all_as_read, name='mark_all_as_read'),
-] 
\ No newline at end of file
+]
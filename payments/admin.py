@@ -1,7 +1,6 @@
 from django.contrib import admin
-from .models import Payment, Refund, PlatformPaymentDetails, UserPaymentProfile, PaymentProof, Invoice, InvoicePayment
-from django.utils import timezone
-from escrow.models import Escrow
+from .models import Payment, Refund, PlatformPaymentDetails, UserPaymentProfile, PaymentProof, Invoice, InvoicePayment, PaymentVerification
+from .verification import reject_proofs, verify_proofs
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
@@ -15,33 +14,22 @@ class RefundAdmin(admin.ModelAdmin):
     list_filter = ('status',)
 
 def verify_payment(modeladmin, request, queryset):
-    for payment in queryset:
-        payment.status = 'verified'
-        payment.verified_by = request.user
-        payment.verified_at = timezone.now()
-        payment.save()
+    # Set-based: a fixed number of queries however many proofs are selected
+    result = verify_proofs(queryset, request.user)
+    message = (
+        f"Verified {result['verified']} payment(s); {result['invoices_paid']} invoice(s) "
+        f"and {result['escrows_paid']} escrow(s) marked paid."
+    )
+    if result['skipped']:
+        reasons = ", ".join(f"{count} {reason.replace('_', ' ')}" for reason, count in sorted(result['skipped'].items()))
+        message += f" Skipped {sum(result['skipped'].values())}: {reasons}."
+    modeladmin.message_user(request, message)
 
-        # ✅ Mark invoice as paid (if exists)
-        try:
-            invoice = Invoice.objects.get(auction=payment.auction)
-            invoice.status = "PAID"
-            invoice.is_paid = True
-            invoice.save(update_fields=["status", "is_paid"])
-        except Invoice.DoesNotExist:
-            pass
-
-        # ✅ Mark escrow as paid (if exists)
-        try:
-            escrow = Escrow.objects.get(auction=payment.auction)
-            escrow.status = "PAID"
-            escrow.save(update_fields=["status"])
-        except Escrow.DoesNotExist:
-            pass
-            
 verify_payment.short_description = "Verify selected payments (mark Invoice+Escrow PAID)"
 
 def reject_payment(modeladmin, request, queryset):
-    queryset.update(status='rejected')
+    rejected = reject_proofs(queryset, request.user)
+    modeladmin.message_user(request, f"Rejected {rejected} payment(s).")
 reject_payment.short_description = "Reject selected payments"
 
 @admin.register(PlatformPaymentDetails)
@@ -64,3 +52,10 @@ class PaymentProofAdmin(admin.ModelAdmin):
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
     list_display = ("id", "auction", "buyer", "seller", "amount", "is_paid")
+
+
+@admin.register(PaymentVerification)
+class PaymentVerificationAdmin(admin.ModelAdmin):
+    list_display = ("proof", "invoice", "action", "reason", "staff", "created_at")
+    list_filter = ("action", "reason")
+    list_select_related = ("proof", "invoice", "staff")
@@ -0,0 +1,174 @@
+"""
+Cached invoice PDFs.
+
+Downloading an invoice used to run WeasyPrint inside the request every
+time (hundreds of milliseconds of CPU and tens of MB per call), once each
+for the buyer, the seller and staff. PDFs are now rendered once per
+version of the invoice and kept on disk, content-addressed:
+
+- the invoice HTML is rendered first (cheap), with the transport charge
+  taken from the buyer's shipping details as pay_invoice does
+- its SHA-256, salted with TEMPLATE_VERSION, names the file:
+  INVOICE_PDF_ROOT/ab/abcdef....pdf
+- the same digest is the download's ETag
+
+So a PDF is only re-rendered when something printed on it changes: the
+invoice, the shipping charge, or the template. Old versions are left
+behind until ``render_invoice_pdfs --prune`` removes them.
+
+Rendering happens in a pool of INVOICE_PDF_WORKERS worker processes
+(spawned, recycled every WORKER_MAX_TASKS renders), so WeasyPrint's CPU
+time and memory stay out of the web workers. ``manage.py
+render_invoice_pdfs`` renders every pending invoice ahead of time;
+a download that finds no file queues one and waits up to
+INVOICE_PDF_WAIT_SECONDS for it. With INVOICE_PDF_WORKERS = 0 PDFs are
+rendered in-process (as in aliaunction.test_settings).
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+logger = logging.getLogger(__name__)
+
+INVOICE_TEMPLATE = 'payments/invoice_pdf.html'
+
+# Bump when PDFs change without the HTML changing (CSS tweaks the HTML
+# does not show, fonts, WeasyPrint upgrades); every invoice re-renders.
+TEMPLATE_VERSION = 1
+
+# Recycle pool processes so WeasyPrint's memory growth is bounded
+WORKER_MAX_TASKS = 50
+
+
+class PdfUnavailable(Exception):
+    """WeasyPrint (or the system libraries it needs) is not installed."""
+
+
+def pdf_root():
+    return Path(getattr(settings, 'INVOICE_PDF_ROOT', Path(settings.MEDIA_ROOT) / 'invoices'))
+
+
+def invoice_html(invoice):
+    escrow = getattr(invoice.auction, 'escrow', None)
+    shipping = getattr(escrow, 'shipping', None) if escrow is not None else None
+    if shipping is not None:
+        invoice.transport_charge = shipping.delivery_charge
+    return render_to_string(INVOICE_TEMPLATE, {'invoice': invoice})
+
+
+def invoice_digest(html):
+    return hashlib.sha256(f'{TEMPLATE_VERSION}\n{html}'.encode()).hexdigest()
+
+
+def pdf_path(digest):
+    return pdf_root() / digest[:2] / f'{digest}.pdf'
+
+
+def html_to_pdf(html, path):
+    """Render ``html`` to ``path`` atomically. Runs in the pool processes."""
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as exc:
+        # OSError: WeasyPrint is installed but pango/gobject are missing
+        raise PdfUnavailable(str(exc)) from None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(HTML(string=html).write_pdf())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return str(path)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+# digest -> Future, so concurrent downloads of one invoice render it once
+_in_flight = {}
+
+
+def _workers():
+    return getattr(settings, 'INVOICE_PDF_WORKERS', 2)
+
+
+def _get_pool():
+    # Called with _pool_lock held
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=_workers(),
+            mp_context=multiprocessing.get_context('spawn'),
+            max_tasks_per_child=WORKER_MAX_TASKS,
+        )
+    return _pool
+
+
+def render_pdf(html, digest):
+    """Queue a render of ``html`` as ``digest``; returns a Future of its path."""
+    path = pdf_path(digest)
+    if _workers() <= 0:
+        future = Future()
+        try:
+            future.set_result(html_to_pdf(html, path))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    with _pool_lock:
+        future = _in_flight.get(digest)
+        if future is None:
+            future = _in_flight[digest] = _get_pool().submit(html_to_pdf, html, str(path))
+            future.add_done_callback(lambda done: _in_flight.pop(digest, None))
+    return future
+
+
+def render_pending(invoices):
+    """
+    Render every invoice in ``invoices`` whose current version has no PDF
+    yet; returns counts of rendered, cached (already on disk) and failed.
+    """
+    result = {'rendered': 0, 'cached': 0, 'failed': 0}
+    futures = {}
+    for invoice in invoices:
+        html = invoice_html(invoice)
+        digest = invoice_digest(html)
+        if pdf_path(digest).exists():
+            result['cached'] += 1
+        elif digest not in futures:
+            futures[digest] = (invoice.pk, render_pdf(html, digest))
+    for invoice_id, future in futures.values():
+        try:
+            future.result()
+        except PdfUnavailable:
+            raise
+        except Exception:
+            logger.exception('Could not render the PDF of invoice %s', invoice_id)
+            result['failed'] += 1
+        else:
+            result['rendered'] += 1
+    return result
+
+
+def current_digests(invoices):
+    return {invoice_digest(invoice_html(invoice)) for invoice in invoices}
+
+
+def prune(keep):
+    """Delete cached PDFs whose digest is not in ``keep``; returns how many."""
+    removed = 0
+    for path in pdf_root().glob('*/*.pdf'):
+        if path.stem not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
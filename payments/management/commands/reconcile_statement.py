@@ -0,0 +1,56 @@
+"""
+Management command to reconcile a bank statement against open invoices.
+Run: python manage.py reconcile_statement statement.csv --report report.csv
+
+Streams the statement once, matching credits to InvoicePayment references,
+invoice numbers in the narration and pending payment proofs (see
+payments.reconciliation), writes one report row per statement line and
+marks fully paid invoices, their payments, escrows and proofs as paid.
+Use --dry-run to only produce the report.
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.reconciliation import IGNORED, MATCHED, PARTIAL, UNMATCHED, OpenItems, apply, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Match a bank statement CSV against open invoices, payment references and proofs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Bank statement CSV (with a header row)')
+        parser.add_argument('--report', help='Write a per-line CSV report here ("-" for stdout)')
+        parser.add_argument('--encoding', default='utf-8-sig')
+        parser.add_argument('--dry-run', action='store_true', help='Report only; mark nothing as paid')
+
+    def handle(self, *args, **options):
+        items = OpenItems.load()
+        report = None
+        try:
+            if options['report'] == '-':
+                report = sys.stdout
+            elif options['report']:
+                report = open(options['report'], 'w', newline='')
+            with open(options['statement'], newline='', encoding=options['encoding']) as statement:
+                result = reconcile(statement, items, report)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        finally:
+            if report is not None and report is not sys.stdout:
+                report.close()
+
+        counts = result.counts
+        out = self.stderr if options['report'] == '-' else self.stdout
+        out.write(
+            f"{counts[MATCHED]} matched, {counts[PARTIAL]} partial, {counts[UNMATCHED]} unmatched, "
+            f"{counts[IGNORED]} ignored line(s); {len(result.paid_invoices)} invoice(s) paid in full, "
+            f"{len(result.partial_invoices())} partly paid"
+        )
+        if options['dry_run']:
+            return
+        applied = apply(result)
+        out.write(self.style.SUCCESS(
+            f"Marked {applied['invoices']} invoice(s), {applied['payments']} payment(s), "
+            f"{applied['escrows']} escrow(s) and {applied['proofs']} proof(s) as paid"
+        ))
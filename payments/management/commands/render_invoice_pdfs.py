@@ -0,0 +1,42 @@
+"""
+Management command to render the PDFs of invoices that have none yet.
+Run: python manage.py render_invoice_pdfs
+
+Renders every invoice whose current version (invoice, shipping charge,
+template) has no cached PDF, in the worker pool (see
+payments.invoice_pdf). Run it from cron so downloads never wait for a
+render; --prune also deletes PDFs of superseded versions.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.invoice_pdf import PdfUnavailable, current_digests, prune, render_pending
+from payments.models import Invoice
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Render and cache invoice PDFs that are missing or out of date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help='Delete PDFs of superseded invoice versions')
+
+    def handle(self, *args, **options):
+        invoices = Invoice.objects.select_related(
+            'buyer', 'seller', 'auction', 'auction__escrow', 'auction__escrow__shipping'
+        ).order_by('pk')
+        totals = {'rendered': 0, 'cached': 0, 'failed': 0}
+        try:
+            for start in range(0, invoices.count(), BATCH_SIZE):
+                for key, value in render_pending(invoices[start:start + BATCH_SIZE]).items():
+                    totals[key] += value
+        except PdfUnavailable as exc:
+            raise CommandError(f'WeasyPrint is not available: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {totals['rendered']} invoice PDF(s), {totals['cached']} already cached, "
+            f"{totals['failed']} failed"
+        ))
+        if options['prune']:
+            removed = prune(current_digests(invoices.iterator()))
+            self.stdout.write(f'Pruned {removed} superseded PDF(s)')
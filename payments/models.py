@@ -143,3 +143,29 @@ class InvoicePayment(models.Model):
 
     def __str__(self):
         return f"Payment {self.id} for Invoice {self.invoice.id}"
+
+
+class PaymentVerification(models.Model):
+    """Audit trail of staff decisions on payment proofs (payments.verification)."""
+    VERIFIED = "VERIFIED"
+    REJECTED = "REJECTED"
+    SKIPPED = "SKIPPED"
+
+    ACTION_CHOICES = [
+        (VERIFIED, "Verified"),
+        (REJECTED, "Rejected"),
+        (SKIPPED, "Skipped"),
+    ]
+
+    proof = models.ForeignKey(PaymentProof, on_delete=models.CASCADE, related_name="verifications")
+    invoice = models.ForeignKey(Invoice, on_delete=models.SET_NULL, null=True, blank=True, related_name="verifications")
+    staff = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="payment_verifications")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    reason = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.action} proof {self.proof_id}"
@@ -0,0 +1,245 @@
+"""
+Bank statement reconciliation.
+
+Finance used to match statement lines against InvoicePayment references
+and PaymentProof amounts by hand. ``reconcile`` does it in one pass over
+the statement:
+
+- first the open side is loaded into dicts (the "build" side of a hash
+  join): unpaid invoices by id with the amount still due, their
+  InvoicePayment references, and pending payment proofs by amount
+- then the statement is read line by line with ``csv.reader`` (the
+  "probe" side) and each credit is looked up: by payment reference, by
+  an invoice number in the narration (``INV-123``), and otherwise by
+  amount against pending proofs when exactly one proof's invoice has
+  that total payable (proofs record the winning bid, but buyers transfer
+  the invoice total, commission and transport included)
+- each line is classified as it is read and can be written straight to
+  a report: ``matched`` (the invoice is now paid in full, possibly over
+  several lines), ``partial`` (received less than due so far),
+  ``unmatched`` (no reference, invoice or unique proof; or already paid)
+  or ``ignored`` (debits, blank amounts)
+
+Memory is bounded by the number of open invoices and proofs, not by the
+statement, so a 500k-line file streams through. ``apply`` then marks the
+matches with set-based updates: InvoicePayments -> SUCCESS, invoices ->
+PAID (and posted to the ledger), escrows awaiting payment -> PAID, and
+matched proofs go through payments.verification.verify_proofs. Run it with ``manage.py
+reconcile_statement``.
+"""
+import csv
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from escrow.models import Escrow
+from ledger.services import record_invoices_paid
+
+from .models import Invoice, InvoicePayment, PaymentProof
+from .verification import verify_proofs
+
+MATCHED = 'matched'
+PARTIAL = 'partial'
+UNMATCHED = 'unmatched'
+IGNORED = 'ignored'
+
+REPORT_COLUMNS = ('line', 'date', 'reference', 'amount', 'status', 'invoice', 'proof', 'note')
+
+# Header names banks use for each column we need (lower-cased)
+COLUMN_ALIASES = {
+    'date': ('date', 'txn date', 'transaction date', 'value date', 'value dt'),
+    'reference': ('reference', 'ref', 'ref no', 'reference no', 'chq./ref.no.', 'utr', 'utr no'),
+    'description': ('description', 'narration', 'particulars', 'remarks'),
+    'amount': ('amount', 'credit', 'deposit', 'deposit amt.', 'credit amount'),
+}
+
+INVOICE_NUMBER = re.compile(r'\bINV[-#\s]{0,2}(\d+)\b', re.IGNORECASE)
+
+APPLY_BATCH_SIZE = 900
+
+
+def _columns(header):
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[column] = names.index(alias)
+                break
+    missing = {'reference', 'amount'} - set(columns)
+    if missing:
+        raise ValueError(f"Statement has no {' or '.join(sorted(missing))} column")
+    return columns
+
+
+def _amount(value):
+    value = value.replace(',', '').replace('₹', '').strip()
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+class OpenItems:
+    """The build side: what is still waiting for money, keyed for lookups."""
+
+    def __init__(self):
+        # invoice id -> amount still due (Decimal)
+        self.due = {}
+        # normalised reference -> (invoice id, invoice payment id)
+        self.references = {}
+        # amount due -> [proof id, auction id] of pending platform payments
+        self.proofs_by_amount = {}
+        # auction id -> invoice id
+        self.invoice_of_auction = {}
+
+    @classmethod
+    def load(cls):
+        items = cls()
+        open_invoices = Invoice.objects.filter(is_paid=False).exclude(status='PAID').values_list(
+            'pk', 'auction_id', 'amount', 'buyer_commission', 'transport_charge'
+        )
+        for invoice_id, auction_id, amount, buyer_commission, transport in open_invoices.iterator():
+            items.due[invoice_id] = amount + buyer_commission + transport
+            items.invoice_of_auction[auction_id] = invoice_id
+        payments = InvoicePayment.objects.filter(
+            invoice__is_paid=False, status='INITIATED'
+        ).exclude(reference_id='').values_list('reference_id', 'invoice_id', 'pk')
+        for reference, invoice_id, payment_id in payments.iterator():
+            items.references[_normalise(reference)] = (invoice_id, payment_id)
+        proofs = PaymentProof.objects.filter(status='pending', direction='to_platform').values_list(
+            'amount', 'pk', 'auction_id'
+        )
+        for amount, proof_id, auction_id in proofs.iterator():
+            # Keyed by what the transfer will be: the invoice's total payable
+            invoice_id = items.invoice_of_auction.get(auction_id)
+            if invoice_id is not None:
+                amount = items.due[invoice_id]
+            items.proofs_by_amount.setdefault(amount, []).append((proof_id, auction_id))
+        return items
+
+
+def _normalise(reference):
+    return re.sub(r'[\s-]', '', reference).upper()
+
+
+class Reconciliation:
+    """Outcome of one statement: counts, and what to mark when applying."""
+
+    def __init__(self):
+        self.counts = {MATCHED: 0, PARTIAL: 0, UNMATCHED: 0, IGNORED: 0}
+        self.received = {}
+        self.paid_invoices = set()
+        # invoice id -> InvoicePayment ids whose reference was on the statement
+        self.matched_payments = {}
+        self.matched_proofs = set()
+
+    def partial_invoices(self):
+        """Invoice ids that received money but not all of it."""
+        return sorted(set(self.received) - self.paid_invoices)
+
+
+def reconcile(lines, items=None, report=None):
+    """
+    Classify every statement line in ``lines`` (an iterable of CSV text
+    lines, header first); returns a Reconciliation. ``report`` is an
+    optional file-like object that receives one CSV row per line.
+    """
+    items = items or OpenItems.load()
+    result = Reconciliation()
+    writer = None
+    if report is not None:
+        writer = csv.writer(report)
+        writer.writerow(REPORT_COLUMNS)
+
+    rows = csv.reader(lines)
+    columns = _columns(next(rows))
+    for number, row in enumerate(rows, start=2):
+        if not row:
+            continue
+        reference, amount = _cell(row, columns, 'reference'), _amount(_cell(row, columns, 'amount'))
+        status, invoice_id, proof_id, note = _classify(
+            items, result, reference, _cell(row, columns, 'description'), amount
+        )
+        result.counts[status] += 1
+        if writer is not None:
+            writer.writerow((number, _cell(row, columns, 'date'), reference, '' if amount is None else amount,
+                             status, invoice_id or '', proof_id or '', note))
+    return result
+
+
+def _cell(row, columns, name):
+    index = columns.get(name)
+    return row[index].strip() if index is not None and index < len(row) else ''
+
+
+def _classify(items, result, reference, description, amount):
+    """-> (status, invoice id, proof id, note) for one statement line."""
+    if amount is None or amount <= 0:
+        return IGNORED, None, None, 'not a credit'
+
+    payment_id = proof_id = None
+    match = items.references.get(_normalise(reference)) if reference else None
+    if match is not None:
+        invoice_id, payment_id = match
+    else:
+        number = INVOICE_NUMBER.search(description) or INVOICE_NUMBER.search(reference)
+        invoice_id = int(number.group(1)) if number else None
+        if invoice_id is None:
+            candidates = items.proofs_by_amount.get(amount, ())
+            if len(candidates) > 1:
+                return UNMATCHED, None, None, f'{len(candidates)} pending proofs for this amount'
+            if candidates:
+                proof_id, auction_id = candidates[0]
+                # One line per proof; a second line with this amount stays unmatched
+                del items.proofs_by_amount[amount]
+                invoice_id = items.invoice_of_auction.get(auction_id)
+                if invoice_id is None:
+                    return UNMATCHED, None, proof_id, 'proof has no open invoice'
+
+    if invoice_id is None:
+        return UNMATCHED, None, None, 'no reference, invoice number or unique proof'
+    if invoice_id in result.paid_invoices or invoice_id not in items.due:
+        return UNMATCHED, invoice_id, proof_id, 'invoice already paid or unknown'
+
+    received = result.received.get(invoice_id, Decimal('0')) + amount
+    result.received[invoice_id] = received
+    if payment_id is not None:
+        result.matched_payments.setdefault(invoice_id, []).append(payment_id)
+    due = items.due[invoice_id]
+    if received < due:
+        return PARTIAL, invoice_id, proof_id, f'received {received} of {due}'
+
+    result.paid_invoices.add(invoice_id)
+    if proof_id is not None:
+        result.matched_proofs.add(proof_id)
+    return MATCHED, invoice_id, proof_id, f'overpaid by {received - due}' if received > due else ''
+
+
+def apply(result, staff=None):
+    """Mark what ``result`` matched as paid; returns counts of rows changed."""
+    applied = {'invoices': 0, 'payments': 0, 'escrows': 0, 'proofs': 0}
+    paid = sorted(result.paid_invoices)
+    with transaction.atomic():
+        for start in range(0, len(paid), APPLY_BATCH_SIZE):
+            batch = paid[start:start + APPLY_BATCH_SIZE]
+            unpaid = list(Invoice.objects.filter(pk__in=batch, is_paid=False).select_for_update())
+            applied['invoices'] += Invoice.objects.filter(pk__in=[invoice.pk for invoice in unpaid]).update(
+                status='PAID', is_paid=True
+            )
+            record_invoices_paid(unpaid)
+            applied['escrows'] += Escrow.objects.filter(
+                auction__invoice__in=batch, status='PENDING_PAYMENT'
+            ).update(status='PAID')
+            payments = [pk for invoice_id in batch for pk in result.matched_payments.get(invoice_id, ())]
+            applied['payments'] += InvoicePayment.objects.filter(pk__in=payments, status='INITIATED').update(
+                status='SUCCESS'
+            )
+        proofs = sorted(result.matched_proofs)
+        for start in range(0, len(proofs), APPLY_BATCH_SIZE):
+            verified = verify_proofs(PaymentProof.objects.filter(pk__in=proofs[start:start + APPLY_BATCH_SIZE]), staff)
+            applied['proofs'] += verified['verified']
+    return applied
@@ -0,0 +1,140 @@
+"""
+Bulk payment proof verification.
+
+The admin "verify" action used to save each proof, then get and save its
+invoice and escrow, about five queries per proof. ``verify_proofs``
+handles a whole selection in one transaction with a fixed number of
+queries:
+
+- two queries load the selected proofs (locked) and their invoices,
+  with buyers, sellers and auction titles; each proof is validated
+- three set-based UPDATEs: proofs -> verified, invoices -> PAID, escrows
+  still awaiting payment -> PAID (an escrow that has already moved on is
+  left alone, as escrow.services.mark_paid does)
+- the settled invoices are posted to the ledger (ledger.services)
+- one ``bulk_create`` of PaymentVerification audit rows (verified and
+  skipped, with the reason) and one of buyer and seller Notifications
+- emails go out with one ``send_mass_mail`` after the commit
+
+A proof is skipped (and stays pending) when it is not pending any more,
+its auction has no invoice, it was not paid by the invoice's buyer, or
+it is for less than the winning bid. Only proofs paid to the platform
+settle invoices and escrows. ``reject_proofs`` is the counterpart.
+"""
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.utils import timezone
+
+from escrow.models import Escrow
+from ledger.services import record_invoices_paid
+from notifications.models import Notification
+
+from .models import Invoice, PaymentProof, PaymentVerification
+
+NOT_PENDING = 'not_pending'
+NO_INVOICE = 'no_invoice'
+NOT_BUYER = 'not_buyer'
+UNDERPAID = 'underpaid'
+
+
+def _skip_reason(proof, invoice):
+    if proof.status != 'pending':
+        return NOT_PENDING
+    if proof.direction != 'to_platform':
+        return None
+    if invoice is None:
+        return NO_INVOICE
+    if proof.payer_id != invoice.buyer_id:
+        return NOT_BUYER
+    if proof.amount < invoice.amount:
+        return UNDERPAID
+    return None
+
+
+def verify_proofs(proofs, staff, now=None):
+    """
+    Verify the payment proofs in ``proofs`` (a queryset) as ``staff``.
+
+    Returns {'verified': n, 'invoices_paid': n, 'escrows_paid': n,
+    'skipped': {reason: n}}.
+    """
+    now = now or timezone.now()
+    result = {'verified': 0, 'invoices_paid': 0, 'escrows_paid': 0, 'skipped': {}}
+    with transaction.atomic():
+        selected = list(
+            proofs.select_related('auction', 'payer', 'payee').select_for_update(of=('self',)).order_by('pk')
+        )
+        invoices = {
+            invoice.auction_id: invoice
+            for invoice in Invoice.objects.filter(auction_id__in={proof.auction_id for proof in selected})
+        }
+
+        verified, audit = [], []
+        for proof in selected:
+            invoice = invoices.get(proof.auction_id)
+            reason = _skip_reason(proof, invoice)
+            audit.append(PaymentVerification(
+                proof=proof,
+                invoice=invoice,
+                staff=staff,
+                action=PaymentVerification.SKIPPED if reason else PaymentVerification.VERIFIED,
+                reason=reason or '',
+            ))
+            if reason:
+                result['skipped'][reason] = result['skipped'].get(reason, 0) + 1
+            else:
+                verified.append(proof)
+        if not verified:
+            PaymentVerification.objects.bulk_create(audit)
+            return result
+
+        result['verified'] = PaymentProof.objects.filter(
+            pk__in=[proof.pk for proof in verified], status='pending'
+        ).update(status='verified', verified_by=staff, verified_at=now)
+
+        settled = [proof.auction_id for proof in verified if proof.direction == 'to_platform']
+        result['invoices_paid'] = Invoice.objects.filter(auction_id__in=settled).exclude(
+            status='PAID', is_paid=True
+        ).update(status='PAID', is_paid=True)
+        record_invoices_paid(invoices[auction_id] for auction_id in settled)
+        result['escrows_paid'] = Escrow.objects.filter(
+            auction_id__in=settled, status='PENDING_PAYMENT'
+        ).update(status='PAID', last_updated=now)
+
+        PaymentVerification.objects.bulk_create(audit)
+        notifications, emails = _notifications(verified)
+        Notification.objects.bulk_create(notifications)
+        if emails:
+            transaction.on_commit(lambda: send_mass_mail(emails, fail_silently=True))
+    return result
+
+
+def reject_proofs(proofs, staff):
+    """Reject the pending proofs in ``proofs``; returns how many."""
+    with transaction.atomic():
+        pending = list(proofs.filter(status='pending').select_for_update().values_list('pk', flat=True))
+        rejected = PaymentProof.objects.filter(pk__in=pending).update(status='rejected')
+        PaymentVerification.objects.bulk_create([
+            PaymentVerification(proof_id=proof_id, staff=staff, action=PaymentVerification.REJECTED)
+            for proof_id in pending
+        ])
+    return rejected
+
+
+def _notifications(verified):
+    notifications, emails = [], []
+    for proof in verified:
+        title = proof.auction.title
+        received = f'Payment of ₹{proof.amount} for "{title}" has been verified.'
+        if proof.direction == 'to_platform':
+            received += ' You can now ship the item.'
+        messages = (
+            (proof.payer, f'Your payment of ₹{proof.amount} for "{title}" has been verified.'),
+            (proof.payee, received),
+        )
+        for user, message in messages:
+            notifications.append(Notification(user=user, auction=proof.auction, message=message[:255]))
+            if user.email:
+                emails.append((f'Payment verified: {title}', message, settings.DEFAULT_FROM_EMAIL, [user.email]))
+    return notifications, emails
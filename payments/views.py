@@ -5,17 +5,11 @@ from .models import PlatformPaymentDetails, UserPaymentProfile, PaymentProof
 from .forms import UserPaymentProfileForm, PaymentProofForm
 from auctions.models import Auction
 from .models import Invoice, InvoicePayment
-from django.http import HttpResponse
-from django.template.loader import render_to_string
-
-# Try to import WeasyPrint, but make it optional
-try:
-    from weasyprint import HTML
-    WEASYPRINT_AVAILABLE = True
-except OSError:
-    # WeasyPrint requires external libraries (gobject, pango, etc.)
-    WEASYPRINT_AVAILABLE = False
-    HTML = None
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from concurrent.futures import TimeoutError as RenderTimeout
+from .invoice_pdf import PdfUnavailable, invoice_digest, invoice_html, pdf_path, render_pdf
 
 @login_required
 def payment_profile(request):
@@ -89,17 +83,21 @@ def pay_invoice(request, invoice_id):
 
     if request.method == "POST":
         method = request.POST.get("method")
+        reference_id = request.POST.get("reference_id", "").strip()
         payment = InvoicePayment.objects.create(
             invoice=invoice,
             method=method,
-            status="SUCCESS"  # simulate success
+            reference_id=reference_id,
+            # Bank transfers with a reference are confirmed by statement
+            # reconciliation (payments.reconciliation)
+            status="INITIATED" if reference_id else "SUCCESS"  # simulate success
         )
         
         if hasattr(invoice.auction, "escrow") and hasattr(invoice.auction.escrow, "shipping"):
             invoice.transport_charge = invoice.auction.escrow.shipping.delivery_charge
             invoice.save(update_fields=["transport_charge"])
 
-        message.info("upload_patyment_proof", auction_id=invoice.auction.id)
+        messages.info(request, "Payment recorded. Upload your payment proof if you paid by bank transfer.")
         return redirect("invoice_view", auction_id=invoice.auction.id)
 
     return render(request, "payments/pay.html", {
@@ -110,35 +108,55 @@ def pay_invoice(request, invoice_id):
 
 @login_required
 def download_invoice(request, invoice_id):
-    invoice = get_object_or_404(Invoice, id=invoice_id)
+    invoice = get_object_or_404(
+        Invoice.objects.select_related("buyer", "seller", "auction__escrow__shipping"),
+        id=invoice_id,
+    )
 
     if request.user not in [invoice.buyer, invoice.seller] and not request.user.is_staff:
         return HttpResponse("Unauthorized", status=403)
 
-    html_string = render_to_string(
-        "payments/invoice_pdf.html",
-        {"invoice": invoice}
-    )
-
-    if WEASYPRINT_AVAILABLE and HTML:
-        pdf = HTML(string=html_string).write_pdf()
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="invoice_{invoice.id}.pdf"'
+    # PDFs are cached per invoice version (payments.invoice_pdf); the digest doubles as the ETag
+    html_string = invoice_html(invoice)
+    digest = invoice_digest(html_string)
+    etag = quote_etag(digest)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
         return response
-    else:
-        # Fallback: return HTML if WeasyPrint not available
-        return HttpResponse(html_string, content_type="text/html")
+
+    path = pdf_path(digest)
+    if not path.exists():
+        try:
+            render_pdf(html_string, digest).result(timeout=getattr(settings, "INVOICE_PDF_WAIT_SECONDS", 10))
+        except PdfUnavailable:
+            # Fallback: return HTML if WeasyPrint not available
+            return HttpResponse(html_string, content_type="text/html")
+        except RenderTimeout:
+            response = HttpResponse("Your invoice is being prepared. Please try again in a moment.", status=202)
+            response["Retry-After"] = "5"
+            return response
+
+    response = FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=f"invoice_{invoice.id}.pdf",
+        content_type="application/pdf",
+    )
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
 
 
 @login_required
 def winner_checkout(request, auction_id):
     """
-    Winner checkout flow - creates Invoice and Escrow for the auction winner.
+    Winner checkout flow - sends the auction winner to their invoice.
+    Auctions the finalizer has not reached yet are finalized on the spot
+    (which creates the Invoice and Escrow).
     Only accessible by the winning bidder after auction ends.
     """
-    from decimal import Decimal
-    from escrow.models import Escrow
-    from commission.models import CommissionRule
+    from auction_close.finalizer import finalize_auctions
     
     auction = get_object_or_404(Auction, id=auction_id)
     
@@ -160,45 +178,16 @@ def winner_checkout(request, auction_id):
         return redirect('auction_detail', auction_id=auction.id)
     
     # Check if invoice already exists
-    try:
-        invoice = Invoice.objects.get(auction=auction)
+    if Invoice.objects.filter(auction=auction).exists():
         return redirect('invoice_view', auction_id=auction.id)
-    except Invoice.DoesNotExist:
-        pass
     
-    # Get commission rules
-    try:
-        commission_rule = CommissionRule.objects.filter(is_active=True).first()
-        buyer_percent = commission_rule.buyer_percent if commission_rule else Decimal('3.00')
-        seller_percent = commission_rule.seller_percent if commission_rule else Decimal('10.00')
-    except CommissionRule.DoesNotExist:
-        buyer_percent = Decimal('3.00')
-        seller_percent = Decimal('10.00')
-    
-    # Calculate commissions
-    amount = auction.current_price
-    buyer_commission = (amount * buyer_percent / 100).quantize(Decimal('0.01'))
-    seller_commission = (amount * seller_percent / 100).quantize(Decimal('0.01'))
-    
-    # Create Invoice
-    invoice = Invoice.objects.create(
-        auction=auction,
-        buyer=request.user,
-        seller=auction.owner,
-        amount=amount,
-        buyer_commission=buyer_commission,
-        seller_commission=seller_commission,
-        transport_charge=Decimal('0.00'),  # Set later with shipping
-        status='PENDING'
-    )
-    
-    # Create Escrow
-    Escrow.objects.create(
-        auction=auction,
-        buyer=request.user,
-        seller=auction.owner,
-        status='PENDING_PAYMENT'
-    )
+    result = finalize_auctions(Auction.objects.filter(pk=auction.pk))
+    if result['kept_open']:
+        messages.info(request, "Bidding is still open on this soft-close auction.")
+        return redirect('auction_detail', auction_id=auction.id)
+    if not result['invoiced']:
+        messages.error(request, "The reserve price was not met, so this auction ended without a sale.")
+        return redirect('auction_detail', auction_id=auction.id)
     
     messages.success(request, 'Invoice created! Please proceed to payment.')
     return redirect('invoice_view', auction_id=auction.id)
@@ -1,3 +1,5 @@
+from analytics import events as engagement
+from analytics.models import EngagementEvent
 from .models import Watchlist
 
 def is_watching(user, auction):
@@ -5,8 +7,12 @@ def is_watching(user, auction):
 
 
 def add_to_watchlist(user, auction):
-    Watchlist.objects.get_or_create(user=user, auction=auction)
+    _, created = Watchlist.objects.get_or_create(user=user, auction=auction)
+    if created:
+        engagement.record(EngagementEvent.WATCH, auction, user)
 
 
 def remove_from_watchlist(user, auction):
-    Watchlist.objects.filter(user=user, auction=auction).delete()
+    deleted, _ = Watchlist.objects.filter(user=user, auction=auction).delete()
+    if deleted:
+        engagement.record(EngagementEvent.UNWATCH, auction, user)
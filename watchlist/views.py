@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from auctions.models import Auction
 from .services import add_to_watchlist, remove_from_watchlist
 from .models import Watchlist
+from auctions.pagination import paginate, wants_json, page_json_response, serialize_auction
 
 @login_required
 def toggle_watchlist(request, auction_id):
@@ -19,4 +20,7 @@ def toggle_watchlist(request, auction_id):
 @login_required
 def my_watchlist(request):
     items = Watchlist.objects.filter(user=request.user).select_related("auction")
-    return render(request, "watchlist/my_watchlist.html", {"items": items})
+    page = paginate(request, items, ("-created_at", "-id"))
+    if wants_json(request):
+        return page_json_response(page, lambda item: serialize_auction(item.auction))
+    return render(request, "watchlist/my_watchlist.html", {"items": page})